@@ -1,5 +1,6 @@
 import json
 from channels.generic.websocket import AsyncWebsocketConsumer
+from .exports import EXPORT_STATUS_GROUP
 
 
 class UploadProgressConsumer(AsyncWebsocketConsumer):
@@ -32,3 +33,35 @@ class UploadProgressConsumer(AsyncWebsocketConsumer):
         data['message'] = 'Checksum mismatch. Please retry the upload.'
 
         await self.send(text_data=json.dumps(data))
+
+
+class ExportProgressConsumer(AsyncWebsocketConsumer):
+    """
+    Sends the progress of the export jobs of the connected user.
+    """
+    group_name = None
+
+    async def connect(self):
+        user = self.scope.get('user')
+        if user is None or not user.is_authenticated:
+            await self.close()
+            return
+
+        self.group_name = EXPORT_STATUS_GROUP.format(user.pk)
+        await self.channel_layer.group_add(
+            self.group_name,
+            self.channel_name
+        )
+        await self.accept()
+
+    async def disconnect(self, close_code):
+        if self.group_name is None:
+            return
+        await self.channel_layer.group_discard(
+            self.group_name,
+            self.channel_name
+        )
+
+    async def export_progress(self, event):
+        # Status, bytes written and rows exported of an export job
+        await self.send(text_data=json.dumps(event.get('data', {})))
@@ -0,0 +1,217 @@
+"""
+Background exports written to files.
+
+`get_or_create_export_job` returns a job for an export request, reusing a
+job of the same user whose fingerprint (model, format, filters and data
+versions of the exported models) matches and which has not failed or
+expired. `write_export_job` writes the file of a job, compressing formats that
+are not compressed already, and reports its progress to the websocket
+group of the job's user. Large CSV exports are
+split into primary key ranges written concurrently (see `write_sharded`).
+
+Example:
+    job, created = get_or_create_export_job(user, 'orderline', 'csv', {})
+    if created:
+        run_export_job.delay(str(job.pk))
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import time
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.core.exceptions import FieldDoesNotExist
+from django.core.files.base import ContentFile
+from django.utils import timezone
+
+from common.exporters.base_exporters import get_exporter_class
+from common.exporters.sharded_exporters import supports_sharding, write_sharded
+from services.settings.export import (
+    EXPORT_COMPRESSLEVEL, EXPORT_PROGRESS_INTERVAL, EXPORT_SHARD_MIN_ROWS, EXPORT_SHARDS)
+from services.settings.upload import EXPIRATION_DELTA, INCOMPLETE_EXT
+from utils.data_versions import get_data_versions
+from .models import ExportJob
+
+# Websocket group of the export jobs of a user, see `ExportProgressConsumer`
+EXPORT_STATUS_GROUP = 'export_status_{}'
+
+
+def check_filter(model, lookup):
+    """
+    Only allow filtering on the model's own columns (`price__gte`,
+    `category`...), never across relations.
+
+    Raises:
+        ValueError: If `lookup` is not allowed.
+    """
+    field_name, *lookups = lookup.split('__')
+    try:
+        field = model._meta.get_field(field_name)
+    except FieldDoesNotExist as exc:
+        raise ValueError(f"Cannot filter on '{lookup}'") from exc
+    if (not field.concrete or field.many_to_many or len(lookups) > 1
+            or (lookups and field.get_lookup(lookups[0]) is None)):
+        raise ValueError(f"Cannot filter on '{lookup}'")
+
+
+def build_exporter(model_name, export_format, filters=None):
+    """
+    The exporter of `model_name` in `export_format`, restricted to the rows
+    matching the `filters` lookups.
+
+    Raises:
+        ValueError: If the model, the format or a filter is invalid.
+        ValidationError: If a filter value is invalid.
+    """
+    exporter_class = get_exporter_class(export_format)
+    exporter = exporter_class(model_name)
+    if filters:
+        for lookup in filters:
+            check_filter(exporter.model, lookup)
+        exporter.queryset = exporter.model.objects.filter(**filters)
+    return exporter
+
+
+def export_fingerprint(exporter, model_name, export_format, filters):
+    signature = json.dumps([model_name, export_format, filters,
+                            get_data_versions(exporter.get_source_models())],
+                           sort_keys=True, default=str)
+    return hashlib.sha256(signature.encode('utf-8')).hexdigest()
+
+
+def export_filename(exporter):
+    return exporter.filename if exporter.compressed else f'{exporter.filename}.gz'
+
+
+def get_or_create_export_job(user, model_name, export_format, filters=None):
+    """
+    A job exporting `model_name`, reusing an identical one when possible.
+
+    Returns:
+        tuple: `(job, created)`.
+    """
+    filters = filters or {}
+    exporter = build_exporter(model_name, export_format, filters)
+    fingerprint = export_fingerprint(exporter, model_name, export_format, filters)
+    existing = ExportJob.objects.filter(
+        user=user,
+        fingerprint=fingerprint,
+        status__in=(ExportJob.UPLOADING, ExportJob.COMPLETE),
+        created_on__gt=timezone.now() - EXPIRATION_DELTA,
+    ).order_by('-created_on').first()
+    if existing is not None:
+        return existing, False
+
+    job = ExportJob(user=user, model_name=model_name, export_format=export_format,
+                    filters=filters, fingerprint=fingerprint,
+                    filename=export_filename(exporter))
+    job.file.save(f'{job.pk}{INCOMPLETE_EXT}', ContentFile(b''), save=True)
+    return job, True
+
+
+class ProgressFile:
+    """
+    Wraps the file an export is written to, reporting progress at most
+    every `interval` seconds.
+    """
+
+    def __init__(self, file_obj, on_progress, interval=EXPORT_PROGRESS_INTERVAL):
+        self.file_obj = file_obj
+        self.on_progress = on_progress
+        self.interval = interval
+        self.written = 0
+        self.reported_at = time.monotonic()
+
+    def write(self, data):
+        written = self.file_obj.write(data)
+        self.written += len(data)
+        now = time.monotonic()
+        if now - self.reported_at >= self.interval:
+            self.reported_at = now
+            self.on_progress(self.written)
+        return written
+
+    def __getattr__(self, name):
+        return getattr(self.file_obj, name)
+
+
+def publish_progress(job):
+    """
+    Send the progress of `job` to the websocket group of its user.
+    """
+    channel_layer = get_channel_layer()
+    if job.user_id is None or channel_layer is None:
+        return
+    message = {
+        'type': 'export_progress',
+        'data': {
+            'upload_id': str(job.pk),
+            'status': job.status,
+            'offset': job.offset,
+            'exported_rows': job.exported_rows,
+            'total_rows': job.total_rows,
+        },
+    }
+    try:
+        async_to_sync(channel_layer.group_send)(
+            EXPORT_STATUS_GROUP.format(job.user_id), message)
+    except Exception:
+        # Progress is best effort, clients can still poll the job
+        pass
+
+
+def write_export_job(job, check_abort=None):
+    """
+    Write the file of an export job.
+
+    Progress (bytes written and rows exported) is saved on the job and
+    sent to the websocket group of its user. The job is marked complete once
+    the file is written, or aborted (with its error) if writing fails.
+
+    Args:
+        job (ExportJob): The job to run.
+        check_abort (callable, optional): Called with every progress report;
+            should raise to stop the export.
+    """
+    exporter = build_exporter(job.model_name, job.export_format, job.filters)
+    job.total_rows = exporter.get_queryset().count()
+    job.save(update_fields=['total_rows'])
+
+    def on_progress(written):
+        if check_abort is not None:
+            check_abort()
+        job.offset, job.exported_rows = written, exporter.exported
+        ExportJob.objects.filter(pk=job.pk).update(
+            offset=job.offset, exported_rows=job.exported_rows)
+        publish_progress(job)
+
+    sharded = (EXPORT_SHARDS > 1 and not exporter.compressed
+               and job.total_rows >= EXPORT_SHARD_MIN_ROWS
+               and supports_sharding(exporter))
+    try:
+        with open(job.file.path, mode='wb') as raw_file:
+            output = ProgressFile(raw_file, on_progress)
+            if sharded:
+                write_sharded(exporter, raw_file, EXPORT_SHARDS, on_progress=on_progress)
+            elif exporter.compressed:
+                exporter.write(output)
+            else:
+                with gzip.GzipFile(fileobj=output, mode='wb',
+                                   compresslevel=EXPORT_COMPRESSLEVEL) as gzip_file:
+                    exporter.write(gzip_file)
+    except BaseException as exc:
+        job.status = ExportJob.ABORTED
+        job.error = str(exc) or exc.__class__.__name__
+        job.save(update_fields=['status', 'error'])
+        job.file.storage.delete(job.file.name)
+        publish_progress(job)
+        raise
+
+    job.offset, job.exported_rows = os.path.getsize(job.file.path), exporter.exported
+    job.completed()
+    publish_progress(job)
+    return job
+
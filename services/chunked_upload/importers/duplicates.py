@@ -0,0 +1,303 @@
+"""
+Duplicate key detection for imports with bounded memory.
+
+Detection runs before rows are written so that repeated keys in a file never
+reach the database:
+
+1. Scan pass: `DuplicateDetector.add` is called with the key of every row.
+   Keys (and the statistics of repeated ones) are kept in exact hash maps
+   until `memory_budget` is reached, after which the detector switches to
+   Bloom filters using half of the budget. In Bloom mode a repeated key only
+   marks the key as a *candidate* duplicate.
+2. Verification pass (only needed in Bloom mode, see `needs_verification`):
+   `DuplicateDetector.verify` is called again for every row, and exact
+   statistics are kept for the candidate keys only, within the other half of
+   the budget. A file with more duplicated keys than that raises
+   `DuplicateBudgetExceeded`.
+3. Import pass: `DuplicateDetector.is_winner` tells whether a row should be
+   written according to the `first` or `last` wins policy.
+
+Imports split over several workers scan their shard independently and merge
+the detectors with `merge_detectors`. Row positions are then given as
+`(shard, line_number)` tuples so they order the same way as the whole file.
+
+Example:
+    detector = DuplicateDetector(key_fields=('email',), policy='last')
+    for line_number, row in records():
+        detector.add(line_number, row)
+    if detector.needs_verification:
+        for line_number, row in records():
+            detector.verify(line_number, row)
+    detector.finish()
+    rows = [(n, row) for n, row in records() if detector.is_winner(n, row)]
+"""
+
+import hashlib
+
+from services.settings.upload import DUPLICATE_MEMORY_BUDGET
+
+FIRST_WINS = 'first'
+LAST_WINS = 'last'
+POLICIES = (FIRST_WINS, LAST_WINS)
+
+# Rough cost in bytes of one key kept in a hash map (16 byte digest, its
+# position or statistics and the dict slot)
+EXACT_ENTRY_COST = 128
+
+
+class DuplicateBudgetExceeded(ValueError):
+    """
+    Raised when the statistics of the duplicated keys of a file do not fit
+    in the memory budget of the detector.
+    """
+
+
+class BloomFilter:
+    """
+    A fixed-size Bloom filter over 16 byte key digests.
+
+    Filters built with the same `size` can be combined with `|` (union) and
+    `&` (an over-approximation of the intersection).
+    """
+
+    hash_count = 7
+
+    def __init__(self, size, bits=None):
+        self.size = size
+        self.bit_count = size * 8
+        self.bits = bytearray(size) if bits is None else bits
+
+    def _positions(self, digest):
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:16], 'little') | 1
+        return ((first + i * second) % self.bit_count
+                for i in range(self.hash_count))
+
+    def add(self, digest):
+        for position in self._positions(digest):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, digest):
+        return all(self.bits[position >> 3] & (1 << (position & 7))
+                   for position in self._positions(digest))
+
+    def _combine(self, other, operator):
+        if other.size != self.size:
+            raise ValueError('Bloom filters must have the same size')
+        left = int.from_bytes(self.bits, 'little')
+        right = int.from_bytes(other.bits, 'little')
+        bits = bytearray(operator(left, right).to_bytes(self.size, 'little'))
+        return BloomFilter(self.size, bits=bits)
+
+    def __or__(self, other):
+        return self._combine(other, lambda left, right: left | right)
+
+    def __and__(self, other):
+        return self._combine(other, lambda left, right: left & right)
+
+
+class DuplicateDetector:
+    """
+    Detects rows sharing the same key with a bounded amount of memory.
+
+    Args:
+        key_fields (iterable): Names of the row fields making up the key.
+        policy (str): `'last'` keeps the last occurrence of a key, `'first'`
+            keeps the first one.
+        memory_budget (int): Bytes the exact hash maps may use before
+            switching to Bloom filters. The seen and candidate filters then
+            share half of it, the verified statistics get the other half.
+    """
+
+    def __init__(self, key_fields, policy=LAST_WINS,
+                 memory_budget=DUPLICATE_MEMORY_BUDGET):
+        if policy not in POLICIES:
+            raise ValueError(
+                f"Unknown duplicate policy '{policy}', expected one of {POLICIES}")
+        self.key_fields = tuple(key_fields)
+        self.policy = policy
+        self.memory_budget = memory_budget
+        # Exact mode: digest -> position of its first occurrence
+        self._seen = {}
+        # digest -> [first position, last position, occurrences]
+        self._stats = {}
+        # Bloom mode
+        self._seen_filter = None
+        self._candidate_filter = None
+        self._verified = {}
+
+    @property
+    def exact(self):
+        return self._seen_filter is None
+
+    @property
+    def needs_verification(self):
+        """
+        Whether a verification pass is required before calling `finish`.
+        """
+        return not self.exact
+
+    @property
+    def duplicates(self):
+        """
+        Number of rows dropped because another row has the same key.
+        """
+        return sum(count - 1 for _, _, count in self._stats.values())
+
+    def digest(self, row):
+        key = '\x1f'.join(str(row.get(field) or '').strip()
+                          for field in self.key_fields)
+        return hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+
+    @staticmethod
+    def _record(stats, digest, position, count=1, last=None):
+        entry = stats.get(digest)
+        last = position if last is None else last
+        if entry is None:
+            stats[digest] = [position, last, count]
+        else:
+            entry[0] = min(entry[0], position)
+            entry[1] = max(entry[1], last)
+            entry[2] += count
+
+    def _entry(self, digest):
+        if digest in self._stats:
+            return self._stats[digest]
+        if digest in self._seen:
+            position = self._seen[digest]
+            return [position, position, 1]
+        return None
+
+    def _switch_to_bloom(self):
+        self._seen_filter = BloomFilter(self.memory_budget // 4)
+        self._candidate_filter = BloomFilter(self.memory_budget // 4)
+        for digest in self._seen:
+            self._seen_filter.add(digest)
+        for digest in self._stats:
+            self._candidate_filter.add(digest)
+        self._seen = {}
+        self._stats = {}
+
+    def _check_budget(self):
+        if (len(self._seen) + len(self._stats)) * EXACT_ENTRY_COST > self.memory_budget:
+            self._switch_to_bloom()
+
+    def _check_verified_budget(self):
+        if len(self._verified) * EXACT_ENTRY_COST > self.memory_budget // 2:
+            raise DuplicateBudgetExceeded(
+                f'Too many duplicated keys to verify within {self.memory_budget} bytes')
+
+    def add(self, position, row):
+        """
+        Scan pass: register the key of the row at `position`.
+        """
+        digest = self.digest(row)
+        if self.exact:
+            if digest in self._stats:
+                self._record(self._stats, digest, position)
+            elif digest in self._seen:
+                self._stats[digest] = [self._seen[digest], position, 2]
+                self._check_budget()
+            else:
+                self._seen[digest] = position
+                self._check_budget()
+        elif digest in self._seen_filter:
+            self._candidate_filter.add(digest)
+        else:
+            self._seen_filter.add(digest)
+
+    def verify(self, position, row):
+        """
+        Verification pass: keep exact statistics for candidate keys.
+        """
+        digest = self.digest(row)
+        if digest in self._candidate_filter:
+            self._record(self._verified, digest, position)
+            self._check_verified_budget()
+
+    def merge(self, other):
+        """
+        Merge the scan pass of another shard into this detector.
+        """
+        if self.exact and other.exact:
+            for digest, position in other._seen.items():
+                theirs = other._entry(digest)
+                ours = self._entry(digest)
+                if ours is None:
+                    self._seen[digest] = position
+                    if theirs[2] > 1:
+                        self._stats[digest] = list(theirs)
+                else:
+                    self._stats[digest] = [min(ours[0], theirs[0]),
+                                           max(ours[1], theirs[1]),
+                                           ours[2] + theirs[2]]
+                    self._seen[digest] = self._stats[digest][0]
+            self._check_budget()
+            return self
+
+        if self.exact:
+            self._switch_to_bloom()
+        if other.exact:
+            other._switch_to_bloom()
+        # A key is a candidate if it repeats within a shard or if it was seen
+        # by this shard and the other one.
+        self._candidate_filter = (self._candidate_filter |
+                                  other._candidate_filter |
+                                  (self._seen_filter & other._seen_filter))
+        self._seen_filter = self._seen_filter | other._seen_filter
+        return self
+
+    def verifier(self):
+        """
+        A detector sharing this one's candidates, for a shard's verification pass.
+        """
+        detector = DuplicateDetector(self.key_fields, policy=self.policy,
+                                     memory_budget=self.memory_budget)
+        detector._seen_filter = self._seen_filter
+        detector._candidate_filter = self._candidate_filter
+        return detector
+
+    def merge_verified(self, other):
+        """
+        Merge the verification pass of another shard into this detector.
+        """
+        for digest, (first, last, count) in other._verified.items():
+            self._record(self._verified, digest, first, count=count, last=last)
+        self._check_verified_budget()
+        return self
+
+    def finish(self):
+        """
+        Settle which keys are duplicated once all passes are done.
+        """
+        if not self.exact:
+            self._stats = {digest: entry for digest, entry in self._verified.items()
+                           if entry[2] > 1}
+            self._verified = {}
+        return self
+
+    def is_winner(self, position, row):
+        """
+        Whether the row at `position` should be imported.
+        """
+        entry = self._stats.get(self.digest(row))
+        if entry is None:
+            return True
+        return position == (entry[0] if self.policy == FIRST_WINS else entry[1])
+
+
+def merge_detectors(detectors):
+    """
+    Merge the scan passes of the detectors of every shard of an import.
+
+    The detectors must be given in shard order. Once merged, if
+    `needs_verification` is set each shard runs its verification pass on
+    `merged.verifier()` and the results are folded back with
+    `merged.merge_verified`. Then call `finish` and share the merged detector
+    with the shards for the import pass.
+    """
+    detectors = list(detectors)
+    merged = detectors[0]
+    for detector in detectors[1:]:
+        merged.merge(detector)
+    return merged
@@ -0,0 +1,286 @@
+"""
+Column mapping and type plans for recurring import layouts.
+
+Suppliers tend to send the same file layout every time. The first time a
+layout is seen, `LayoutPlan.infer` maps its columns to model fields and works
+out how to coerce their values (date format, decimal scale and separator...)
+from a capped sample of rows. The plan is stored under a fingerprint of the
+header and of the value shapes of the first rows, so later files with the
+same layout reuse it without any inference. Stored plans are cached until
+their `ImportLayout` is saved again or deleted.
+
+Columns that match no field are ignored; they are listed in
+`LayoutPlan.ignored_columns` and in the import summary.
+
+Example:
+    plan = resolve_layout('product', ProductSerializer, open_records)
+    importer.import_records(plan.apply_records(open_records()))
+"""
+
+import datetime
+import decimal
+import hashlib
+import itertools
+import json
+import re
+
+from django.core.cache import cache
+from django.db import models
+
+from services.settings.upload import LAYOUT_INFERENCE_MAX_ROWS, LAYOUT_SIGNATURE_ROWS
+
+LAYOUT_CACHE_KEY = 'import_layouts:{}'
+
+DATE_FORMATS = (
+    '%Y-%m-%d', '%d/%m/%Y', '%m/%d/%Y', '%d.%m.%Y', '%d-%m-%Y',
+    '%b %d %Y', '%d %b %Y', '%d-%b-%Y',
+)
+TIME_FORMATS = ('', ' %H:%M', ' %H:%M:%S', 'T%H:%M:%S', ' %I:%M %p')
+
+TRUE_VALUES = {'1', 'true', 't', 'yes', 'y'}
+FALSE_VALUES = {'0', 'false', 'f', 'no', 'n'}
+
+SHAPES = (
+    ('int', re.compile(r'^[+-]?\d+$')),
+    ('decimal', re.compile(r'^[^\d\s]?\s?[+-]?[\d,. ]*\d$')),
+    ('date', re.compile(r'^\d{1,4}[-/.]\d{1,2}[-/.]\d{1,4}')),
+)
+EUROPEAN_DECIMAL = re.compile(r'^[+-]?\d{1,3}(\.\d{3})*,\d+$|^[+-]?\d+,\d+$')
+# Also a number with thousands separators, e.g. "1,234"
+AMBIGUOUS_DECIMAL = re.compile(r'^[+-]?\d{1,3}(,\d{3})+$')
+NUMBER_NOISE = re.compile(r'[^\d.,+-]')
+
+
+def normalize_name(name):
+    return re.sub(r'[^a-z0-9]+', '_', str(name).strip().lower()).strip('_')
+
+
+def value_shape(value):
+    value = (value or '').strip()
+    if not value:
+        return None
+    for shape, pattern in SHAPES:
+        if pattern.match(value):
+            return shape
+    return 'text'
+
+
+def fingerprint(model_name, header, rows):
+    """
+    Fingerprint a layout from its header and the value shapes of `rows`.
+    """
+    shapes = [sorted({value_shape(row.get(column)) for row in rows} - {None})
+              for column in header]
+    signature = json.dumps([model_name, [normalize_name(column) for column in header],
+                            shapes])
+    return hashlib.sha256(signature.encode('utf-8')).hexdigest()
+
+
+def _detect_date_format(values, with_time):
+    time_formats = TIME_FORMATS if with_time else ('',)
+    for date_format, time_format in itertools.product(DATE_FORMATS, time_formats):
+        candidate = date_format + time_format
+        try:
+            for value in values:
+                datetime.datetime.strptime(value, candidate)
+        except ValueError:
+            continue
+        return candidate
+    return None
+
+
+class LayoutPlan:
+    """
+    Maps the columns of a file to model fields and coerces their values.
+
+    Each column entry holds the `source` column, the target `field` (or
+    `None` when the column is ignored) and a `coercion` among `str`, `int`,
+    `decimal` (with `scale` and `separator`), `date`/`datetime` (with
+    `format`) and `bool`.
+    """
+
+    def __init__(self, columns):
+        self.columns = columns
+        self._converters = [(column['source'], column['field'], self._converter(column))
+                            for column in columns if column['field']]
+
+    @staticmethod
+    def _converter(column):
+        coercion = column['coercion']
+        if coercion == 'int':
+            return lambda value: str(int(NUMBER_NOISE.sub('', value).replace(',', '')))
+        if coercion == 'decimal':
+            exponent = decimal.Decimal(1).scaleb(-column['scale'])
+            european = column.get('separator') == ','
+
+            def to_decimal(value):
+                value = NUMBER_NOISE.sub('', value)
+                if european:
+                    value = value.replace('.', '').replace(',', '.')
+                else:
+                    value = value.replace(',', '')
+                return str(decimal.Decimal(value).quantize(
+                    exponent, rounding=decimal.ROUND_HALF_UP))
+            return to_decimal
+        if coercion in ('date', 'datetime'):
+            date_format = column['format']
+
+            def to_date(value):
+                parsed = datetime.datetime.strptime(value, date_format)
+                return (parsed.date() if coercion == 'date' else parsed).isoformat()
+            return to_date
+        if coercion == 'bool':
+            def to_bool(value):
+                lowered = value.lower()
+                if lowered in TRUE_VALUES:
+                    return 'true'
+                if lowered in FALSE_VALUES:
+                    return 'false'
+                return value
+            return to_bool
+        return None
+
+    @property
+    def ignored_columns(self):
+        """
+        Source columns that are not mapped to a field.
+        """
+        return [column['source'] for column in self.columns if not column['field']]
+
+    def apply(self, row):
+        """
+        Map and coerce a raw row. Values that cannot be coerced are passed on
+        unchanged so that validation rejects them with a proper error. Values
+        of `ignored_columns` are left out.
+        """
+        mapped = {}
+        for source, field, converter in self._converters:
+            value = row.get(source)
+            if value is not None and converter is not None:
+                value = value.strip()
+                if value:
+                    try:
+                        value = converter(value)
+                    except (ValueError, ArithmeticError):
+                        pass
+            mapped[field] = value
+        return mapped
+
+    def apply_records(self, records):
+        for line_number, row in records:
+            yield line_number, self.apply(row)
+
+    @classmethod
+    def infer(cls, serializer_class, header, rows):
+        """
+        Infer a plan for `header` from a sample of `rows`.
+
+        Columns are matched by normalized name against the writable fields of
+        `serializer_class`, optionally prefixed with the model name, and the
+        column names/verbose names of the model fields behind them. Coercions are inferred for model fields only.
+
+        Args:
+            serializer_class: The serializer validating the imported rows.
+            header (list): The file's column names.
+            rows (list): Sample rows, as dicts keyed by column name.
+        """
+        model = serializer_class.Meta.model
+        model_fields = {field.name: field for field in model._meta.concrete_fields}
+        lookup = {}
+        for name, serializer_field in serializer_class().fields.items():
+            if serializer_field.read_only:
+                continue
+            field = model_fields.get(serializer_field.source)
+            aliases = [name, f'{model._meta.model_name}_{name}']
+            if field is not None:
+                aliases += [field.attname, field.verbose_name]
+            for alias in aliases:
+                lookup.setdefault(normalize_name(alias), (name, field))
+
+        columns, mapped = [], set()
+        for source in header:
+            name, field = lookup.get(normalize_name(source), (None, None))
+            if name is None or name in mapped:
+                columns.append({'source': source, 'field': None, 'coercion': None})
+                continue
+            mapped.add(name)
+            values = [row[source].strip() for row in rows if (row.get(source) or '').strip()]
+            coercion = ({'coercion': 'str'} if field is None
+                        else cls._infer_coercion(field, values))
+            columns.append({'source': source, 'field': name, **coercion})
+        return cls(columns)
+
+    @staticmethod
+    def _infer_coercion(field, values):
+        if isinstance(field, models.DecimalField):
+            numbers = [NUMBER_NOISE.sub('', value) for value in values]
+            # "1,234" reads as a thousand unless another value shows a
+            # decimal comma
+            european = (all(EUROPEAN_DECIMAL.match(number) for number in numbers)
+                        and not all(AMBIGUOUS_DECIMAL.match(number) for number in numbers))
+            return {'coercion': 'decimal', 'scale': field.decimal_places,
+                    'separator': ',' if european else '.'}
+        # Foreign keys are passed as written, their serializer field resolves them
+        if isinstance(field, models.IntegerField):
+            return {'coercion': 'int'}
+        if isinstance(field, models.BooleanField):
+            return {'coercion': 'bool'}
+        if isinstance(field, (models.DateTimeField, models.DateField)):
+            with_time = isinstance(field, models.DateTimeField)
+            date_format = _detect_date_format(values, with_time) if values else None
+            if date_format:
+                return {'coercion': 'datetime' if with_time else 'date',
+                        'format': date_format}
+        return {'coercion': 'str'}
+
+    def to_json(self):
+        return self.columns
+
+    @classmethod
+    def from_json(cls, columns):
+        return cls(columns)
+
+
+def resolve_layout(model_name, serializer_class, open_records):
+    """
+    Return the plan for the layout of a file, inferring and storing it if
+    the layout has never been seen.
+
+    Only the first `LAYOUT_SIGNATURE_ROWS` rows are read for known layouts,
+    and inference never reads more than `LAYOUT_INFERENCE_MAX_ROWS` rows.
+
+    Args:
+        model_name (str): Name of the target model, part of the fingerprint.
+        serializer_class: The serializer validating the imported rows.
+        open_records (callable): Returns a new iterator of `(line_number, row)`.
+
+    Returns:
+        LayoutPlan: The plan mapping the file's columns to the model.
+    """
+    from chunked_upload.models import ImportLayout
+
+    signature_rows = [row for _, row in itertools.islice(
+        open_records(), LAYOUT_SIGNATURE_ROWS)]
+    if not signature_rows:
+        return LayoutPlan([])
+    header = list(signature_rows[0].keys())
+    layout_fingerprint = fingerprint(model_name, header, signature_rows)
+    cache_key = LAYOUT_CACHE_KEY.format(layout_fingerprint)
+
+    columns = cache.get(cache_key)
+    if columns is None:
+        layout = ImportLayout.objects.filter(fingerprint=layout_fingerprint).first()
+        if layout is None:
+            sample = [row for _, row in itertools.islice(
+                open_records(), LAYOUT_INFERENCE_MAX_ROWS)]
+            plan = LayoutPlan.infer(serializer_class, header, sample)
+            layout, _ = ImportLayout.objects.get_or_create(
+                fingerprint=layout_fingerprint,
+                defaults={'model_name': model_name, 'plan': plan.to_json()},
+            )
+        columns = layout.plan
+        cache.set(cache_key, columns, timeout=None)
+    # Layouts are matched on normalized column names: read this file's columns
+    # under their own spelling
+    return LayoutPlan.from_json([{**column, 'source': source}
+                                 for column, source in zip(columns, header)])
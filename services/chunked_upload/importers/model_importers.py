@@ -0,0 +1,248 @@
+"""
+Importers loading uploaded rows into the models of the serializer registry.
+
+Example:
+    importer = ModelImporter('product', report=RejectedRowsReport(path))
+    importer.import_records(iter_csv_records(file_obj))
+"""
+
+import itertools
+import os
+
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+from common.serializers.registry_serializers import RedisSerializerRegistry, is_read_only_serializer
+from services.settings.upload import IMPORT_BATCH_SIZE, IMPORTER_CLASSES, REJECTS_EXT
+from utils.data_versions import bump_data_version_on_commit
+from .duplicates import DuplicateDetector, LAST_WINS
+from .layouts import resolve_layout
+from .readers import iter_csv_records, iter_sheet_records
+from .reports import RejectedRowsReport
+
+
+class ModelImporter:
+    """
+    Validates rows with the serializer registered for a model and writes the
+    valid ones in batches with `bulk_create`.
+
+    Rejected rows are handed to `report` (a `RejectedRowsReport`) as soon as
+    they fail validation instead of being collected in memory.
+
+    Raises:
+        ValueError: If no serializer is registered for the model or if it is
+            read-only (registered for exports).
+    """
+
+    batch_size = IMPORT_BATCH_SIZE
+
+    def __init__(self, model_name, report=None, batch_size=None):
+        self.model_name = model_name
+        self.serializer_class = self.get_serializer_class()
+        if is_read_only_serializer(self.serializer_class):
+            raise ValueError(f"'{model_name}' is read-only and cannot be imported")
+        self.model = self.serializer_class.Meta.model
+        self.report = report
+        if batch_size is not None:
+            self.batch_size = batch_size
+        self.m2m_fields = {
+            field.name for field in self.model._meta.many_to_many}
+        self.imported = 0
+        self.rejected = 0
+        self.duplicates = 0
+        # File columns the layout plan does not map to any field
+        self.ignored_columns = []
+
+    def get_serializer_class(self):
+        return RedisSerializerRegistry().get_serializer_class(self.model_name)
+
+    def validate(self, line_number, row):
+        """
+        Validate a row, returning its validated data or `None` if rejected.
+        """
+        serializer = self.serializer_class(data=row)
+        if serializer.is_valid():
+            return serializer.validated_data
+        self.reject(line_number, serializer.errors)
+        return None
+
+    def reject(self, line_number, errors):
+        """
+        Count a rejected row and record it in the report.
+        """
+        self.rejected += 1
+        if self.report is not None:
+            self.report.write(line_number, errors)
+
+    def build_instance(self, data):
+        return self.model(**{key: value for key, value in data.items()
+                             if key not in self.m2m_fields})
+
+    def write_batch(self, batch):
+        """
+        Write a batch of `(line_number, validated_data)` in a single transaction.
+        """
+        with transaction.atomic():
+            self.model.objects.bulk_create(
+                [self.build_instance(data) for _, data in batch])
+        # bulk_create does not send post_save
+        bump_data_version_on_commit(self.model)
+        self.imported += len(batch)
+
+    def import_records(self, records):
+        """
+        Import an iterable of `(line_number, row)` records.
+
+        Returns:
+            dict: The import summary, see `summary`.
+        """
+        batch = []
+        for line_number, row in records:
+            data = self.validate(line_number, row)
+            if data is None:
+                continue
+            batch.append((line_number, data))
+            if len(batch) >= self.batch_size:
+                self.write_batch(batch)
+                batch = []
+        if batch:
+            self.write_batch(batch)
+        return self.summary()
+
+    def import_deduplicated(self, open_records, detector):
+        """
+        Import records keeping a single row per key.
+
+        The file is read up to three times (scan, verification if the detector
+        fell back to a Bloom filter, import), so `open_records` must return a
+        fresh iterator of `(line_number, row)` records on every call.
+
+        Args:
+            open_records (callable): Returns a new iterator over the records.
+            detector (DuplicateDetector): The detector deciding which rows win.
+
+        Returns:
+            dict: The import summary, see `summary`.
+        """
+        for line_number, row in open_records():
+            detector.add(line_number, row)
+        if detector.needs_verification:
+            for line_number, row in open_records():
+                detector.verify(line_number, row)
+        detector.finish()
+        self.duplicates = detector.duplicates
+
+        return self.import_records(
+            (line_number, row) for line_number, row in open_records()
+            if detector.is_winner(line_number, row))
+
+    def summary(self):
+        return {
+            'model': self.model_name,
+            'imported': self.imported,
+            'rejected': self.rejected,
+            'duplicates': self.duplicates,
+            'ignored_columns': self.ignored_columns,
+        }
+
+
+def get_importer_class(model_name):
+    """
+    The importer class handling `model_name`, `ModelImporter` by default.
+    """
+    importer_path = IMPORTER_CLASSES.get(model_name)
+    return import_string(importer_path) if importer_path else ModelImporter
+
+
+def import_upload(upload, model_name, batch_size=None, key_fields=None,
+                  duplicate_policy=LAST_WINS):
+    """
+    Import a completed CSV upload into the model registered as `model_name`.
+
+    Columns are mapped and coerced with the plan of the file's layout (see
+    `resolve_layout`), inferred only the first time a layout is seen.
+    Rejected rows are streamed to a compressed report stored next to the
+    upload and linked through `upload.rejects_file`. When `key_fields` is
+    given, rows repeating a key already present in the file are dropped
+    according to `duplicate_policy` before they reach the database.
+
+    Args:
+        upload (ChunkedUpload): The completed upload.
+        model_name (str): Registry name of the target model.
+        batch_size (int, optional): Rows written per batch.
+        key_fields (iterable, optional): Model fields identifying a record.
+        duplicate_policy (str): `'last'` or `'first'` occurrence wins.
+
+    Returns:
+        dict: The import summary.
+    """
+    report_name = os.path.splitext(upload.file.name)[0] + REJECTS_EXT
+    report = RejectedRowsReport(upload.file.storage.path(report_name))
+    importer_class = get_importer_class(model_name)
+    importer = importer_class(model_name, report=report, batch_size=batch_size)
+
+    def open_raw_records():
+        upload.file.close()
+        upload.file.open(mode='rb')
+        return iter_csv_records(upload.file)
+
+    def open_records():
+        return plan.apply_records(open_raw_records())
+
+    try:
+        plan = resolve_layout(model_name, importer.serializer_class, open_raw_records)
+        importer.ignored_columns = plan.ignored_columns
+        with report:
+            if key_fields:
+                detector = DuplicateDetector(key_fields, policy=duplicate_policy)
+                importer.import_deduplicated(open_records, detector)
+            else:
+                importer.import_records(open_records())
+    finally:
+        upload.file.close()
+
+    upload.rejected_rows = report.rows
+    upload.rejects_file.name = report_name if report.created else None
+    upload.save(update_fields=['rejected_rows', 'rejects_file'])
+    return importer.summary()
+
+
+def import_sheet(reader, spreadsheet_id, worksheet_name, model_name, batch_size=None,
+                 report=None):
+    """
+    Import a Google Sheets worksheet into the model registered as `model_name`.
+
+    The worksheet is streamed window by window (see `ReadSheets.iter_rows`)
+    through the same layout plans and batched writes as CSV uploads, so
+    memory stays bounded whatever the size of the sheet.
+
+    Args:
+        reader (ReadSheets): Client reading the spreadsheet.
+        spreadsheet_id (str): Id of the spreadsheet.
+        worksheet_name (str): Title of the worksheet, its first row is the
+            header.
+        model_name (str): Registry name of the target model.
+        batch_size (int, optional): Rows written per batch.
+        report (RejectedRowsReport, optional): Where rejected rows go.
+
+    Returns:
+        dict: The import summary.
+    """
+    importer_class = get_importer_class(model_name)
+    importer = importer_class(model_name, report=report, batch_size=batch_size)
+
+    records = iter_sheet_records(reader.iter_rows(spreadsheet_id, worksheet_name))
+
+    def open_raw_records():
+        # The layout sample is replayed from the single stream instead of
+        # reading the sheet from the API again
+        nonlocal records
+        records, sample = itertools.tee(records)
+        return sample
+
+    plan = resolve_layout(model_name, importer.serializer_class, open_raw_records)
+    importer.ignored_columns = plan.ignored_columns
+    if report is None:
+        return importer.import_records(plan.apply_records(records))
+    with report:
+        return importer.import_records(plan.apply_records(records))
@@ -0,0 +1,239 @@
+"""
+Pipelined ingestion of uploads that are still in progress.
+
+Instead of waiting for the whole file and its checksum, a pipelined import
+tails the `.part` file while chunks are appended. Records are parsed and
+validated as soon as their bytes are durable (covered by `upload.offset`)
+and stored as `StagedImportRow`s. Columns are mapped and coerced with the
+plan of the file's layout, like `import_upload` does. Once the upload is
+marked complete, which only happens after its checksum matched, the staged
+rows are written to the target model in one transaction, keeping a single
+row per key when `key_fields` are given. If the upload is aborted, expires
+or is deleted (checksum mismatch), the staged rows are discarded.
+
+Example:
+    stage_upload(upload, 'product')  # blocks until the upload is finished
+"""
+
+import io
+import itertools
+import os
+import time
+
+from django.core.exceptions import ObjectDoesNotExist
+from django.db import transaction
+
+from services.settings.upload import PIPELINE_POLL_INTERVAL, REJECTS_EXT
+from utils.data_versions import bump_data_version_on_commit
+from chunked_upload.models import ChunkedUpload, StagedImportRow
+from .duplicates import DuplicateDetector, LAST_WINS
+from .layouts import resolve_layout
+from .model_importers import ModelImporter
+from .readers import iter_csv_records
+from .reports import RejectedRowsReport
+
+
+class UploadTail(io.RawIOBase):
+    """
+    A binary file object over an upload that is still receiving chunks.
+
+    Reads never go past `upload.offset`; when all durable bytes have been
+    read, `readinto` waits for the next chunk, polling the upload every
+    `poll_interval` seconds. End of file is reached once the upload is no
+    longer in progress and every durable byte has been read.
+    """
+
+    poll_interval = PIPELINE_POLL_INTERVAL
+
+    def __init__(self, upload, check_abort=None):
+        self.upload = upload
+        self.check_abort = check_abort
+        # The file descriptor survives the `.part` -> `.done` rename
+        self._file = open(upload.file.path, mode='rb')
+        self._position = 0
+        self._durable = upload.offset
+
+    def readable(self):
+        return True
+
+    def _wait_for_bytes(self):
+        """
+        Wait until more durable bytes are available. Returns `False` once no
+        more bytes will arrive.
+        """
+        while self._position >= self._durable:
+            if self.check_abort is not None:
+                self.check_abort()
+            self.upload.refresh_from_db(fields=['offset', 'status'])
+            self._durable = self.upload.offset
+            if self._position < self._durable:
+                break
+            if self.upload.status != ChunkedUpload.UPLOADING or self.upload.expired:
+                return False
+            time.sleep(self.poll_interval)
+        return True
+
+    def readinto(self, buffer):
+        if not self._wait_for_bytes():
+            return 0
+        data = self._file.read(min(len(buffer), self._durable - self._position))
+        buffer[:len(data)] = data
+        self._position += len(data)
+        return len(data)
+
+    @property
+    def exhausted(self):
+        return self._position >= self.upload.offset
+
+    def close(self):
+        self._file.close()
+        super().close()
+
+
+class StagingImporter(ModelImporter):
+    """
+    A `ModelImporter` that stages validated rows for an upload instead of
+    writing them to the target model until `commit` is called.
+    """
+
+    def __init__(self, model_name, upload, **kwargs):
+        super().__init__(model_name, **kwargs)
+        self.upload = upload
+        self.staged = 0
+
+    def staged_data(self, data):
+        """
+        JSON-ready concrete field values of a validated row.
+        """
+        instance = self.build_instance(data)
+        return {field.attname: getattr(instance, field.attname)
+                for field in self.model._meta.concrete_fields
+                if field.name in data}
+
+    def write_batch(self, batch):
+        StagedImportRow.objects.bulk_create([
+            StagedImportRow(upload=self.upload, data=self.staged_data(data))
+            for _, data in batch
+        ])
+        self.staged += len(batch)
+
+    def deduplicate(self, staged_rows, detector):
+        """
+        Run the scan (and verification) passes of `detector` over the staged
+        rows, positioned by primary key so they order like the file.
+        """
+        for pk, data in staged_rows.iterator(chunk_size=self.batch_size):
+            detector.add(pk, data)
+        if detector.needs_verification:
+            for pk, data in staged_rows.iterator(chunk_size=self.batch_size):
+                detector.verify(pk, data)
+        detector.finish()
+        self.duplicates = detector.duplicates
+
+    def commit(self, detector=None):
+        """
+        Write every staged row to the target model in one transaction.
+
+        Args:
+            detector (DuplicateDetector, optional): Keyed on the concrete
+                field names of the staged data; only its winning rows are
+                written.
+        """
+        staged_rows = self.upload.staged_rows.order_by('pk').values_list('pk', 'data')
+        if detector is not None:
+            self.deduplicate(staged_rows, detector)
+        with transaction.atomic():
+            batch = []
+            for pk, data in staged_rows.iterator(chunk_size=self.batch_size):
+                if detector is not None and not detector.is_winner(pk, data):
+                    continue
+                batch.append(self.model(**data))
+                if len(batch) >= self.batch_size:
+                    self.model.objects.bulk_create(batch)
+                    self.imported += len(batch)
+                    batch = []
+            if batch:
+                self.model.objects.bulk_create(batch)
+                self.imported += len(batch)
+            self.discard()
+        bump_data_version_on_commit(self.model)
+
+    def discard(self):
+        """
+        Drop every staged row of the upload.
+        """
+        self.upload.staged_rows.all().delete()
+
+    def summary(self):
+        return {**super().summary(), 'staged': self.staged}
+
+
+def stage_upload(upload, model_name, batch_size=None, check_abort=None,
+                 key_fields=None, duplicate_policy=LAST_WINS):
+    """
+    Parse and stage an upload while it is being uploaded, then commit or
+    discard the staged rows depending on how the upload ends.
+
+    The layout plan is resolved from the first rows, so staging starts once
+    they are durable. Duplicate keys can only be settled once the whole file
+    is staged: unlike `import_upload`, rows are deduplicated after
+    validation, when they are committed.
+
+    Args:
+        upload (ChunkedUpload): The upload in progress.
+        model_name (str): Registry name of the target model.
+        batch_size (int, optional): Rows staged/written per batch.
+        check_abort (callable, optional): Called while waiting for chunks;
+            should raise to stop the import (staged rows are discarded).
+        key_fields (iterable, optional): Model fields identifying a record.
+        duplicate_policy (str): `'last'` or `'first'` occurrence wins.
+
+    Returns:
+        dict: The import summary, with `committed` telling whether the
+        staged rows were written.
+    """
+    report_name = os.path.splitext(upload.file.name)[0] + REJECTS_EXT
+    report = RejectedRowsReport(upload.file.storage.path(report_name))
+    importer = StagingImporter(model_name, upload, report=report,
+                               batch_size=batch_size)
+    tail = UploadTail(upload, check_abort=check_abort)
+    records = iter_csv_records(io.BufferedReader(tail))
+
+    def open_raw_records():
+        # The file may be renamed while uploading, so the layout sample is
+        # replayed from the single tail instead of reopening it
+        nonlocal records
+        records, sample = itertools.tee(records)
+        return sample
+
+    detector = None
+    if key_fields:
+        # Staged rows hold concrete field values by attribute name
+        attnames = [importer.model._meta.get_field(name).attname for name in key_fields]
+        detector = DuplicateDetector(attnames, policy=duplicate_policy)
+
+    try:
+        plan = resolve_layout(model_name, importer.serializer_class, open_raw_records)
+        importer.ignored_columns = plan.ignored_columns
+        with report:
+            importer.import_records(plan.apply_records(records))
+        committed = (upload.status == ChunkedUpload.COMPLETE and tail.exhausted)
+    except ObjectDoesNotExist:
+        # The upload was deleted, e.g. after a checksum mismatch; its staged
+        # rows went with it.
+        return {**importer.summary(), 'committed': False}
+    except BaseException:
+        importer.discard()
+        raise
+    finally:
+        tail.close()
+
+    if committed:
+        importer.commit(detector)
+    else:
+        importer.discard()
+
+    upload.rejected_rows = report.rows
+    upload.rejects_file.name = report_name if report.created else None
+    upload.save(update_fields=['rejected_rows', 'rejects_file'])
+    return {**importer.summary(), 'committed': committed}
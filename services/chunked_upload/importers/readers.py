@@ -0,0 +1,63 @@
+"""
+Readers turning uploaded files and sheets into `(line_number, row)` records.
+"""
+
+import codecs
+import csv
+
+
+def iter_csv_records(file_obj, encoding='utf-8-sig'):
+    """
+    Lazily read a CSV file with a header row.
+
+    Args:
+        file_obj: A binary file object positioned at the start of the file.
+        encoding (str): Text encoding of the file.
+
+    Yields:
+        tuple: `(line_number, row)` where `row` maps header names to values and
+        `line_number` is the line the record starts on in the original file.
+    """
+    reader = csv.DictReader(codecs.getreader(encoding)(file_obj))
+    # Reading the field names consumes the header row
+    if reader.fieldnames is None:
+        return
+    line_number = reader.line_num + 1
+    for row in reader:
+        yield line_number, row
+        line_number = reader.line_num + 1
+
+
+def cell_text(value):
+    """
+    The text of an unformatted Google Sheets cell, as a CSV export would
+    hold it (`12` rather than `12.0`, `true` for booleans).
+    """
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def iter_sheet_records(rows):
+    """
+    Turn the rows of a worksheet into records, the first row being the header.
+
+    Args:
+        rows: Iterable of `(row_number, values)`, see `ReadSheets.iter_rows`.
+
+    Yields:
+        tuple: `(line_number, row)` like `iter_csv_records`, with missing
+        trailing cells as empty strings. Empty rows are skipped.
+    """
+    header = None
+    for row_number, values in rows:
+        if header is None:
+            header = [cell_text(value) for value in values]
+            continue
+        if not values:
+            continue
+        cells = [cell_text(value) for value in values[:len(header)]]
+        cells += [''] * (len(header) - len(cells))
+        yield row_number, dict(zip(header, cells))
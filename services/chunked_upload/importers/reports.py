@@ -0,0 +1,101 @@
+"""
+Reports produced while importing a completed upload.
+"""
+
+import csv
+import gzip
+import os
+
+from rest_framework.exceptions import ErrorDetail
+
+
+def flatten_errors(errors, prefix=''):
+    """
+    Flatten serializer-style errors into `(field, code, message)` tuples.
+
+    Args:
+        errors: A serializer `errors` dict, a list of errors or a single error.
+        prefix (str): Dotted path of the enclosing field, used for nested errors.
+
+    Yields:
+        tuple: `(field, code, message)` for every individual error.
+    """
+    if isinstance(errors, dict):
+        for field, field_errors in errors.items():
+            path = f'{prefix}.{field}' if prefix else str(field)
+            yield from flatten_errors(field_errors, path)
+    elif isinstance(errors, (list, tuple)):
+        for error in errors:
+            yield from flatten_errors(error, prefix)
+    else:
+        code = getattr(errors, 'code', None) if isinstance(
+            errors, ErrorDetail) else 'invalid'
+        yield prefix, code, str(errors)
+
+
+class RejectedRowsReport:
+    """
+    Streams rows rejected by an import to a gzip-compressed CSV sidecar file.
+
+    The file is only created when the first row is rejected, and every error
+    goes straight through the compressor, so memory use stays flat no matter
+    how many rows are rejected. Each error of a row becomes one CSV line
+    carrying the row's original line number.
+
+    Example:
+        with RejectedRowsReport(path) as report:
+            report.write(line_number, serializer.errors)
+        report.rows  # number of rejected rows
+    """
+
+    header = ('line_number', 'field', 'code', 'message')
+
+    def __init__(self, path, compresslevel=6):
+        self.path = path
+        self.compresslevel = compresslevel
+        self.rows = 0
+        self._file = None
+        self._writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def created(self):
+        """
+        Whether any row was rejected, i.e. whether the report file exists.
+        """
+        return self.rows > 0
+
+    def _open(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._file = gzip.open(self.path, mode='wt', newline='',
+                               compresslevel=self.compresslevel)
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(self.header)
+
+    def write(self, line_number, errors):
+        """
+        Record a rejected row.
+
+        Args:
+            line_number (int): Line of the row in the original file.
+            errors: Serializer errors (or any error detail) for the row.
+        """
+        if self._writer is None:
+            self._open()
+        for field, code, message in flatten_errors(errors):
+            self._writer.writerow((line_number, field, code, message))
+        self.rows += 1
+
+    def close(self):
+        """
+        Flush and close the report file if it was created.
+        """
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            self._writer = None
@@ -0,0 +1,126 @@
+"""
+Bulk import of `CustomUser` accounts.
+
+Password hashing (PBKDF2 by default) costs around 100 ms of CPU per user, so
+the importer hashes each batch in a pool of worker processes, skips hashing
+for rows that already carry a `password_hash`, checks email/username
+uniqueness with one query per batch and writes users with `bulk_create`.
+"""
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import django
+from django.contrib.auth.hashers import make_password
+from django.db.models import Q
+from rest_framework.exceptions import ErrorDetail
+
+from services.settings.upload import USER_IMPORT_WORKERS
+from users.serializers import UserImportSerializer
+from .model_importers import ModelImporter
+
+
+def create_hashing_executor(workers=None):
+    """
+    Create the executor hashing passwords.
+
+    Worker processes are used so hashing scales with the number of cores.
+    Daemonic processes (e.g. prefork Celery workers) cannot have children; a
+    thread pool is used there instead, which still runs in parallel because
+    `hashlib.pbkdf2_hmac` releases the GIL.
+    """
+    workers = workers or USER_IMPORT_WORKERS or os.cpu_count() or 1
+    if multiprocessing.current_process().daemon:
+        return ThreadPoolExecutor(max_workers=workers)
+    return ProcessPoolExecutor(max_workers=workers, initializer=django.setup)
+
+
+def hash_passwords(passwords, executor, workers):
+    """
+    Hash `passwords` with Django's default hasher on `executor`.
+    """
+    chunksize = max(1, len(passwords) // (workers * 4))
+    return list(executor.map(make_password, passwords, chunksize=chunksize))
+
+
+class UserImporter(ModelImporter):
+    """
+    Imports `CustomUser` rows with parallel password hashing.
+
+    Args:
+        workers (int, optional): Number of hashing workers, every core by
+            default.
+        executor (Executor, optional): An existing executor to hash with.
+    """
+
+    def __init__(self, model_name='user', workers=None, executor=None, **kwargs):
+        super().__init__(model_name, **kwargs)
+        self.workers = workers or USER_IMPORT_WORKERS or os.cpu_count() or 1
+        self.executor = executor
+
+    def get_serializer_class(self):
+        return UserImportSerializer
+
+    def import_records(self, records):
+        if self.executor is not None:
+            return super().import_records(records)
+        with create_hashing_executor(self.workers) as executor:
+            self.executor = executor
+            try:
+                return super().import_records(records)
+            finally:
+                self.executor = None
+
+    def reject_conflicts(self, batch):
+        """
+        Reject rows whose email or username already exists in the database
+        or earlier in the batch, using a single query for the whole batch.
+        """
+        emails = {data['email'] for _, data in batch}
+        usernames = {data['username'] for _, data in batch}
+        taken = self.model.objects.filter(
+            Q(email__in=emails) | Q(username__in=usernames)
+        ).values_list('email', 'username')
+        taken_emails, taken_usernames = set(), set()
+        for email, username in taken:
+            taken_emails.add(email)
+            taken_usernames.add(username)
+
+        accepted = []
+        for line_number, data in batch:
+            errors = {}
+            if data['email'] in taken_emails:
+                errors['email'] = [ErrorDetail(
+                    'user with this email already exists.', code='unique')]
+            if data['username'] in taken_usernames:
+                errors['username'] = [ErrorDetail(
+                    'user with this username already exists.', code='unique')]
+            if errors:
+                self.reject(line_number, errors)
+                continue
+            taken_emails.add(data['email'])
+            taken_usernames.add(data['username'])
+            accepted.append((line_number, data))
+        return accepted
+
+    def hash_batch(self, batch):
+        """
+        Resolve the password of every row: keep pre-hashed values, hash plain
+        passwords in parallel and give rows without one an unusable password.
+        """
+        to_hash = [data for _, data in batch
+                   if not data.get('password_hash') and data.get('password')]
+        hashed = hash_passwords([data['password'] for data in to_hash],
+                                self.executor, self.workers)
+        for data, password in zip(to_hash, hashed):
+            data['password_hash'] = password
+        for _, data in batch:
+            data['password'] = data.pop('password_hash', None) or make_password(None)
+
+    def write_batch(self, batch):
+        batch = self.reject_conflicts(batch)
+        if not batch:
+            return
+        self.hash_batch(batch)
+        super().write_batch(batch)
@@ -0,0 +1,23 @@
+# Generated by Django 5.0.3 on 2026-10-18 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chunked_upload', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chunkedupload',
+            name='rejected_rows',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='chunkedupload',
+            name='rejects_file',
+            field=models.FileField(blank=True, max_length=255, null=True, upload_to='chunked_uploads/%Y/%m/%d'),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.0.3 on 2026-10-18 10:41
+
+import django.core.serializers.json
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chunked_upload', '0002_chunkedupload_rejects_file_rejected_rows'),
+    ]
+
+    operations = [
+        # The model switched to the UUID `upload_id` as its primary key
+        # without a migration; staged rows reference it
+        migrations.RemoveField(
+            model_name='chunkedupload',
+            name='id',
+        ),
+        migrations.AlterField(
+            model_name='chunkedupload',
+            name='upload_id',
+            field=models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False),
+        ),
+        migrations.AlterField(
+            model_name='chunkedupload',
+            name='status',
+            field=models.PositiveSmallIntegerField(choices=[(1, 'Incomplete'), (2, 'Complete'), (4, 'Aborted'), (5, 'Archived')], default=1),
+        ),
+        migrations.AddField(
+            model_name='chunkedupload',
+            name='pipelined',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.CreateModel(
+            name='StagedImportRow',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('data', models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('upload', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='staged_rows', to='chunked_upload.chunkedupload')),
+            ],
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.0.3 on 2026-10-18 12:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chunked_upload', '0003_chunkedupload_pipelined_stagedimportrow'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportLayout',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fingerprint', models.CharField(max_length=64, unique=True)),
+                ('model_name', models.CharField(max_length=100)),
+                ('plan', models.JSONField()),
+                ('created_on', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+    ]
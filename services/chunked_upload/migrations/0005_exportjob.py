@@ -0,0 +1,40 @@
+# Generated by Django 5.0.3 on 2026-10-18 14:21
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chunked_upload', '0004_importlayout'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExportJob',
+            fields=[
+                ('upload_id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('file', models.FileField(max_length=255, upload_to='chunked_uploads/%Y/%m/%d')),
+                ('filename', models.CharField(max_length=255)),
+                ('offset', models.BigIntegerField(default=0)),
+                ('created_on', models.DateTimeField(auto_now_add=True)),
+                ('status', models.PositiveSmallIntegerField(choices=[(1, 'Incomplete'), (2, 'Complete'), (4, 'Aborted'), (5, 'Archived')], default=1)),
+                ('completed_on', models.DateTimeField(blank=True, null=True)),
+                ('model_name', models.CharField(max_length=100)),
+                ('export_format', models.CharField(max_length=20)),
+                ('filters', models.JSONField(blank=True, default=dict)),
+                ('fingerprint', models.CharField(db_index=True, max_length=64)),
+                ('exported_rows', models.BigIntegerField(default=0)),
+                ('total_rows', models.BigIntegerField(blank=True, null=True)),
+                ('error', models.TextField(blank=True)),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='export_jobs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+    ]
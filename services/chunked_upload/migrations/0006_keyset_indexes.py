@@ -0,0 +1,31 @@
+# Generated by Django 5.0.3 on 2026-10-18 15:02
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chunked_upload', '0005_exportjob'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='chunkedupload',
+            index=models.Index(fields=['user', '-created_on', '-upload_id'], name='chunkedupload_user_created'),
+        ),
+        migrations.AddIndex(
+            model_name='chunkedupload',
+            index=models.Index(fields=['-created_on', '-upload_id'], name='chunkedupload_created'),
+        ),
+        migrations.AddIndex(
+            model_name='exportjob',
+            index=models.Index(fields=['user', '-created_on', '-upload_id'], name='exportjob_user_created'),
+        ),
+        migrations.AddIndex(
+            model_name='exportjob',
+            index=models.Index(fields=['-created_on', '-upload_id'], name='exportjob_created'),
+        ),
+    ]
@@ -12,6 +12,7 @@ import uuid
 import os
 from django.db import models, transaction
 from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
 from django.core.files.uploadedfile import UploadedFile
 from django.utils import timezone
 
@@ -95,7 +96,7 @@ class AbstractChunkedUpload(models.Model):
             self.offset += chunk.size
         else:
             self.offset = self.file.size
-        self.checksum = None  # Clear cached md5
+        self._checksum = None  # Clear cached md5
         if save:
             self.save()
         self.file.close()  # Flush
@@ -138,3 +139,82 @@ class ChunkedUpload(AbstractChunkedUpload):
         null=True,
         blank=True
     )
+    # Compressed CSV report of the rows rejected when importing the upload
+    rejects_file = models.FileField(max_length=255, upload_to=UPLOAD_TO,
+                                    storage=STORAGE, null=True, blank=True)
+    rejected_rows = models.BigIntegerField(default=0)
+    # Rows are parsed and staged while the upload is still in progress
+    pipelined = models.BooleanField(default=False)
+
+    class Meta:
+        # Keyset pagination of the uploads of a user, and of all uploads
+        indexes = [
+            models.Index(fields=['user', '-created_on', '-upload_id'],
+                         name='chunkedupload_user_created'),
+            models.Index(fields=['-created_on', '-upload_id'],
+                         name='chunkedupload_created'),
+        ]
+
+    def delete(self, delete_file=True, *args, **kwargs):
+        if self.rejects_file:
+            rejects_storage, rejects_name = self.rejects_file.storage, self.rejects_file.name
+        super().delete(delete_file, *args, **kwargs)
+        if self.rejects_file and delete_file:
+            rejects_storage.delete(rejects_name)
+
+
+class StagedImportRow(models.Model):
+    """
+    A validated row of a pipelined import, waiting for its upload to be
+    completed (checksum matched) before being written to the target model.
+    """
+    upload = models.ForeignKey(
+        ChunkedUpload,
+        on_delete=models.CASCADE,
+        related_name='staged_rows'
+    )
+    data = models.JSONField(encoder=DjangoJSONEncoder)
+
+
+class ImportLayout(models.Model):
+    """
+    Column mapping and type plan of a recurring import layout, keyed by a
+    fingerprint of the file's header and sampled value shapes.
+    """
+    fingerprint = models.CharField(max_length=64, unique=True)
+    model_name = models.CharField(max_length=100)
+    plan = models.JSONField()
+    created_on = models.DateTimeField(auto_now_add=True)
+
+
+class ExportJob(AbstractChunkedUpload):
+    """
+    An export written in the background to a file that can be downloaded
+    once complete. `offset` counts the bytes written so far.
+
+    Jobs expire and are deleted like uploads. Until then, a job with the
+    same `fingerprint` (same model, format and filters, on unchanged data)
+    reuses its file.
+    """
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='export_jobs',
+        null=True,
+        blank=True
+    )
+    model_name = models.CharField(max_length=100)
+    export_format = models.CharField(max_length=20)
+    filters = models.JSONField(default=dict, blank=True)
+    fingerprint = models.CharField(max_length=64, db_index=True)
+    exported_rows = models.BigIntegerField(default=0)
+    total_rows = models.BigIntegerField(null=True, blank=True)
+    error = models.TextField(blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', '-created_on', '-upload_id'],
+                         name='exportjob_user_created'),
+            models.Index(fields=['-created_on', '-upload_id'],
+                         name='exportjob_created'),
+        ]
@@ -1,7 +1,7 @@
 from rest_framework import serializers
 from rest_framework.reverse import reverse
 
-from .models import ChunkedUpload
+from .models import ChunkedUpload, ExportJob
 
 
 class ChunkedUploadSerializer(serializers.ModelSerializer):
@@ -16,7 +16,8 @@ class ChunkedUploadSerializer(serializers.ModelSerializer):
     class Meta:
         model = ChunkedUpload
         fields = '__all__'
-        read_only_fields = ('status', 'completed_at')
+        read_only_fields = ('status', 'completed_at', 'rejects_file',
+                            'rejected_rows', 'pipelined')
 
 
 class ChunkedUploadReadOnlySerializer(serializers.ModelSerializer):
@@ -24,8 +25,30 @@ class ChunkedUploadReadOnlySerializer(serializers.ModelSerializer):
 
     class Meta:
         model = ChunkedUpload
-        exclude = ['id', 'file', 'offset']
+        exclude = ['id', 'file', 'offset', 'rejects_file']
         read_only_fields = '__all__'
 
     def get_file_size(self, obj):
         return obj.file.size if obj.file else None
+
+
+class ExportJobSerializer(serializers.ModelSerializer):
+    download_url = serializers.SerializerMethodField()
+    expires_on = serializers.DateTimeField(read_only=True)
+
+    def get_download_url(self, obj):
+        if obj.status != ExportJob.COMPLETE:
+            return None
+        return reverse('export-job-download', kwargs={'pk': obj.pk},
+                       request=self.context.get('request'))
+
+    def validate_filters(self, value):
+        if not isinstance(value, dict):
+            raise serializers.ValidationError('Filters must be an object of field lookups')
+        return value
+
+    class Meta:
+        model = ExportJob
+        exclude = ['file', 'user', 'fingerprint']
+        read_only_fields = ('filename', 'offset', 'status', 'completed_on',
+                            'exported_rows', 'total_rows', 'error')
@@ -1,8 +1,11 @@
 # signals.py
 
-from django.db.models.signals import post_save
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
-from .models import ChunkedUpload
+from .importers.layouts import LAYOUT_CACHE_KEY
+from .models import ChunkedUpload, ImportLayout
 from .tasks import pub_upload_msg_to_broker
 
 
@@ -12,3 +15,10 @@ def handle_model_update(sender, instance, **kwargs):
     if instance.is_chunk_upload:  # Replace this condition with your logic
         # Invoke the Celery task
         pub_upload_msg_to_broker.delay(instance.channel_name, instance.message)
+
+
+@receiver([post_save, post_delete], sender=ImportLayout)
+def invalidate_layout_plan(sender, instance, **kwargs):
+    # Plans are cached without a timeout by `resolve_layout`
+    cache_key = LAYOUT_CACHE_KEY.format(instance.fingerprint)
+    transaction.on_commit(lambda: cache.delete(cache_key))
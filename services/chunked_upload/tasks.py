@@ -3,6 +3,10 @@ from chunked_upload.utils.transaction import atomic_with_abortion, abortable_tas
 from utils.consumer_messenger import ChannelManager
 from utils.exceptions import AbortedError
 from chunked_upload.utils.create_request import create_request
+from chunked_upload.models import ChunkedUpload, ExportJob
+from chunked_upload.exports import write_export_job
+from chunked_upload.importers.model_importers import import_upload
+from chunked_upload.importers.pipelined import stage_upload
 
 
 @abortable_task
@@ -86,6 +90,70 @@ def handle_chunked_upload(*args, **kwargs):
     return response
 
 
+@abortable_task
+def process_upload(self, upload_id, model_name, key_fields=None,
+                   duplicate_policy='last'):
+    """
+    Import the rows of a completed upload into a registered model.
+
+    Args:
+        upload_id (str): The primary key of the completed ChunkedUpload.
+        model_name (str): The registry name of the model to import into.
+        key_fields (list, optional): Columns identifying a record; rows
+            repeating a key are dropped before they are written.
+        duplicate_policy (str): Whether the 'last' or 'first' occurrence of
+            a repeated key is imported.
+
+    Returns:
+        dict: The import summary (imported and rejected row counts).
+    """
+    instance = ChunkedUpload.objects.get(pk=upload_id)
+    return import_upload(instance, model_name, key_fields=key_fields,
+                         duplicate_policy=duplicate_policy)
+
+
+@abortable_task
+def ingest_upload_pipelined(self, upload_id, model_name, key_fields=None,
+                            duplicate_policy='last'):
+    """
+    Parse and stage the rows of an upload while its chunks are still arriving.
+
+    The staged rows are written to the model once the upload is completed
+    (its checksum matched) and discarded if it is aborted, expires or is
+    deleted. Aborting the task also discards them.
+
+    Args:
+        upload_id (str): The primary key of the ChunkedUpload in progress.
+        model_name (str): The registry name of the model to import into.
+        key_fields (list, optional): Columns identifying a record; rows
+            repeating a key are dropped before they are written.
+        duplicate_policy (str): Whether the 'last' or 'first' occurrence of
+            a repeated key is imported.
+
+    Returns:
+        dict: The import summary.
+    """
+    instance = ChunkedUpload.objects.get(pk=upload_id)
+    return stage_upload(instance, model_name, check_abort=self.if_aborted,
+                        key_fields=key_fields, duplicate_policy=duplicate_policy)
+
+
+@abortable_task
+def run_export_job(self, job_id):
+    """
+    Write the file of an export job in the background.
+
+    Args:
+        job_id (str): The primary key of the ExportJob.
+
+    Returns:
+        dict: The number of rows exported and bytes written.
+    """
+    job = ExportJob.objects.get(pk=job_id)
+    write_export_job(job, check_abort=self.if_aborted)
+    return {'exported_rows': job.exported_rows, 'offset': job.offset}
+
+
 @abortable_task
 def checksum_check(serializer, instance, checksum):
     """
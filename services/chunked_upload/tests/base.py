@@ -0,0 +1,34 @@
+import shutil
+import tempfile
+
+from django.core.files.base import ContentFile
+from django.db.models.signals import post_save
+from django.test import override_settings
+
+from chunked_upload.models import ChunkedUpload
+from chunked_upload.signals import handle_model_update
+
+
+class UploadTestMixin:
+    """
+    Stores the files of the uploads created by a test in a temporary
+    `MEDIA_ROOT`, without publishing upload updates to the broker.
+    """
+
+    def setUp(self):
+        super().setUp()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        post_save.disconnect(handle_model_update, sender=ChunkedUpload)
+        self.addCleanup(post_save.connect, handle_model_update, sender=ChunkedUpload)
+
+    def create_upload(self, content, filename='rows.csv', **kwargs):
+        if isinstance(content, str):
+            content = content.encode()
+        upload = ChunkedUpload(filename=filename, offset=len(content), **kwargs)
+        upload.file.save(filename, ContentFile(content), save=False)
+        upload.save()
+        return upload
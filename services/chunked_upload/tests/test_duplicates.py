@@ -0,0 +1,113 @@
+from django.test import SimpleTestCase, TestCase
+
+from chunked_upload.importers.duplicates import (
+    FIRST_WINS, LAST_WINS, DuplicateBudgetExceeded, DuplicateDetector, merge_detectors)
+from chunked_upload.importers.model_importers import import_upload
+from pets.models import Category
+
+from .base import UploadTestMixin
+
+# Small enough for the detector to switch to Bloom filters after four keys,
+# large enough to verify two duplicated keys
+BLOOM_MEMORY_BUDGET = 512
+
+ROWS = [
+    (2, {'name': 'a', 'n': '1'}),
+    (3, {'name': 'b', 'n': '2'}),
+    (4, {'name': 'a', 'n': '3'}),
+    (5, {'name': 'c', 'n': '4'}),
+    (6, {'name': ' a ', 'n': '5'}),
+    (7, {'name': 'b', 'n': '6'}),
+    (8, {'name': 'd', 'n': '7'}),
+]
+
+
+class DuplicateDetectorTests(SimpleTestCase):
+
+    def detect(self, records, policy, **kwargs):
+        detector = DuplicateDetector(['name'], policy=policy, **kwargs)
+        for position, row in records:
+            detector.add(position, row)
+        if detector.needs_verification:
+            for position, row in records:
+                detector.verify(position, row)
+        return detector.finish()
+
+    def winners(self, detector, records):
+        return [row['n'] for position, row in records if detector.is_winner(position, row)]
+
+    def test_exact_mode(self):
+        detector = self.detect(ROWS, LAST_WINS)
+        self.assertTrue(detector.exact)
+        self.assertEqual(self.winners(detector, ROWS), ['4', '5', '6', '7'])
+        self.assertEqual(detector.duplicates, 3)
+
+        detector = self.detect(ROWS, FIRST_WINS)
+        self.assertEqual(self.winners(detector, ROWS), ['1', '2', '4', '7'])
+
+    def test_bloom_mode_is_verified(self):
+        for policy, expected in ((LAST_WINS, ['4', '5', '6', '7']),
+                                 (FIRST_WINS, ['1', '2', '4', '7'])):
+            with self.subTest(policy=policy):
+                detector = self.detect(ROWS, policy, memory_budget=BLOOM_MEMORY_BUDGET)
+                self.assertFalse(detector.exact)
+                self.assertEqual(self.winners(detector, ROWS), expected)
+                self.assertEqual(detector.duplicates, 3)
+
+    def test_exact_statistics_count_toward_the_budget(self):
+        # Four keys seen, two of them with statistics
+        rows = [(line, {'name': name}) for line, name in enumerate('abcabd')]
+        detector = self.detect(rows, LAST_WINS, memory_budget=5 * 128)
+        self.assertFalse(detector.exact)
+        self.assertEqual(detector.duplicates, 2)
+
+    def test_verified_statistics_are_bounded(self):
+        rows = [(line, {'name': str(line % 20)}) for line in range(40)]
+        with self.assertRaises(DuplicateBudgetExceeded):
+            self.detect(rows, LAST_WINS, memory_budget=BLOOM_MEMORY_BUDGET)
+
+    def test_unknown_policy(self):
+        with self.assertRaises(ValueError):
+            DuplicateDetector(['name'], policy='any')
+
+    def merged(self, policy, **kwargs):
+        # Positions are `(shard, line_number)` so they order like the whole file
+        shards = [[((0, line), row) for line, row in ROWS[:4]],
+                  [((1, line), row) for line, row in ROWS[4:]]]
+        detectors = []
+        for records in shards:
+            detector = DuplicateDetector(['name'], policy=policy, **kwargs)
+            for position, row in records:
+                detector.add(position, row)
+            detectors.append(detector)
+
+        merged = merge_detectors(detectors)
+        if merged.needs_verification:
+            for records in shards:
+                verifier = merged.verifier()
+                for position, row in records:
+                    verifier.verify(position, row)
+                merged.merge_verified(verifier)
+        merged.finish()
+        return merged, [record for records in shards for record in records]
+
+    def test_merged_shards_match_the_whole_file(self):
+        for memory_budget in (DuplicateDetector(['name']).memory_budget, BLOOM_MEMORY_BUDGET):
+            for policy in (LAST_WINS, FIRST_WINS):
+                with self.subTest(policy=policy, memory_budget=memory_budget):
+                    merged, records = self.merged(policy, memory_budget=memory_budget)
+                    self.assertEqual(merged.exact, memory_budget != BLOOM_MEMORY_BUDGET)
+                    self.assertEqual(self.winners(merged, records),
+                                     self.winners(self.detect(ROWS, policy), ROWS))
+                    self.assertEqual(merged.duplicates, 3)
+
+
+class DeduplicatedImportTests(UploadTestMixin, TestCase):
+
+    def test_first_occurrence_wins(self):
+        upload = self.create_upload(
+            'name,description\nToys,first\nFood,only\nToys,second\n')
+        summary = import_upload(upload, 'category', key_fields=['name'],
+                                duplicate_policy=FIRST_WINS)
+        self.assertEqual((summary['imported'], summary['duplicates']), (2, 1))
+        self.assertEqual(Category.objects.get(name='Toys').description, 'first')
@@ -0,0 +1,168 @@
+import gzip
+from types import SimpleNamespace
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from channels.testing import WebsocketCommunicator
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from chunked_upload.consumers import ExportProgressConsumer
+from chunked_upload.exports import (
+    EXPORT_STATUS_GROUP, get_or_create_export_job, write_export_job)
+from chunked_upload.models import ExportJob
+from chunked_upload.tasks import run_export_job
+from common.exporters.csv_exporters import CSVExporter
+from pets.models import Category
+
+from .base import UploadTestMixin
+
+IN_MEMORY_CHANNEL_LAYERS = {'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}}
+
+
+def run_task(task, *args):
+    """
+    Run an abortable task in the current process, without a result backend.
+    """
+    with mock.patch.object(task, 'is_aborted', return_value=False), \
+            mock.patch.object(task, 'update_state'):
+        return task.run(*args)
+
+
+@override_settings(CHANNEL_LAYERS=IN_MEMORY_CHANNEL_LAYERS)
+class ExportJobTests(UploadTestMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.user = get_user_model().objects.create_user(email='ada@example.com',
+                                                         username='ada')
+        Category.objects.create(name='Toys')
+
+    def test_identical_job_is_reused_until_data_changes(self):
+        job, created = get_or_create_export_job(self.user, 'category', 'csv')
+        self.assertTrue(created)
+        self.assertEqual(get_or_create_export_job(self.user, 'category', 'csv'), (job, False))
+
+        # Versions are bumped once the writing transaction commits
+        with self.captureOnCommitCallbacks() as callbacks:
+            Category.objects.create(name='Food')
+        self.assertEqual(get_or_create_export_job(self.user, 'category', 'csv'), (job, False))
+        for callback in callbacks:
+            callback()
+        self.assertTrue(get_or_create_export_job(self.user, 'category', 'csv')[1])
+
+    def test_task_writes_the_file_and_reports_to_the_user(self):
+        job, _ = get_or_create_export_job(self.user, 'category', 'csv')
+        channel_layer = get_channel_layer()
+        channel = async_to_sync(channel_layer.new_channel)()
+        async_to_sync(channel_layer.group_add)(EXPORT_STATUS_GROUP.format(self.user.pk), channel)
+
+        self.assertEqual(run_task(run_export_job, str(job.pk))['exported_rows'], 1)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, ExportJob.COMPLETE)
+        self.assertEqual((job.exported_rows, job.total_rows), (1, 1))
+        with gzip.open(job.file.path, 'rt', newline='') as file_obj:
+            self.assertEqual(file_obj.read(), ''.join(CSVExporter('category').stream()))
+        message = async_to_sync(channel_layer.receive)(channel)
+        self.assertEqual(message['type'], 'export_progress')
+        self.assertEqual(message['data']['status'], ExportJob.COMPLETE)
+        self.assertEqual(message['data']['exported_rows'], 1)
+
+    def test_failed_job_is_aborted(self):
+        job, _ = get_or_create_export_job(self.user, 'category', 'csv')
+        with mock.patch('common.exporters.base_exporters.BaseExporter.write',
+                        side_effect=RuntimeError('disk full')):
+            with self.assertRaises(RuntimeError):
+                write_export_job(job)
+
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.error), (ExportJob.ABORTED, 'disk full'))
+        self.assertFalse(job.file.storage.exists(job.file.name))
+
+
+class ExportJobViewTests(UploadTestMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.user = get_user_model().objects.create_user(email='ada@example.com',
+                                                         username='ada')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        Category.objects.create(name='Toys')
+
+    @mock.patch('chunked_upload.views.export.run_export_job')
+    def test_job_lifecycle(self, task):
+        task.delay.return_value.id = 'task-id'
+        data = {'model_name': 'category', 'export_format': 'csv'}
+        response = self.client.post(reverse('export-jobs'), data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data['task_id'], 'task-id')
+        job_id = response.data['upload_id']
+        task.delay.assert_called_once_with(job_id)
+
+        again = self.client.post(reverse('export-jobs'), data, format='json')
+        self.assertEqual((again.status_code, again.data['upload_id']),
+                         (status.HTTP_200_OK, job_id))
+
+        download_url = reverse('export-job-download', kwargs={'pk': job_id})
+        self.assertEqual(self.client.get(download_url).status_code, status.HTTP_409_CONFLICT)
+
+        with mock.patch('chunked_upload.exports.publish_progress'):
+            write_export_job(ExportJob.objects.get(pk=job_id))
+        detail = self.client.get(reverse('export-job-detail', kwargs={'pk': job_id}))
+        self.assertEqual(detail.data['status'], ExportJob.COMPLETE)
+        self.assertTrue(detail.data['download_url'].endswith(download_url))
+
+        response = self.client.get(download_url, HTTP_RANGE='bytes=0-1')
+        self.assertEqual(response.status_code, status.HTTP_206_PARTIAL_CONTENT)
+        # Gzip magic number
+        self.assertEqual(b''.join(response.streaming_content), b'\x1f\x8b')
+
+        other = APIClient()
+        other.force_authenticate(get_user_model().objects.create_user(
+            email='bob@example.com', username='bob'))
+        self.assertEqual(other.get(download_url).status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_invalid_filters_are_rejected(self):
+        response = self.client.post(reverse('export-jobs'), {
+            'model_name': 'category', 'export_format': 'csv', 'filters': {'nope': 1},
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_anonymous_requests_are_refused(self):
+        data = {'model_name': 'category', 'export_format': 'csv'}
+        response = APIClient().post(reverse('export-jobs'), data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertFalse(ExportJob.objects.exists())
+
+
+@override_settings(CHANNEL_LAYERS=IN_MEMORY_CHANNEL_LAYERS)
+class ExportProgressConsumerTests(SimpleTestCase):
+
+    def communicator(self, user):
+        communicator = WebsocketCommunicator(ExportProgressConsumer.as_asgi(), '/ws/export_jobs/')
+        communicator.scope['user'] = user
+        return communicator
+
+    async def test_progress_is_sent_to_its_user_only(self):
+        ada = self.communicator(SimpleNamespace(pk=1, is_authenticated=True))
+        bob = self.communicator(SimpleNamespace(pk=2, is_authenticated=True))
+        self.assertTrue((await ada.connect())[0])
+        self.assertTrue((await bob.connect())[0])
+
+        await get_channel_layer().group_send(EXPORT_STATUS_GROUP.format(1), {
+            'type': 'export_progress', 'data': {'status': ExportJob.COMPLETE}})
+        self.assertEqual(await ada.receive_json_from(), {'status': ExportJob.COMPLETE})
+        self.assertTrue(await bob.receive_nothing())
+        await ada.disconnect()
+        await bob.disconnect()
+
+    async def test_anonymous_connections_are_refused(self):
+        connected, _ = await self.communicator(AnonymousUser()).connect()
+        self.assertFalse(connected)
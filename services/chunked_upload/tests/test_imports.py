@@ -0,0 +1,133 @@
+import csv
+import gzip
+import os
+import tempfile
+from unittest import mock
+
+from django.test import RequestFactory, SimpleTestCase, TestCase
+from rest_framework import status
+from rest_framework.parsers import JSONParser
+from rest_framework.request import Request
+
+from chunked_upload.importers.model_importers import import_upload
+from chunked_upload.views.upload import ChunkedUploadView
+from pets.models import Category
+from utils.responses import parse_range_header, ranged_file_response
+
+from .base import UploadTestMixin
+
+
+class ImportUploadTests(UploadTestMixin, TestCase):
+
+    def test_rejected_rows_are_reported_by_line(self):
+        upload = self.create_upload(
+            'name,description\n'
+            'Toys,Balls\n'
+            ',No name\n'
+            '"Long\nname",Spans two lines\n'
+            ',Also no name\n')
+
+        summary = import_upload(upload, 'category', batch_size=1)
+
+        self.assertEqual((summary['imported'], summary['rejected']), (2, 2))
+        self.assertEqual(sorted(Category.objects.values_list('name', flat=True)),
+                         ['Long\nname', 'Toys'])
+        upload.refresh_from_db()
+        self.assertEqual(upload.rejected_rows, 2)
+        with gzip.open(upload.rejects_file.path, 'rt', newline='') as report:
+            rows = list(csv.reader(report))
+        self.assertEqual(rows[0], ['line_number', 'field', 'code', 'message'])
+        self.assertEqual([(row[0], row[1]) for row in rows[1:]], [('3', 'name'), ('6', 'name')])
+
+    def test_no_report_without_rejected_rows(self):
+        upload = self.create_upload('name,description\nToys,Balls\n')
+        import_upload(upload, 'category')
+        upload.refresh_from_db()
+        self.assertEqual(upload.rejected_rows, 0)
+        self.assertFalse(upload.rejects_file)
+
+
+class RangeTests(SimpleTestCase):
+    content = b'0123456789'
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        fd, self.path = tempfile.mkstemp()
+        with os.fdopen(fd, 'wb') as file_obj:
+            file_obj.write(self.content)
+        self.addCleanup(os.remove, self.path)
+
+    def test_parse_range_header(self):
+        size = len(self.content)
+        self.assertEqual(parse_range_header('bytes=2-5', size), (2, 5))
+        self.assertEqual(parse_range_header('bytes=7-', size), (7, 9))
+        self.assertEqual(parse_range_header('bytes=2-99', size), (2, 9))
+        # Suffix ranges count from the end of the file
+        self.assertEqual(parse_range_header('bytes=-3', size), (7, 9))
+        self.assertEqual(parse_range_header('bytes=-50', size), (0, 9))
+        # Unsatisfiable
+        self.assertIs(parse_range_header('bytes=-0', size), False)
+        self.assertIs(parse_range_header('bytes=10-', size), False)
+        self.assertIs(parse_range_header('bytes=5-2', size), False)
+        # Multiple or malformed ranges are ignored, the whole file is served
+        self.assertIsNone(parse_range_header('bytes=0-1,4-5', size))
+        self.assertIsNone(parse_range_header('items=0-1', size))
+
+    def respond(self, range_header=None, **headers):
+        if range_header:
+            headers['HTTP_RANGE'] = range_header
+        return ranged_file_response(self.factory.get('/', **headers), self.path, 'digits.txt')
+
+    def test_suffix_range_is_partial_content(self):
+        response = self.respond('bytes=-3')
+        self.assertEqual(response.status_code, status.HTTP_206_PARTIAL_CONTENT)
+        self.assertEqual(response['Content-Range'], 'bytes 7-9/10')
+        self.assertEqual(b''.join(response.streaming_content), b'789')
+
+    def test_unsatisfiable_range(self):
+        response = self.respond('bytes=10-')
+        self.assertEqual(response.status_code, status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE)
+        self.assertEqual(response['Content-Range'], 'bytes */10')
+
+    def test_resume_of_a_regenerated_file_gets_the_whole_file(self):
+        first = self.respond()
+        self.assertTrue(first['ETag'])
+        resumed = self.respond('bytes=7-', HTTP_IF_RANGE=first['ETag'])
+        self.assertEqual(resumed.status_code, status.HTTP_206_PARTIAL_CONTENT)
+        self.assertEqual(resumed['ETag'], first['ETag'])
+        resumed = self.respond('bytes=7-', HTTP_IF_RANGE=first['Last-Modified'])
+        self.assertEqual(resumed.status_code, status.HTTP_206_PARTIAL_CONTENT)
+
+        # Regenerated under the same name
+        with open(self.path, 'wb') as file_obj:
+            file_obj.write(b'abcdefghijk')
+        resumed = self.respond('bytes=7-', HTTP_IF_RANGE=first['ETag'])
+        self.assertEqual(resumed.status_code, status.HTTP_200_OK)
+        self.assertEqual(b''.join(resumed.streaming_content), b'abcdefghijk')
+        self.assertNotEqual(resumed['ETag'], first['ETag'])
+
+    def test_multiple_ranges_serve_the_whole_file(self):
+        response = self.respond('bytes=0-1,4-5')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(b''.join(response.streaming_content), self.content)
+
+
+class OnCompletionTests(UploadTestMixin, TestCase):
+
+    def complete(self, upload, data):
+        request = Request(RequestFactory().post('/', data, content_type='application/json'),
+                          parsers=[JSONParser()])
+        return ChunkedUploadView().on_completion(upload, request)
+
+    @mock.patch('chunked_upload.views.upload.process_upload')
+    def test_import_is_scheduled(self, process_upload):
+        process_upload.delay.return_value.id = 'task-id'
+        upload = self.create_upload('name\nToys\n')
+
+        response = self.complete(upload, {'model': 'category', 'key_fields': 'name',
+                                          'duplicate_policy': 'first'})
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data, {'task_id': 'task-id'})
+        process_upload.delay.assert_called_once_with(
+            str(upload.pk), 'category', key_fields=['name'], duplicate_policy='first')
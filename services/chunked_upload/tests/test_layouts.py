@@ -0,0 +1,95 @@
+from django.core.cache import cache
+from django.test import TestCase
+
+from chunked_upload.importers.layouts import (
+    LAYOUT_CACHE_KEY, LayoutPlan, fingerprint, resolve_layout)
+from chunked_upload.importers.model_importers import import_upload
+from chunked_upload.models import ImportLayout
+from pets.models import Category
+from pets.serializers.category_serializers import CategorySerializer
+from pets.serializers.product_serializers import ProductSerializer
+
+from .base import UploadTestMixin
+
+HEADER = ['Name', 'Price', 'Category', 'Colour']
+
+
+def infer(prices, categories=('1',)):
+    rows = [{'Name': 'Ball', 'Price': price, 'Category': category, 'Colour': 'red'}
+            for price, category in zip(prices, categories * len(prices))]
+    return LayoutPlan.infer(ProductSerializer, HEADER, rows)
+
+
+def column(plan, source):
+    return next(column for column in plan.columns if column['source'] == source)
+
+
+class LayoutPlanTests(TestCase):
+
+    def test_thousands_separator_is_not_a_decimal_comma(self):
+        plan = infer(['1,234', '12,500'])
+        self.assertEqual(column(plan, 'Price')['separator'], '.')
+        self.assertEqual(plan.apply({'Price': '1,234'})['price'], '1234.00')
+
+    def test_decimal_comma(self):
+        for prices, expected in ((['1,234', '2,5'], '1.23'), (['1.234,50'], '1234.50'),
+                                 (['3,14'], '3.14')):
+            with self.subTest(prices=prices):
+                plan = infer(prices)
+                self.assertEqual(column(plan, 'Price')['separator'], ',')
+                self.assertEqual(plan.apply({'Price': prices[0]})['price'], expected)
+
+    def test_foreign_keys_are_not_coerced(self):
+        plan = infer(['1.50'], categories=('#12',))
+        self.assertEqual(column(plan, 'Category')['coercion'], 'str')
+        self.assertEqual(plan.apply({'Category': '#12'})['category'], '#12')
+
+    def test_unmapped_columns_are_listed(self):
+        plan = infer(['1.50'])
+        self.assertEqual(plan.ignored_columns, ['Colour'])
+        self.assertEqual(set(plan.apply({'Name': 'Ball', 'Colour': 'red'})),
+                         {'name', 'price', 'category'})
+
+
+class ResolveLayoutTests(UploadTestMixin, TestCase):
+
+    row = {'Name': 'Toys', 'Blurb': 'Balls'}
+
+    def setUp(self):
+        super().setUp()
+        cache_key = LAYOUT_CACHE_KEY.format(fingerprint('category', list(self.row), [self.row]))
+        self.addCleanup(cache.delete, cache_key)
+
+    def open_records(self):
+        return iter([(2, dict(self.row))])
+
+    def test_stored_plan_is_reloaded_when_changed(self):
+        plan = resolve_layout('category', CategorySerializer, self.open_records)
+        self.assertEqual(plan.ignored_columns, ['Blurb'])
+        layout = ImportLayout.objects.get()
+
+        layout.plan = [{'source': 'Name', 'field': 'name', 'coercion': 'str'},
+                       {'source': 'Blurb', 'field': 'description', 'coercion': 'str'}]
+        with self.captureOnCommitCallbacks(execute=True):
+            layout.save()
+        plan = resolve_layout('category', CategorySerializer, self.open_records)
+        self.assertEqual(plan.apply({'Name': 'Toys', 'Blurb': 'Balls'}),
+                         {'name': 'Toys', 'description': 'Balls'})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            layout.delete()
+        plan = resolve_layout('category', CategorySerializer, self.open_records)
+        self.assertEqual(plan.ignored_columns, ['Blurb'])
+
+    def test_stored_plan_reads_columns_spelled_differently(self):
+        resolve_layout('category', CategorySerializer, self.open_records)
+        plan = resolve_layout('category', CategorySerializer,
+                              lambda: iter([(2, {'name': 'Food', 'BLURB': 'Dry'})]))
+        self.assertEqual(plan.apply({'name': 'Food', 'BLURB': 'Dry'}), {'name': 'Food'})
+        self.assertEqual(plan.ignored_columns, ['BLURB'])
+
+    def test_import_summary_lists_ignored_columns(self):
+        upload = self.create_upload('Name,Blurb\nToys,Balls\n')
+        summary = import_upload(upload, 'category')
+        self.assertEqual(summary['ignored_columns'], ['Blurb'])
+        self.assertIsNone(Category.objects.get().description)
@@ -0,0 +1,45 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from chunked_upload.models import ChunkedUpload
+from utils.pagination import KeysetPagination
+
+from .base import UploadTestMixin
+
+
+class KeysetPaginationTests(UploadTestMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        # Groups of uploads sharing a creation time, paged across the groups
+        now = timezone.now()
+        for index in range(7):
+            upload = self.create_upload('name\nToys\n')
+            ChunkedUpload.objects.filter(pk=upload.pk).update(
+                created_on=now - timedelta(seconds=index // 3))
+        self.expected = list(ChunkedUpload.objects.order_by('-created_on', '-pk'))
+
+    def paginate(self, url):
+        paginator = KeysetPagination()
+        paginator.page_size = 2
+        request = Request(APIRequestFactory().get(url))
+        page = paginator.paginate_queryset(ChunkedUpload.objects.all(), request)
+        return page, paginator.get_next_link(), paginator.get_previous_link()
+
+    def test_pages_follow_the_ordering_in_both_directions(self):
+        pages, url = [], '/uploads/?cursor='
+        while url:
+            page, url, previous = self.paginate(url)
+            pages.append(page)
+        self.assertEqual([upload for page in pages for upload in page], self.expected)
+        self.assertEqual([len(page) for page in pages], [2, 2, 2, 1])
+
+        backwards = []
+        while previous:
+            page, _, previous = self.paginate(previous)
+            backwards.insert(0, page)
+        self.assertEqual(backwards, pages[:-1])
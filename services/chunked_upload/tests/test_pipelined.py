@@ -0,0 +1,121 @@
+from unittest import mock
+
+from django.core.files.base import ContentFile
+from django.test import RequestFactory, TestCase
+from rest_framework import status
+from rest_framework.parsers import JSONParser
+from rest_framework.request import Request
+
+from chunked_upload.importers.model_importers import import_upload
+from chunked_upload.importers.pipelined import UploadTail, stage_upload
+from chunked_upload.models import ChunkedUpload, StagedImportRow
+from chunked_upload.views.upload import ChunkedUploadView
+from pets.models import Category
+from utils.exceptions import ChunkedUploadError
+
+from .base import UploadTestMixin
+
+CONTENT = ('Category Name,Description,Notes\n'
+           'Toys,first,x\n'
+           'Food,dry,y\n'
+           ',no name,z\n'
+           'Toys,second,x\n')
+
+
+@mock.patch.object(UploadTail, 'poll_interval', 0)
+class StageUploadTests(UploadTestMixin, TestCase):
+
+    def start_upload(self, chunks):
+        """
+        An upload holding the first chunk; the others are appended while the
+        import waits for bytes, then the upload is completed.
+        """
+        upload = self.create_upload(chunks[0], pipelined=True)
+        pending = list(chunks[1:])
+
+        def append_chunk():
+            writer = ChunkedUpload.objects.get(pk=upload.pk)
+            if pending:
+                writer.append_chunk(ContentFile(pending.pop(0).encode()))
+            elif writer.status == ChunkedUpload.UPLOADING:
+                self.finish(writer)
+        return upload, append_chunk
+
+    def finish(self, upload):
+        upload.completed()
+
+    def categories(self):
+        return list(Category.objects.order_by('pk').values_list('name', 'description'))
+
+    def test_rows_are_staged_while_the_upload_grows(self):
+        chunks = [CONTENT[:20], CONTENT[20:45], CONTENT[45:]]
+        upload, append_chunk = self.start_upload(chunks)
+
+        summary = stage_upload(upload, 'category', batch_size=1, check_abort=append_chunk)
+
+        self.assertTrue(summary['committed'])
+        self.assertEqual((summary['staged'], summary['imported'], summary['rejected']),
+                         (3, 3, 1))
+        self.assertEqual(self.categories(),
+                         [('Toys', 'first'), ('Food', 'dry'), ('Toys', 'second')])
+        self.assertFalse(StagedImportRow.objects.exists())
+        upload.refresh_from_db()
+        self.assertEqual(upload.rejected_rows, 1)
+
+    def test_checksum_mismatch_discards_staged_rows(self):
+        upload, append_chunk = self.start_upload([CONTENT[:30], CONTENT[30:]])
+
+        def finish(writer):
+            with self.assertRaises(ChunkedUploadError):
+                ChunkedUploadView().checksum_check(writer, 'not-the-checksum')
+        self.finish = finish
+
+        summary = stage_upload(upload, 'category', check_abort=append_chunk)
+
+        self.assertFalse(summary['committed'])
+        self.assertEqual(ChunkedUpload.objects.get(pk=upload.pk).status, ChunkedUpload.ABORTED)
+        self.assertFalse(Category.objects.exists())
+        self.assertFalse(StagedImportRow.objects.exists())
+
+    def test_same_rows_as_a_completed_upload_import(self):
+        for policy in ('first', 'last'):
+            with self.subTest(policy=policy):
+                upload = self.create_upload(CONTENT)
+                summary = import_upload(upload, 'category', key_fields=['name'],
+                                        duplicate_policy=policy)
+                imported = self.categories()
+                Category.objects.all().delete()
+
+                upload, append_chunk = self.start_upload([CONTENT])
+                pipelined = stage_upload(upload, 'category', check_abort=append_chunk,
+                                         key_fields=['name'], duplicate_policy=policy)
+                self.assertEqual(self.categories(), imported)
+                self.assertEqual(
+                    {key: pipelined[key] for key in ('imported', 'rejected', 'duplicates')},
+                    {key: summary[key] for key in ('imported', 'rejected', 'duplicates')})
+                Category.objects.all().delete()
+
+
+class PipelinedCreationTests(UploadTestMixin, TestCase):
+
+    def create(self, data):
+        upload = self.create_upload('name\n')
+        request = Request(RequestFactory().put('/', data, content_type='application/json'),
+                          parsers=[JSONParser()])
+        ChunkedUploadView().on_creation(upload, request)
+        return upload
+
+    @mock.patch('chunked_upload.views.upload.ingest_upload_pipelined')
+    def test_pipelined_import_is_scheduled(self, ingest_upload_pipelined):
+        upload = self.create({'model': 'category', 'pipeline': 'true'})
+        self.assertTrue(upload.pipelined)
+        ingest_upload_pipelined.delay.assert_called_once_with(
+            str(upload.pk), 'category', key_fields=None, duplicate_policy='last')
+
+    @mock.patch('chunked_upload.views.upload.ingest_upload_pipelined')
+    def test_users_cannot_be_imported_pipelined(self, ingest_upload_pipelined):
+        with self.assertRaises(ChunkedUploadError) as raised:
+            self.create({'model': 'user', 'pipeline': 'true'})
+        self.assertEqual(raised.exception.status_code, status.HTTP_400_BAD_REQUEST)
+        ingest_upload_pipelined.delay.assert_not_called()
+        self.assertFalse(ChunkedUpload.objects.get().pipelined)
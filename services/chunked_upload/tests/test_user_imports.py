@@ -0,0 +1,73 @@
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import check_password, is_password_usable, make_password
+from django.test import SimpleTestCase, TestCase
+
+from chunked_upload.importers.user_importers import UserImporter, create_hashing_executor
+
+
+def row(username, **kwargs):
+    return {'email': f'{username}@example.com', 'username': username, **kwargs}
+
+
+class UserImporterTests(TestCase):
+
+    def setUp(self):
+        self.executor = ThreadPoolExecutor(max_workers=2)
+        self.addCleanup(self.executor.shutdown)
+        self.report = mock.Mock()
+        self.importer = UserImporter(executor=self.executor, workers=2, report=self.report)
+
+    def rejections(self):
+        return {call.args[0]: {field: [error.code for error in errors]
+                               for field, errors in call.args[1].items()}
+                for call in self.report.write.call_args_list}
+
+    def test_unique_conflicts_are_rejected(self):
+        get_user_model().objects.create_user(email='taken@example.com', username='taken')
+        summary = self.importer.import_records([
+            (2, row('taken', email='other@example.com')),
+            (3, row('new', email='taken@example.com')),
+            (4, row('ann', password='secret')),
+            (5, row('ann', email='ann2@example.com')),
+            (6, row('bob')),
+        ])
+
+        self.assertEqual((summary['imported'], summary['rejected']), (2, 3))
+        self.assertEqual(self.rejections(), {2: {'username': ['unique']},
+                                             3: {'email': ['unique']},
+                                             5: {'username': ['unique']}})
+        ann = get_user_model().objects.get(username='ann')
+        self.assertTrue(ann.check_password('secret'))
+        self.assertFalse(get_user_model().objects.get(username='bob').has_usable_password())
+
+    def test_password_hash_is_kept(self):
+        password_hash = make_password('secret')
+        summary = self.importer.import_records([
+            (2, row('ann', password_hash=password_hash)),
+            (3, row('bob', password_hash='not-a-hash')),
+        ])
+
+        self.assertEqual((summary['imported'], summary['rejected']), (1, 1))
+        self.assertEqual(get_user_model().objects.get(username='ann').password, password_hash)
+        self.assertEqual(self.rejections(), {3: {'password_hash': ['invalid']}})
+
+
+class HashBatchTests(SimpleTestCase):
+
+    def test_passwords_are_hashed_in_worker_processes(self):
+        password_hash = make_password('kept')
+        batch = [(2, {'password': 'first'}), (3, {'password_hash': password_hash}),
+                 (4, {'password': 'second'}), (5, {})]
+        with create_hashing_executor(workers=2) as executor:
+            self.assertIsInstance(executor, ProcessPoolExecutor)
+            UserImporter(executor=executor, workers=2).hash_batch(batch)
+
+        passwords = [data['password'] for _, data in batch]
+        self.assertTrue(check_password('first', passwords[0]))
+        self.assertEqual(passwords[1], password_hash)
+        self.assertTrue(check_password('second', passwords[2]))
+        self.assertFalse(is_password_usable(passwords[3]))
+        self.assertTrue(all('password_hash' not in data for _, data in batch))
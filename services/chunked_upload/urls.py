@@ -24,6 +24,9 @@ Examples:
 
 from django.urls import path
 from chunked_upload.views.upload import ChunkedUploadView
+from chunked_upload.views.report import RejectedRowsReportView
+from chunked_upload.views.export import ExportJobDetailView, ExportJobDownloadView, \
+    ExportJobListView
 
 urlpatterns = [
     # POST endpoint for creating new uploads
@@ -31,4 +34,15 @@ urlpatterns = [
     # PUT endpoint for updating existing uploads
     path('add_file_chunk/<int:pk>/', ChunkedUploadView.as_view(),
          name='chunked-upload-update'),
+    # GET endpoint for downloading the rejected rows report of an import
+    path('rejected_rows/<uuid:pk>/', RejectedRowsReportView.as_view(),
+         name='chunked-upload-rejected-rows'),
+    # GET (list) and POST (create) endpoint for background export jobs
+    path('export_jobs/', ExportJobListView.as_view(), name='export-jobs'),
+    # GET endpoint for the status and progress of an export job
+    path('export_jobs/<uuid:pk>/', ExportJobDetailView.as_view(),
+         name='export-job-detail'),
+    # GET endpoint for downloading the file of a complete export job
+    path('export_jobs/<uuid:pk>/download/', ExportJobDownloadView.as_view(),
+         name='export-job-download'),
 ]
@@ -0,0 +1,96 @@
+"""
+Views creating background export jobs and downloading their files.
+"""
+
+from django.core.exceptions import ValidationError
+from django.shortcuts import get_object_or_404
+from rest_framework import status
+from rest_framework.generics import GenericAPIView
+from rest_framework.mixins import ListModelMixin, RetrieveModelMixin
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from common.exporters.base_exporters import get_exporter_class
+from utils.pagination import KeysetPagination
+from utils.queries import owner_or_admin
+from utils.responses import ranged_file_response
+from chunked_upload.serializers import ExportJobSerializer
+from ..exports import get_or_create_export_job
+from ..models import ExportJob
+from ..tasks import run_export_job
+
+
+class ExportJobBaseView(GenericAPIView):
+    """
+    Base view for the export job views.
+    """
+
+    model = ExportJob
+    serializer_class = ExportJobSerializer
+    pagination_class = KeysetPagination
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        """
+        By default, users can only see their own export jobs.
+        """
+        queryset = self.model.objects.all()
+        return owner_or_admin(queryset, self.request)
+
+
+class ExportJobListView(ListModelMixin, ExportJobBaseView):
+    """
+    Lists export jobs and creates new ones. A new job is written in the
+    background; an identical job (same model, format and filters, on
+    unchanged data) that has not expired is returned instead of exporting
+    again.
+    """
+
+    def get(self, request, *args, **kwargs):
+        return self.list(request, *args, **kwargs)
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            job, created = get_or_create_export_job(
+                request.user,
+                serializer.validated_data['model_name'],
+                serializer.validated_data['export_format'],
+                serializer.validated_data.get('filters'),
+            )
+        except (ValueError, ValidationError) as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        data = self.get_serializer(job).data
+        if not created:
+            return Response(data, status=status.HTTP_200_OK)
+        task = run_export_job.delay(str(job.pk))
+        return Response({**data, 'task_id': task.id}, status=status.HTTP_202_ACCEPTED)
+
+
+class ExportJobDetailView(RetrieveModelMixin, ExportJobBaseView):
+    """
+    Returns the status and progress of an export job.
+    """
+
+    def get(self, request, *args, **kwargs):
+        return self.retrieve(request, *args, **kwargs)
+
+
+class ExportJobDownloadView(ExportJobBaseView):
+    """
+    Downloads the file of a complete export job. Honours `Range` headers so
+    interrupted downloads can resume.
+    """
+
+    def get(self, request, *args, pk=None, **kwargs):
+        job = get_object_or_404(self.get_queryset(), pk=pk)
+        if job.status != ExportJob.COMPLETE:
+            return Response({'detail': 'Export is not complete'},
+                            status=status.HTTP_409_CONFLICT)
+
+        exporter_class = get_exporter_class(job.export_format)
+        content_type = (exporter_class.content_type if exporter_class.compressed
+                        else 'application/gzip')
+        return ranged_file_response(request, job.file.path, filename=job.filename,
+                                    content_type=content_type)
@@ -0,0 +1,30 @@
+"""
+Views serving the reports produced while importing uploads.
+"""
+
+import os
+
+from django.shortcuts import get_object_or_404
+from rest_framework import status
+from rest_framework.response import Response
+from services.settings.upload import REJECTS_EXT
+from utils.responses import ranged_file_response
+from .upload import ChunkedUploadBaseView
+
+
+class RejectedRowsReportView(ChunkedUploadBaseView):
+    """
+    Downloads the compressed CSV report of the rows rejected when importing
+    an upload. Honours `Range` headers so interrupted downloads can resume.
+    """
+
+    def get(self, request, *args, pk=None, **kwargs):
+        chunked_upload = get_object_or_404(self.get_queryset(), pk=pk)
+        if not chunked_upload.rejects_file:
+            return Response({'detail': 'No rows were rejected for this upload'},
+                            status=status.HTTP_404_NOT_FOUND)
+
+        filename = os.path.splitext(chunked_upload.filename)[0] + REJECTS_EXT
+        return ranged_file_response(request, chunked_upload.rejects_file.path,
+                                    filename=filename,
+                                    content_type='application/gzip')
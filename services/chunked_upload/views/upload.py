@@ -20,8 +20,11 @@ from django.views.decorators.cache import cache_page
 from services.settings.upload import CHECKSUM_TYPE, MAX_BYTES
 from utils.queries import owner_or_admin
 from utils.exceptions import ChunkedUploadError
+from utils.pagination import KeysetPagination
 from chunked_upload.serializers import ChunkedUploadSerializer, ChunkedUploadReadOnlySerializer
-from ..tasks import append_chunk_task, handle_chunked_upload, checksum_check
+from ..tasks import append_chunk_task, handle_chunked_upload, checksum_check, process_upload, \
+    ingest_upload_pipelined
+from ..importers.model_importers import ModelImporter, get_importer_class
 from ..models import ChunkedUpload
 
 
@@ -33,6 +36,8 @@ class ChunkedUploadBaseView(GenericAPIView):
     model = ChunkedUpload
     user_field_name = 'user'
     serializer_class = ChunkedUploadSerializer
+    # Lists can also be paged with `?cursor=`, see `KeysetPagination`
+    pagination_class = KeysetPagination
     # Define permission classes at the class level
     # permission_classes = [IsAuthenticated]
 
@@ -169,27 +174,76 @@ class ChunkedUploadView(ListModelMixin, RetrieveModelMixin,
     )
     max_bytes = MAX_BYTES  # Max amount of data that can be uploaded
 
-    def on_completion(self, upload, request):
+    def check_importable(self, model_name):
+        """
+        Refuse imports into unknown models or export-only serializers before
+        any task is scheduled.
+        """
+        try:
+            get_importer_class(model_name)(model_name)
+        except ValueError as exc:
+            raise ChunkedUploadError(status=status.HTTP_400_BAD_REQUEST,
+                                     detail=str(exc)) from exc
+
+    def on_creation(self, upload, request):
+        """
+        Starts a pipelined import when the upload is created with a target
+        `model` and `pipeline` set: rows are parsed and staged while the
+        remaining chunks arrive, and written once the checksum matches.
+
+        Args:
+            upload (ChunkedUpload): The upload that was just created.
+            request (HttpRequest): The Django request object.
         """
-        Initiates asynchronous processing for an uploaded file and saves the upload record.
+        model_name = request.data.get('model')
+        if not model_name or str(request.data.get('pipeline')).lower() not in ('1', 'true'):
+            return
+
+        self.check_importable(model_name)
+        # Staging validates with the registry serializer only, importers with
+        # their own checks (e.g. password hashing of users) cannot be staged
+        if get_importer_class(model_name) is not ModelImporter:
+            raise ChunkedUploadError(status=status.HTTP_400_BAD_REQUEST,
+                                     detail=f"'{model_name}' cannot be imported pipelined")
+        upload.pipelined = True
+        upload.save(update_fields=['pipelined'])
+        key_fields = request.data.get('key_fields')
+        ingest_upload_pipelined.delay(
+            str(upload.pk), model_name,
+            key_fields=key_fields.split(',') if key_fields else None,
+            duplicate_policy=request.data.get('duplicate_policy', 'last'),
+        )
 
-        This function is likely called after a file upload is completed successfully.
-        It performs the following actions:
+    def on_completion(self, upload, request):
+        """
+        Initiates asynchronous processing for an uploaded file.
 
-        1. Schedules the `process_upload` Celery task asynchronously to process the uploaded file.
-        2. Creates or retrieves a `TaskMeta` object associated with the upload, linking it
-        to the task ID for tracking purposes.
-        3. Saves the updated `Upload` object to the database, including the task ID relationship.
+        When the request names a target `model`, schedules the `process_upload`
+        Celery task to import the file's rows into it. Rows that fail
+        validation are streamed to a compressed report that can be downloaded
+        from the rejected rows endpoint once the task is done.
 
         Args:
-            upload (Upload object): The uploaded file object.
-            request (HttpRequest): The Django request object (may or may not be used).
+            upload (ChunkedUpload): The completed upload.
+            request (HttpRequest): The Django request object.
         """
+        model_name = request.data.get('model')
+        # Pipelined uploads are committed by the task that staged their rows
+        if upload.pipelined or not model_name:
+            return Response(
+                self.response_serializer_class(upload,
+                                               context={'request': request}).data,
+                status=status.HTTP_200_OK
+            )
 
-        result = process_upload.delay(str(upload.id))
-        upload.task, created = TaskMeta.objects.get_or_create(
-            task_id=result.task_id)
-        upload.save()
+        self.check_importable(model_name)
+        key_fields = request.data.get('key_fields')
+        task = process_upload.delay(
+            str(upload.pk), model_name,
+            key_fields=key_fields.split(',') if key_fields else None,
+            duplicate_policy=request.data.get('duplicate_policy', 'last'),
+        )
+        return Response({'task_id': task.id}, status=status.HTTP_202_ACCEPTED)
 
     def get_max_bytes(self, request):
         """
@@ -297,6 +351,7 @@ class ChunkedUploadView(ListModelMixin, RetrieveModelMixin,
             # chunked_upload is currently a serializer;
             # save returns model instance
             chunked_upload = chunked_upload.save(**kwargs)
+            self.on_creation(chunked_upload, request)
 
         return chunked_upload
 
@@ -319,6 +374,10 @@ class ChunkedUploadView(ListModelMixin, RetrieveModelMixin,
         Verify if checksum sent by client matches generated checksum.
         """
         if chunked_upload.checksum != checksum:
+            if chunked_upload.pipelined:
+                # Rows staged while uploading must not be committed
+                chunked_upload.status = chunked_upload.ABORTED
+                chunked_upload.save(update_fields=['status'])
             raise ChunkedUploadError(status=status.HTTP_400_BAD_REQUEST,
                                      detail='checksum does not match')
 
@@ -355,6 +414,8 @@ class ChunkedUploadView(ListModelMixin, RetrieveModelMixin,
             else:
                 self.checksum_check(chunked_upload, checksum)
 
+        chunked_upload.completed()
+
         # Handle completion
         return self.on_completion(chunked_upload, request)
 
@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class CommonConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'common'
+
+    def ready(self) -> None:
+        from common.serializers.registry_serializers import connect_registry_listener
+        connect_registry_listener()
+        return super().ready()
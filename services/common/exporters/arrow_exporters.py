@@ -0,0 +1,209 @@
+"""
+Columnar Parquet and Arrow IPC export.
+
+Columns keep their types: `DecimalField` becomes `decimal128`, `DateTimeField`
+a UTC `timestamp`, integers `int64`... Columns rendered by a custom
+serializer field (e.g. `FormattedField`) are exported as their string
+representation; fields with a `format_many` method format their raw column
+once per batch. Rows are read from a server-side cursor and converted to
+Arrow record batches of `chunk_size` rows.
+"""
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from django.conf import settings
+from django.db import models
+from rest_framework import serializers
+from rest_framework.fields import SkipField
+from rest_framework.relations import PKOnlyObject
+
+from services.settings.export import ARROW_COMPRESSION, PARQUET_ROW_GROUP_SIZE
+from .base_exporters import TemporaryFileExporter, format_value
+
+
+def arrow_type(field):
+    """
+    The Arrow type of the values of a concrete model field.
+    """
+    if isinstance(field, models.ForeignKey):
+        return arrow_type(field.target_field)
+    if isinstance(field, models.DecimalField):
+        return pa.decimal128(field.max_digits, field.decimal_places)
+    if isinstance(field, models.DateTimeField):
+        return pa.timestamp('us', tz='UTC' if settings.USE_TZ else None)
+    if isinstance(field, models.DateField):
+        return pa.date32()
+    if isinstance(field, models.TimeField):
+        return pa.time64('us')
+    if isinstance(field, models.DurationField):
+        return pa.duration('us')
+    if isinstance(field, models.BooleanField):
+        return pa.bool_()
+    if isinstance(field, models.IntegerField):
+        return pa.int64()
+    if isinstance(field, models.FloatField):
+        return pa.float64()
+    if isinstance(field, models.BinaryField):
+        return pa.binary()
+    return pa.string()
+
+
+def raw_value(field, instance):
+    """
+    The value of `instance` read by a serializer field, before representation.
+    """
+    try:
+        value = field.get_attribute(instance)
+    except SkipField:
+        return None
+    if isinstance(value, (PKOnlyObject, models.Model)):
+        return value.pk
+    return value
+
+
+class ArrowExporter(TemporaryFileExporter):
+    """
+    Writes a model to an Arrow IPC file, one record batch per chunk.
+    """
+
+    content_type = 'application/vnd.apache.arrow.file'
+    extension = '.arrow'
+    compressed = True
+    compression = ARROW_COMPRESSION
+
+    def __init__(self, model_name, **kwargs):
+        super().__init__(model_name, **kwargs)
+        # `format_many` of the columns formatted per batch, by position
+        self.column_formatters = {}
+
+    def get_columns(self, queryset):
+        """
+        `(name, lookup, type)` of every exported column. `lookup` is `None`
+        for columns exported as their serialized representation.
+        """
+        columns = []
+        self.column_formatters = {}
+        for name in self.fields:
+            field = self.serializer.fields[name]
+            format_many = getattr(field, 'format_many', None)
+            source = None
+            if type(field).__module__.startswith('rest_framework.') or format_many:
+                source = self.resolve_source(name, queryset)
+            if source is None:
+                columns.append((name, None, pa.string()))
+                continue
+            lookup, model_field = source
+            if format_many is not None:
+                self.column_formatters[len(columns)] = format_many
+                columns.append((name, lookup, pa.string()))
+                continue
+            if model_field is not None:
+                column_type = arrow_type(model_field)
+            elif isinstance(field, serializers.DecimalField):
+                column_type = pa.decimal128(field.max_digits, field.decimal_places)
+            elif isinstance(field, serializers.IntegerField):
+                column_type = pa.int64()
+            else:
+                column_type = pa.string()
+            columns.append((name, lookup, column_type))
+        return columns
+
+    def get_schema(self, columns):
+        return pa.schema([pa.field(name, column_type)
+                          for name, _, column_type in columns])
+
+    def iter_values(self, columns):
+        """
+        Yield the typed values of every row. Model instances are only built
+        when a column needs the serializer.
+        """
+        queryset = self.get_queryset()
+        lookups = [lookup for _, lookup, _ in columns]
+        if all(lookups):
+            queryset = queryset.values_list(*lookups)
+            for values in queryset.iterator(chunk_size=self.chunk_size):
+                self.exported += 1
+                yield values
+            return
+
+        fields = self.serializer.fields
+        to_representation = self.serializer.to_representation
+        for instance in queryset.iterator(chunk_size=self.chunk_size):
+            data = to_representation(instance)
+            self.exported += 1
+            yield [raw_value(fields[name], instance) if lookup else format_value(data[name])
+                   for name, lookup, _ in columns]
+
+    def to_batch(self, schema, rows):
+        arrays = []
+        for index, (field, values) in enumerate(zip(schema, zip(*rows))):
+            format_many = self.column_formatters.get(index)
+            if format_many is not None:
+                values = format_many(values)
+            if pa.types.is_string(field.type):
+                # UUIDs, lists and other values exported as text
+                values = [value if value is None or isinstance(value, str)
+                          else str(value) for value in values]
+            arrays.append(pa.array(values, type=field.type))
+        return pa.record_batch(arrays, schema=schema)
+
+    def iter_batches(self, schema, columns):
+        """
+        Yield the exported rows as record batches of `chunk_size` rows.
+        """
+        rows = []
+        for values in self.iter_values(columns):
+            rows.append(values)
+            if len(rows) >= self.chunk_size:
+                yield self.to_batch(schema, rows)
+                rows = []
+        if rows:
+            yield self.to_batch(schema, rows)
+
+    def write(self, file_obj):
+        columns = self.get_columns(self.get_queryset())
+        schema = self.get_schema(columns)
+        options = pa.ipc.IpcWriteOptions(compression=self.compression)
+        with pa.ipc.new_file(file_obj, schema, options=options) as writer:
+            for batch in self.iter_batches(schema, columns):
+                writer.write_batch(batch)
+
+
+class ParquetExporter(ArrowExporter):
+    """
+    Writes a model to a Parquet file with row groups of `row_group_size`
+    rows, so readers can scan the row groups in parallel.
+
+    Args:
+        row_group_size (int, optional): Rows per row group.
+    """
+
+    content_type = 'application/vnd.apache.parquet'
+    extension = '.parquet'
+    row_group_size = PARQUET_ROW_GROUP_SIZE
+
+    def __init__(self, model_name, row_group_size=None, **kwargs):
+        super().__init__(model_name, **kwargs)
+        if row_group_size is not None:
+            self.row_group_size = row_group_size
+
+    def write(self, file_obj):
+        columns = self.get_columns(self.get_queryset())
+        schema = self.get_schema(columns)
+        with pq.ParquetWriter(file_obj, schema, compression=self.compression) as writer:
+            # Buffer record batches so that every row group but the last one
+            # has exactly `row_group_size` rows
+            pending, pending_rows = [], 0
+            for batch in self.iter_batches(schema, columns):
+                pending.append(batch)
+                pending_rows += batch.num_rows
+                if pending_rows >= self.row_group_size:
+                    table = pa.Table.from_batches(pending, schema=schema)
+                    full = pending_rows - pending_rows % self.row_group_size
+                    writer.write_table(table.slice(0, full),
+                                       row_group_size=self.row_group_size)
+                    pending = table.slice(full).to_batches()
+                    pending_rows -= full
+            if pending_rows:
+                writer.write_table(pa.Table.from_batches(pending, schema=schema),
+                                   row_group_size=self.row_group_size)
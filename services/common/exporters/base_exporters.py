@@ -0,0 +1,206 @@
+"""
+Exporters writing the rows of the models of the serializer registry.
+
+Columns and their order come from the serializer registered for the model.
+Rows are read through `QuerySet.iterator`, which uses a server-side cursor on
+PostgreSQL, so memory stays constant whatever the size of the table. When
+the serializer can be compiled (see `compile_read_serializer`), rows are read
+with `values_list()` instead of building model instances.
+
+Example:
+    exporter = get_exporter_class('csv')('orderline')
+    for chunk in exporter.stream():
+        output.write(chunk)
+"""
+
+import tempfile
+
+from django.core.exceptions import FieldDoesNotExist
+from django.utils.module_loading import import_string
+
+from common.serializers.compiled_serializers import compile_read_serializer
+from common.serializers.registry_serializers import RedisSerializerRegistry
+from services.settings.export import EXPORT_CHUNK_SIZE, EXPORTER_CLASSES
+
+
+def format_value(value):
+    """
+    Flatten a serialized value into a single cell.
+    """
+    if isinstance(value, list):
+        return ';'.join(str(item) for item in value)
+    return value
+
+
+class BaseExporter:
+    """
+    Base class of the exporters of a registered model.
+
+    Args:
+        model_name (str): Registry name of the model to export.
+        queryset (QuerySet, optional): Rows to export, every row by default.
+        chunk_size (int, optional): Rows fetched per round trip.
+    """
+
+    content_type = None
+    extension = None
+    # Whether the format is compressed already
+    compressed = False
+    chunk_size = EXPORT_CHUNK_SIZE
+
+    def __init__(self, model_name, queryset=None, chunk_size=None):
+        self.model_name = model_name
+        self.serializer_class = RedisSerializerRegistry().get_serializer_class(
+            model_name)
+        self.model = self.serializer_class.Meta.model
+        self.queryset = queryset
+        if chunk_size is not None:
+            self.chunk_size = chunk_size
+        self.serializer = self.serializer_class()
+        self.fields = [name for name, field in self.serializer.fields.items()
+                       if not field.write_only]
+        self.exported = 0
+
+    @property
+    def filename(self):
+        return f'{self.model_name}{self.extension}'
+
+    def get_headers(self):
+        return list(self.fields)
+
+    def get_queryset(self):
+        queryset = self.queryset
+        if queryset is None:
+            queryset = self.model.objects.all()
+        # Serializers reading related objects declare how to load them
+        setup_eager_loading = getattr(self.serializer_class, 'setup_eager_loading', None)
+        if setup_eager_loading is not None:
+            queryset = setup_eager_loading(queryset)
+        many_to_many = [field.name for field in self.model._meta.many_to_many
+                        if field.name in self.fields]
+        if many_to_many:
+            queryset = queryset.prefetch_related(*many_to_many)
+        if not queryset.ordered:
+            queryset = queryset.order_by('pk')
+        return queryset
+
+    def resolve_source(self, name, queryset):
+        """
+        Resolve the source of the serializer field `name` to a lookup the
+        database can select.
+
+        Returns:
+            tuple: `(lookup, model_field)`, `model_field` being `None` for
+            annotations of `queryset`, or `None` if the source is not a
+            column (method, property, many-to-many...).
+        """
+        field = self.serializer.fields[name]
+        if field.source == '*':
+            return None
+        if len(field.source_attrs) == 1 and field.source in queryset.query.annotations:
+            return field.source, None
+        model = self.model
+        lookups = []
+        model_field = None
+        for attr in field.source_attrs:
+            if model is None:
+                return None
+            try:
+                model_field = model._meta.get_field(attr)
+            except FieldDoesNotExist:
+                return None
+            if not model_field.concrete or model_field.many_to_many:
+                return None
+            lookups.append(model_field.name)
+            model = model_field.related_model if model_field.is_relation else None
+        return '__'.join(lookups), model_field
+
+    def get_source_models(self):
+        """
+        The exported model and every model its columns are read from.
+        """
+        source_models = {self.model}
+        for name in self.fields:
+            model = self.model
+            for attr in self.serializer.fields[name].source_attrs:
+                try:
+                    model_field = model._meta.get_field(attr)
+                except FieldDoesNotExist:
+                    break
+                if not model_field.is_relation:
+                    break
+                if model_field.many_to_many:
+                    source_models.add(model_field.remote_field.through)
+                model = model_field.related_model
+                source_models.add(model)
+        return source_models
+
+    def iter_instances(self):
+        return self.get_queryset().iterator(chunk_size=self.chunk_size)
+
+    def iter_rows(self):
+        """
+        Yield the serialized values of every row, in header order.
+        """
+        compiled = compile_read_serializer(self.serializer_class)
+        if compiled is not None:
+            for row in compiled.iter_rows(self.get_queryset(), chunk_size=self.chunk_size):
+                self.exported += 1
+                yield row
+            return
+
+        to_representation = self.serializer.to_representation
+        fields = self.fields
+        for instance in self.iter_instances():
+            data = to_representation(instance)
+            self.exported += 1
+            yield [data[name] for name in fields]
+
+    def stream(self):
+        """
+        Yield the exported file in chunks.
+        """
+        raise NotImplementedError('Exporters must implement `stream`')
+
+    def write(self, file_obj):
+        """
+        Write the exported file to the binary `file_obj`.
+        """
+        for chunk in self.stream():
+            file_obj.write(chunk.encode('utf-8') if isinstance(chunk, str) else chunk)
+
+
+class TemporaryFileExporter(BaseExporter):
+    """
+    Base class of the exporters of formats that cannot be streamed as they
+    are written (zip containers, files ending with a footer...). The file is
+    written to a temporary file, then streamed.
+    """
+
+    # Bytes read per chunk when streaming the written file
+    block_size = 64 * 1024
+
+    def write(self, file_obj):
+        raise NotImplementedError('Exporters must implement `write`')
+
+    def stream(self):
+        with tempfile.TemporaryFile(suffix=self.extension) as file_obj:
+            self.write(file_obj)
+            file_obj.seek(0)
+            while chunk := file_obj.read(self.block_size):
+                yield chunk
+
+
+def get_exporter_class(export_format):
+    """
+    The exporter class handling `export_format`.
+
+    Raises:
+        ValueError: If no exporter handles the format.
+    """
+    try:
+        return import_string(EXPORTER_CLASSES[export_format])
+    except KeyError as exc:
+        raise ValueError(
+            f"Unsupported export format '{export_format}', expected one of "
+            f"{tuple(EXPORTER_CLASSES)}") from exc
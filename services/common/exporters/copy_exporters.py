@@ -0,0 +1,223 @@
+"""
+CSV export through PostgreSQL's `COPY ... TO STDOUT`.
+
+When every exported column is a plain column of the model, of a related
+model or an annotation, the database renders the
+CSV itself and the bytes are piped to the client without building a single
+model instance. Columns whose representation needs Python (formatted fields,
+many-to-many lists, custom fields...) fall back to the serializer path of
+`CSVExporter`. Both paths write the same columns, values and line endings;
+only empty strings differ (quoted by COPY to tell them from NULL).
+"""
+
+import queue
+import threading
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import F
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
+
+from .csv_exporters import CSVExporter
+
+# Bytes buffered before a chunk of the COPY output is handed to the response
+STREAM_BLOCK_SIZE = 64 * 1024
+
+# Chunks the COPY thread may get ahead of the response
+STREAM_QUEUE_SIZE = 16
+
+# Serializer fields whose representation is the text PostgreSQL outputs for
+# the column. Exact types only, subclasses may format values differently.
+PLAIN_FIELDS = (
+    serializers.IntegerField, serializers.CharField, serializers.EmailField,
+    serializers.URLField, serializers.SlugField, serializers.UUIDField,
+    serializers.ChoiceField, serializers.DecimalField,
+    serializers.PrimaryKeyRelatedField,
+)
+
+_DONE = object()
+
+
+class ExportCancelled(Exception):
+    """
+    Raised in the COPY thread when the response stopped reading.
+    """
+
+
+class QueueWriter:
+    """
+    File-like object handing what COPY writes to a queue, in blocks of
+    `STREAM_BLOCK_SIZE` bytes.
+    """
+
+    def __init__(self, chunks, cancelled):
+        self.chunks = chunks
+        self.cancelled = cancelled
+        self.buffer = bytearray()
+
+    def put(self, item):
+        while True:
+            if self.cancelled.is_set():
+                raise ExportCancelled()
+            try:
+                self.chunks.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def write(self, data):
+        self.buffer += data.encode('utf-8') if isinstance(data, str) else data
+        if len(self.buffer) >= STREAM_BLOCK_SIZE:
+            self.flush()
+        return len(data)
+
+    def flush(self):
+        if self.buffer:
+            self.put(bytes(self.buffer))
+            self.buffer = bytearray()
+
+
+class RowCounter:
+    """
+    File-like object passing what COPY writes on to `file_obj` and keeping
+    `exporter.exported` up to date while it runs.
+
+    A line feed ends a row unless it is inside a quoted value. Quotes inside
+    values are doubled, so a value is open after an odd number of quotes.
+    """
+
+    def __init__(self, file_obj, exporter):
+        self.file_obj = file_obj
+        self.exporter = exporter
+        self.quoted = False
+        # The header line is not a row
+        self.lines = -1 if exporter.header else 0
+
+    def write(self, data):
+        parts = (data.encode('utf-8') if isinstance(data, str) else data).split(b'"')
+        for index, part in enumerate(parts):
+            if index:
+                self.quoted = not self.quoted
+            if not self.quoted:
+                self.lines += part.count(b'\n')
+        self.exporter.exported = max(self.lines, 0)
+        return self.file_obj.write(data)
+
+
+class CopyCSVExporter(CSVExporter):
+    """
+    A `CSVExporter` using `COPY (SELECT ...) TO STDOUT WITH CSV HEADER` on
+    PostgreSQL when every column can be rendered by the database.
+    """
+
+    def get_connection(self):
+        return connections[self.get_queryset().db]
+
+    def column_expression(self, field, column):
+        """
+        SQL rendering `column` the way `field` represents it, or `None` if
+        the database cannot.
+        """
+        if type(field) in PLAIN_FIELDS:
+            return column
+        if type(field) is serializers.BooleanField:
+            return f"CASE WHEN {column} THEN 'True' WHEN NOT {column} THEN 'False' END"
+        if type(field) is serializers.DateField:
+            if getattr(field, 'format', api_settings.DATE_FORMAT) == ISO_8601:
+                return f"to_char({column}, 'YYYY-MM-DD')"
+        if type(field) is serializers.DateTimeField:
+            if (getattr(field, 'format', api_settings.DATETIME_FORMAT) == ISO_8601
+                    and settings.USE_TZ and settings.TIME_ZONE == 'UTC'):
+                return (f"regexp_replace(to_char({column} AT TIME ZONE 'UTC', "
+                        f"'YYYY-MM-DD\"T\"HH24:MI:SS.US'), "
+                        r"'\.000000$', '') || 'Z'")
+        return None
+
+    def get_columns(self, queryset):
+        """
+        `(lookup, expression)` of every exported column, or `None` if one of
+        them needs the serializer.
+        """
+        quote_name = self.get_connection().ops.quote_name
+        columns = []
+        for index, name in enumerate(self.fields):
+            field = self.serializer.fields[name]
+            source = self.resolve_source(name, queryset)
+            if source is None or getattr(field, 'pk_field', None) is not None:
+                return None
+            expression = self.column_expression(
+                field, f'export.{quote_name(f"export_column_{index}")}')
+            if expression is None:
+                return None
+            columns.append((source[0], f'{expression} AS {quote_name(name)}'))
+        return columns
+
+    def supports_copy(self):
+        connection = self.get_connection()
+        if connection.vendor != 'postgresql':
+            return False
+        from django.db.backends.postgresql.psycopg_any import is_psycopg3
+        return not is_psycopg3 and self.get_columns(self.get_queryset()) is not None
+
+    def copy_sql(self, cursor):
+        queryset = self.get_queryset()
+        columns = self.get_columns(queryset)
+        # Related columns are joined in; aliases avoid clashing column names
+        queryset = queryset.values(**{
+            f'export_column_{index}': F(lookup)
+            for index, (lookup, _) in enumerate(columns)})
+        sql, params = queryset.query.get_compiler(using=queryset.db).as_sql()
+        # COPY does not take parameters, bind them client side
+        select = cursor.mogrify(sql, params).decode('utf-8')
+        expressions = ', '.join(expression for _, expression in columns)
+        header = ' HEADER' if self.header else ''
+        return (f'COPY (SELECT {expressions} FROM ({select}) AS export) '
+                f'TO STDOUT WITH CSV{header}')
+
+    def copy_to(self, file_obj):
+        with self.get_connection().cursor() as cursor:
+            cursor.copy_expert(self.copy_sql(cursor), RowCounter(file_obj, self))
+            self.exported = cursor.rowcount
+
+    def _copy_to_queue(self, chunks, cancelled):
+        writer = QueueWriter(chunks, cancelled)
+        try:
+            self.copy_to(writer)
+            writer.flush()
+            writer.put(_DONE)
+        except ExportCancelled:
+            pass
+        except Exception as exc:
+            try:
+                writer.put(exc)
+            except ExportCancelled:
+                pass
+        finally:
+            # The thread has its own connection
+            self.get_connection().close()
+
+    def stream(self):
+        if not self.supports_copy():
+            yield from super().stream()
+            return
+
+        chunks = queue.Queue(maxsize=STREAM_QUEUE_SIZE)
+        cancelled = threading.Event()
+        thread = threading.Thread(target=self._copy_to_queue,
+                                  args=(chunks, cancelled), daemon=True)
+        thread.start()
+        try:
+            while (chunk := chunks.get()) is not _DONE:
+                if isinstance(chunk, Exception):
+                    raise chunk
+                yield chunk
+        finally:
+            cancelled.set()
+            thread.join()
+
+    def write(self, file_obj):
+        if self.supports_copy():
+            self.copy_to(file_obj)
+        else:
+            super().write(file_obj)
@@ -0,0 +1,50 @@
+"""
+Streaming CSV export.
+"""
+
+import csv
+import io
+
+from .base_exporters import BaseExporter, format_value
+
+
+class CSVExporter(BaseExporter):
+    """
+    Streams a model as CSV, one chunk of `chunk_size` rows at a time.
+
+    The header is sent before the first query runs so clients get their
+    first byte immediately.
+    """
+
+    content_type = 'text/csv'
+    extension = '.csv'
+    # The shards of a sharded export leave the header out
+    header = True
+
+    def header_line(self):
+        buffer = io.StringIO()
+        csv.writer(buffer, lineterminator='\n').writerow(self.get_headers())
+        return buffer.getvalue()
+
+    def stream(self):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator='\n')
+
+        def flush():
+            chunk = buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            return chunk
+
+        if self.header:
+            yield self.header_line()
+        pending = 0
+        for row in self.iter_rows():
+            writer.writerow(['' if value is None else format_value(value)
+                             for value in row])
+            pending += 1
+            if pending >= self.chunk_size:
+                yield flush()
+                pending = 0
+        if pending:
+            yield flush()
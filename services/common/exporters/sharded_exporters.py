@@ -0,0 +1,216 @@
+"""
+Parallel CSV export of large tables split into primary key ranges.
+
+A single export is bound by one backend process scanning the table. Here
+the primary key range is split into shards exported concurrently, each in
+its own thread and database connection. The shards import the snapshot
+exported by a coordinating transaction (`pg_export_snapshot`), so together
+they see the table exactly as a single export would.
+
+Each shard writes a gzip member to a temporary file. Concatenated in key
+order after a member holding the CSV header, the members make one valid
+gzip file. Shards are in primary key order, so only exports ordered by
+primary key are sharded.
+
+Example:
+    if supports_sharding(exporter):
+        with open(path, 'wb') as file_obj:
+            write_sharded(exporter, file_obj, shards=4)
+"""
+
+import gzip
+import math
+import os
+import shutil
+import tempfile
+import threading
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
+
+from django.db import connections, models, transaction
+from django.db.models import Max, Min
+
+from services.settings.export import EXPORT_COMPRESSLEVEL, EXPORT_PROGRESS_INTERVAL
+from .csv_exporters import CSVExporter
+
+
+class ShardCancelled(Exception):
+    """
+    Raised in a shard when another shard failed or the export was aborted.
+    """
+
+
+def is_pk_ordered(queryset):
+    """
+    Whether the rows of `queryset` come in ascending primary key order (or
+    in no particular order), its model's default ordering included.
+    """
+    query = queryset.query
+    ordering = list(query.order_by) or list(
+        queryset.model._meta.ordering if query.default_ordering else [])
+    pk = queryset.model._meta.pk
+    return ordering in ([], ['pk'], [pk.name], [pk.attname])
+
+
+def supports_sharding(exporter):
+    """
+    Whether `exporter` can be split into primary key ranges.
+    """
+    queryset = exporter.get_queryset()
+    return (isinstance(exporter, CSVExporter)
+            and connections[queryset.db].vendor == 'postgresql'
+            and isinstance(exporter.model._meta.pk, models.IntegerField)
+            and is_pk_ordered(queryset))
+
+
+def key_ranges(queryset, shards):
+    """
+    Split the primary key range of `queryset` into at most `shards`
+    half-open `(start, stop)` ranges, or `[]` if it is empty.
+    """
+    bounds = queryset.aggregate(low=Min('pk'), high=Max('pk'))
+    if bounds['low'] is None:
+        return []
+    low, high = bounds['low'], bounds['high'] + 1
+    step = math.ceil((high - low) / shards)
+    return [(start, min(start + step, high)) for start in range(low, high, step)]
+
+
+class SnapshotHolder(threading.Thread):
+    """
+    Holds a repeatable read transaction open on its own connection and
+    exports its snapshot for the shards, until `release` is set.
+    """
+
+    def __init__(self, using, queryset, shards):
+        super().__init__(daemon=True)
+        self.using = using
+        self.queryset = queryset
+        self.shards = shards
+        self.ready = threading.Event()
+        self.release = threading.Event()
+        self.snapshot_id = None
+        self.ranges = None
+        self.error = None
+
+    def run(self):
+        connection = connections[self.using]
+        try:
+            with transaction.atomic(using=self.using):
+                with connection.cursor() as cursor:
+                    cursor.execute('SET TRANSACTION ISOLATION LEVEL REPEATABLE READ')
+                    cursor.execute('SELECT pg_export_snapshot()')
+                    self.snapshot_id = cursor.fetchone()[0]
+                # Split the range as the shards will see it
+                self.ranges = key_ranges(self.queryset, self.shards)
+                self.ready.set()
+                self.release.wait()
+        except Exception as exc:
+            self.error = exc
+        finally:
+            self.ready.set()
+            connection.close()
+
+
+class ShardFile:
+    """
+    Counts the bytes written by a shard and stops it once cancelled.
+    """
+
+    def __init__(self, file_obj, cancelled):
+        self.file_obj = file_obj
+        self.cancelled = cancelled
+        self.written = 0
+
+    def write(self, data):
+        if self.cancelled.is_set():
+            raise ShardCancelled()
+        self.written += len(data)
+        return self.file_obj.write(data)
+
+    def flush(self):
+        self.file_obj.flush()
+
+
+def export_shard(exporter, using, snapshot_id, file_obj, cancelled):
+    connection = connections[using]
+    try:
+        with transaction.atomic(using=using):
+            with connection.cursor() as cursor:
+                cursor.execute('SET TRANSACTION ISOLATION LEVEL REPEATABLE READ')
+                cursor.execute('SET TRANSACTION SNAPSHOT %s', [snapshot_id])
+            with gzip.GzipFile(fileobj=file_obj, mode='wb',
+                               compresslevel=EXPORT_COMPRESSLEVEL) as gzip_file:
+                exporter.write(gzip_file)
+    finally:
+        connection.close()
+
+
+def write_sharded(exporter, file_obj, shards, on_progress=None,
+                  interval=EXPORT_PROGRESS_INTERVAL):
+    """
+    Write a gzip compressed CSV export of `exporter` to `file_obj`, exporting
+    `shards` primary key ranges concurrently.
+
+    Args:
+        exporter (CSVExporter): The export to split, see `supports_sharding`.
+        file_obj: Binary file the gzip members are appended to, in key order.
+        shards (int): Number of shards and connections.
+        on_progress (callable, optional): Called every `interval` seconds
+            with the bytes written so far; `exporter.exported` holds the rows
+            exported so far. May raise to abort the export.
+    """
+    queryset = exporter.get_queryset()
+    holder = SnapshotHolder(queryset.db, queryset, shards)
+    holder.start()
+    holder.ready.wait()
+    if holder.error is not None:
+        raise holder.error
+
+    cancelled = threading.Event()
+    directory = os.path.dirname(getattr(file_obj, 'name', '')) or None
+    shard_files, shard_exporters = [], []
+    try:
+        for start, stop in holder.ranges:
+            shard_exporter = exporter.__class__(
+                exporter.model_name,
+                queryset=(exporter.queryset if exporter.queryset is not None
+                          else exporter.model.objects.all()).filter(
+                              pk__gte=start, pk__lt=stop),
+                chunk_size=exporter.chunk_size)
+            shard_exporter.header = False
+            shard_exporters.append(shard_exporter)
+            shard_files.append(ShardFile(
+                tempfile.TemporaryFile(dir=directory), cancelled))
+
+        with ThreadPoolExecutor(max_workers=max(len(shard_files), 1)) as pool:
+            pending = [pool.submit(export_shard, shard_exporter, queryset.db,
+                                   holder.snapshot_id, shard_file, cancelled)
+                       for shard_exporter, shard_file in zip(shard_exporters, shard_files)]
+            futures = list(pending)
+            try:
+                while pending:
+                    done, pending = wait(pending, timeout=interval,
+                                         return_when=FIRST_EXCEPTION)
+                    if any(future.exception() for future in done):
+                        break
+                    exporter.exported = sum(shard.exported for shard in shard_exporters)
+                    if on_progress is not None:
+                        on_progress(sum(shard.written for shard in shard_files))
+            finally:
+                # Stop the remaining shards on errors and aborts
+                cancelled.set()
+            for future in futures:
+                future.result()
+    finally:
+        holder.release.set()
+        holder.join()
+
+    exporter.exported = sum(shard.exported for shard in shard_exporters)
+    # Written apart from the shards, an empty export still has its header
+    with gzip.GzipFile(fileobj=file_obj, mode='wb',
+                       compresslevel=EXPORT_COMPRESSLEVEL) as gzip_file:
+        gzip_file.write(exporter.header_line().encode('utf-8'))
+    for shard_file in shard_files:
+        with shard_file.file_obj as shard:
+            shard.seek(0)
+            shutil.copyfileobj(shard, file_obj)
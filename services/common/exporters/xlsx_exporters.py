@@ -0,0 +1,59 @@
+"""
+Constant-memory XLSX export.
+
+Workbooks are written with openpyxl's write-only mode, which flushes every
+row to disk instead of keeping cells in memory, to a temporary file that is
+then streamed to the client.
+"""
+
+from openpyxl import Workbook
+from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+
+from .base_exporters import TemporaryFileExporter, format_value
+
+# Rows per worksheet allowed by Excel, header included
+EXCEL_MAX_ROWS = 1048576
+
+
+def format_cell(value):
+    value = format_value(value)
+    if isinstance(value, str):
+        return ILLEGAL_CHARACTERS_RE.sub('', value)
+    return value
+
+
+class XLSXExporter(TemporaryFileExporter):
+    """
+    Writes a model to an XLSX workbook, starting a new worksheet whenever
+    the current one reaches `max_sheet_rows`.
+    """
+
+    content_type = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    extension = '.xlsx'
+    compressed = True
+    max_sheet_rows = EXCEL_MAX_ROWS
+
+    def create_sheet(self, workbook, index):
+        # Worksheet titles are limited to 31 characters
+        suffix = f' ({index})' if index > 1 else ''
+        sheet = workbook.create_sheet(
+            title=self.model_name[:31 - len(suffix)] + suffix)
+        sheet.append(self.get_headers())
+        return sheet
+
+    def write(self, file_obj):
+        """
+        Write the workbook to `file_obj`.
+        """
+        workbook = Workbook(write_only=True)
+        sheet_count = 1
+        sheet = self.create_sheet(workbook, sheet_count)
+        sheet_rows = 1
+        for row in self.iter_rows():
+            if sheet_rows >= self.max_sheet_rows:
+                sheet_count += 1
+                sheet = self.create_sheet(workbook, sheet_count)
+                sheet_rows = 1
+            sheet.append([format_cell(value) for value in row])
+            sheet_rows += 1
+        workbook.save(file_obj)
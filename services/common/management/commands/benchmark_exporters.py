@@ -0,0 +1,61 @@
+import multiprocessing
+import resource
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+from common.exporters.base_exporters import get_exporter_class
+
+
+def run_export(export_format, model_name, rows, connection):
+    """
+    Export `rows` rows in a forked child so its peak RSS is measured alone.
+    """
+    exporter_class = get_exporter_class(export_format)
+    model = exporter_class(model_name).model
+    queryset = model.objects.order_by('pk')[:rows] if rows else None
+    exporter = exporter_class(model_name, queryset=queryset)
+
+    start_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    size = sum(len(chunk) for chunk in exporter.stream())
+    elapsed = time.perf_counter() - start
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    connection.send((exporter.exported, size, elapsed, start_rss, peak_rss))
+    connection.close()
+
+
+class Command(BaseCommand):
+
+    help = ('Compares the throughput and peak memory of the export formats '
+            'on an existing model.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--model', default='orderline',
+                            help='Registry name of the model to export.')
+        parser.add_argument('--rows', type=int, default=None,
+                            help='Number of rows exported, every row by default.')
+        parser.add_argument('--formats', nargs='+', default=['csv', 'xlsx'],
+                            help='Export formats to compare.')
+
+    def handle(self, *args, **options):
+        context = multiprocessing.get_context('fork')
+        # Children must open their own database connections
+        connections.close_all()
+
+        self.stdout.write(f"{'format':>8} {'rows':>10} {'seconds':>10} {'rows/sec':>10} "
+                          f"{'MB':>8} {'peak RSS MB':>12} {'growth MB':>10}")
+        for export_format in options['formats']:
+            receiver, sender = context.Pipe(duplex=False)
+            process = context.Process(target=run_export, args=(
+                export_format, options['model'], options['rows'], sender))
+            process.start()
+            sender.close()
+            rows, size, elapsed, start_rss, peak_rss = receiver.recv()
+            process.join()
+
+            # ru_maxrss is in kilobytes on Linux
+            self.stdout.write(
+                f'{export_format:>8} {rows:>10} {elapsed:>10.2f} '
+                f'{rows / elapsed if elapsed else 0:>10.0f} {size / 2 ** 20:>8.1f} '
+                f'{peak_rss / 1024:>12.1f} {(peak_rss - start_rss) / 1024:>10.1f}')
@@ -0,0 +1,59 @@
+import datetime
+import decimal
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from rest_framework import serializers
+
+from common.serializers.formart_serializers import FormattedField
+
+
+def sample_values(formt, count, distinct):
+    """
+    `count` values for the format `formt`, drawn from `distinct` values.
+    """
+    rng = random.Random(0)
+    if formt == 'currency':
+        pool = [decimal.Decimal(rng.randrange(100, 10 ** 7)).scaleb(-2) for _ in range(distinct)]
+    elif formt == 'percentage':
+        pool = [decimal.Decimal(rng.randrange(0, 10 ** 4)).scaleb(-4) for _ in range(distinct)]
+    else:
+        start = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+        pool = [start + datetime.timedelta(minutes=rng.randrange(10 ** 6))
+                for _ in range(distinct)]
+    return [pool[rng.randrange(distinct)] for _ in range(count)]
+
+
+class Command(BaseCommand):
+
+    help = ('Compares formatting values one by one with FormattedField.to_representation '
+            'and a whole column with FormattedField.format_many.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--values', type=int, default=1_000_000,
+                            help='Number of values formatted per format.')
+        parser.add_argument('--distinct', type=int, default=10_000,
+                            help='Number of distinct values among them.')
+        parser.add_argument('--formats', nargs='+', default=['currency', 'percentage', 'date'],
+                            help='Formats compared.')
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"{'format':>11} {'values':>10} {'per value s':>12} "
+                          f"{'column s':>10} {'speedup':>8}")
+        for formt in options['formats']:
+            field = FormattedField(formt=formt)
+            field.bind(formt, serializers.Serializer())
+            values = sample_values(formt, options['values'], options['distinct'])
+
+            start = time.perf_counter()
+            one_by_one = [field.to_representation(value) for value in values]
+            per_value = time.perf_counter() - start
+
+            start = time.perf_counter()
+            column = field.format_many(values)
+            batch = time.perf_counter() - start
+
+            assert column == one_by_one
+            self.stdout.write(f'{formt:>11} {len(values):>10} {per_value:>12.3f} '
+                              f'{batch:>10.3f} {per_value / batch if batch else 0:>7.1f}x')
@@ -0,0 +1,55 @@
+import time
+
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+
+from common.serializers.field_meta_serializers import ReadOnlyWithMetadataSerializer
+from common.serializers.registry_serializers import RedisSerializerRegistry
+
+
+def metadata_serializer_class(model):
+    """
+    A `ReadOnlyWithMetadataSerializer` of every field of `model`.
+    """
+    meta = type('Meta', (), {'model': model, 'fields': '__all__'})
+    return type(f'{model.__name__}MetadataSerializer',
+                (ReadOnlyWithMetadataSerializer,), {'Meta': meta})
+
+
+class Command(BaseCommand):
+
+    help = ('Compares the payload size and serialization time of the per value '
+            'and columnar representations of metadata serializers.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--model', default='product',
+                            help='Registry name of the model serialized.')
+        parser.add_argument('--rows', type=int, default=1000,
+                            help='Number of instances serialized.')
+        parser.add_argument('--repeat', type=int, default=5,
+                            help='Runs per format, the best one is reported.')
+
+    def handle(self, *args, **options):
+        model = RedisSerializerRegistry().get_serializer_class(options['model']).Meta.model
+        serializer_class = metadata_serializer_class(model)
+        # Loaded beforehand, queries are not part of the measure
+        instances = list(model.objects.order_by('pk')[:options['rows']])
+        renderer = JSONRenderer()
+
+        self.stdout.write(f"{'format':>9} {'rows':>8} {'serialize s':>12} {'render s':>10} "
+                          f"{'rows/sec':>10} {'KB':>10}")
+        for name, context in (('per value', {}), ('columnar', {'columnar': True})):
+            best = None
+            for _ in range(options['repeat']):
+                start = time.perf_counter()
+                data = serializer_class(instances, many=True, context=context).data
+                serialized = time.perf_counter()
+                content = renderer.render(data)
+                rendered = time.perf_counter()
+                timings = (serialized - start, rendered - serialized)
+                if best is None or sum(timings) < sum(best):
+                    best = timings
+            total = sum(best)
+            self.stdout.write(
+                f'{name:>9} {len(instances):>8} {best[0]:>12.4f} {best[1]:>10.4f} '
+                f'{len(instances) / total if total else 0:>10.0f} {len(content) / 1024:>10.1f}')
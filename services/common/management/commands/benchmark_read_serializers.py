@@ -0,0 +1,45 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from common.serializers.compiled_serializers import compile_read_serializer
+from common.serializers.registry_serializers import RedisSerializerRegistry
+
+
+class Command(BaseCommand):
+
+    help = ('Compares the throughput of a registered serializer and of its compiled '
+            'values_list() version, queries included.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--model', default='orderline_export',
+                            help='Registry name of the model serialized.')
+        parser.add_argument('--rows', type=int, default=None,
+                            help='Number of rows serialized, every row by default.')
+        parser.add_argument('--repeat', type=int, default=3,
+                            help='Runs per serializer, the best one is reported.')
+
+    def handle(self, *args, **options):
+        serializer_class = RedisSerializerRegistry().get_serializer_class(options['model'])
+        compiled = compile_read_serializer(serializer_class)
+        if compiled is None:
+            raise CommandError(f"The serializer of '{options['model']}' cannot be compiled")
+        # With the serializer's eager loading, for both
+        queryset = compiled.prepare(serializer_class.Meta.model.objects.order_by('pk'))
+        if options['rows']:
+            queryset = queryset[:options['rows']]
+
+        runs = (
+            ('serializer', lambda: serializer_class(queryset.all(), many=True).data),
+            ('compiled', lambda: compiled.serialize(queryset.all())),
+        )
+        self.stdout.write(f"{'serializer':>10} {'rows':>10} {'seconds':>10} {'rows/sec':>10}")
+        for name, run in runs:
+            best, rows = None, 0
+            for _ in range(options['repeat']):
+                start = time.perf_counter()
+                rows = len(run())
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+            self.stdout.write(f'{name:>10} {rows:>10} {best:>10.3f} '
+                              f'{rows / best if best else 0:>10.0f}')
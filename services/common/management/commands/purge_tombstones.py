@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from services.settings.export import TOMBSTONE_RETENTION
+from common.models import Tombstone
+
+
+class Command(BaseCommand):
+
+    help = 'Deletes the tombstones of deleted rows older than TOMBSTONE_RETENTION.'
+
+    def handle(self, *args, **options):
+        deleted, _ = Tombstone.objects.filter(
+            deleted_at__lt=timezone.now() - TOMBSTONE_RETENTION).delete()
+        self.stdout.write(f'Deleted {deleted} tombstones')
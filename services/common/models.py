@@ -1,3 +1,19 @@
 from django.db import models
 
 # Create your models here.
+
+
+class Tombstone(models.Model):
+    """
+    A deleted row, kept so incremental exports can report deletions since a
+    watermark. Purged after `TOMBSTONE_RETENTION`.
+    """
+    model_label = models.CharField(max_length=100)
+    object_pk = models.CharField(max_length=64)
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['model_label', 'deleted_at'],
+                         name='tombstone_model_deleted'),
+        ]
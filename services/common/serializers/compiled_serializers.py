@@ -0,0 +1,159 @@
+"""
+Compiled read serializers.
+
+`CompiledReadSerializer` reads the columns of a `ModelSerializer` with a single
+`values_list()` query (related columns are joined) and converts each value
+with the representation of its serializer field, without building model
+instances or walking the serializer for every row. The output is the same
+as the serializer's.
+
+Only serializers whose readable fields all map to a column can be compiled:
+fields sourced from a concrete model field (possibly through non-nullable
+foreign keys) or from an annotation added by the serializer's
+`setup_eager_loading`, and primary key related fields. Method, nested and
+many-to-many fields are not, nor are serializers overriding
+`to_representation`, whose output the compiled rows would not match.
+
+Example:
+    compiled = compile_read_serializer(ProductSerializer)
+    if compiled is not None:
+        data = compiled.serialize(Product.objects.all())
+"""
+
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Type
+
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+from rest_framework.fields import Field
+from rest_framework.relations import PKOnlyObject, PrimaryKeyRelatedField
+
+
+class UnsupportedField(Exception):
+    """
+    A serializer field whose value cannot be read from a column, or a
+    serializer whose representation is not made of its fields alone.
+    """
+
+
+def pk_representation(field: PrimaryKeyRelatedField):
+    def to_representation(value):
+        return field.to_representation(PKOnlyObject(pk=value))
+    return to_representation
+
+
+class CompiledReadSerializer:
+    """
+    A read-only `values_list()` version of a `ModelSerializer`.
+
+    Raises:
+        UnsupportedField: If a readable field cannot be compiled.
+    """
+
+    def __init__(self, serializer_class: Type[serializers.ModelSerializer]):
+        if serializer_class.to_representation is not serializers.ModelSerializer.to_representation:
+            raise UnsupportedField(
+                f"'{serializer_class.__name__}' overrides `to_representation`")
+        self.serializer_class = serializer_class
+        self.model = serializer_class.Meta.model
+        self.setup_eager_loading = getattr(serializer_class, 'setup_eager_loading', None)
+        annotations = self.prepare(self.model.objects.all()).query.annotations
+        self.annotations = set()
+        self.names, self.lookups, self.converters = [], [], []
+        for name, field in serializer_class().fields.items():
+            if field.write_only:
+                continue
+            lookup, to_representation = self.compile_field(field, annotations)
+            self.names.append(name)
+            self.lookups.append(lookup)
+            self.converters.append(to_representation)
+
+    def compile_field(self, field: Field, annotations) -> Tuple[str, Any]:
+        """
+        `(lookup, to_representation)` of a readable serializer field.
+        """
+        is_pk_relation = (isinstance(field, PrimaryKeyRelatedField)
+                          and field.use_pk_only_optimization())
+        if isinstance(field, serializers.BaseSerializer) or not (
+                is_pk_relation or type(field).get_attribute is Field.get_attribute):
+            raise UnsupportedField(f"'{field.field_name}' is not read from a column")
+        if field.source == '*':
+            raise UnsupportedField(f"'{field.field_name}' is sourced from the instance")
+
+        if len(field.source_attrs) == 1 and field.source in annotations:
+            if is_pk_relation:
+                raise UnsupportedField(f"'{field.field_name}' is an annotated relation")
+            self.annotations.add(field.source)
+            return field.source, field.to_representation
+
+        model = self.model
+        lookups = []
+        for index, attr in enumerate(field.source_attrs):
+            try:
+                model_field = model._meta.get_field(attr)
+            except FieldDoesNotExist as exc:
+                raise UnsupportedField(f"'{field.field_name}' is not a model field") from exc
+            if not model_field.concrete or model_field.many_to_many:
+                raise UnsupportedField(f"'{field.field_name}' is not a column")
+            lookups.append(model_field.name)
+            if index == len(field.source_attrs) - 1:
+                break
+            # Through a null relation the serializer skips the field, a join
+            # would give `None`
+            if not model_field.is_relation or model_field.null:
+                raise UnsupportedField(f"'{field.field_name}' follows a nullable relation")
+            model = model_field.related_model
+
+        if model_field.is_relation != is_pk_relation:
+            raise UnsupportedField(f"'{field.field_name}' represents a related instance")
+        to_representation = pk_representation(field) if is_pk_relation else field.to_representation
+        return '__'.join(lookups), to_representation
+
+    def prepare(self, queryset):
+        """
+        Apply the serializer's `setup_eager_loading` (annotations read by its
+        fields) to `queryset`.
+        """
+        if self.setup_eager_loading is not None:
+            queryset = self.setup_eager_loading(queryset)
+        return queryset
+
+    def iter_rows(self, queryset, chunk_size: Optional[int] = None) -> Iterator[List[Any]]:
+        """
+        Yield the representation of every row of `queryset` as a list of
+        values, in the order of `names`.
+        """
+        if not self.annotations <= set(queryset.query.annotations):
+            queryset = self.prepare(queryset)
+        rows = queryset.values_list(*self.lookups)
+        rows = rows.iterator(chunk_size=chunk_size) if chunk_size else rows.iterator()
+        converters = self.converters
+        for row in rows:
+            yield [None if value is None else convert(value)
+                   for convert, value in zip(converters, row)]
+
+    def iter_dicts(self, queryset, chunk_size: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        names = self.names
+        for row in self.iter_rows(queryset, chunk_size=chunk_size):
+            yield dict(zip(names, row))
+
+    def serialize(self, queryset) -> List[Dict[str, Any]]:
+        """
+        The same data as `serializer_class(queryset, many=True).data`.
+        """
+        return list(self.iter_dicts(queryset))
+
+
+_compiled = {}
+
+
+def compile_read_serializer(serializer_class) -> Optional[CompiledReadSerializer]:
+    """
+    The compiled version of `serializer_class`, built once per class, or
+    `None` if it cannot be compiled.
+    """
+    if serializer_class not in _compiled:
+        try:
+            _compiled[serializer_class] = CompiledReadSerializer(serializer_class)
+        except UnsupportedField:
+            _compiled[serializer_class] = None
+    return _compiled[serializer_class]
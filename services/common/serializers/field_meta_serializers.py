@@ -4,9 +4,12 @@ with Django REST Framework.
 
 Classes:
 - FieldMetaSerializer: A serializer for returning field metadata for a given model serializer.
+- FieldMetaCatalog: The field metadata of serializers, compiled to JSON once.
 - ReadOnlyBaseSerializer: A base serializer for read-only operations.
 - ReadOnlyWithMetadataSerializer: A custom model serializer that includes field metadata
   in the serialized data.
+- ColumnarListSerializer: A list representation of `ReadOnlyWithMetadataSerializer`
+  sending the field metadata once.
 
 Usage:
 1. FieldMetaSerializer:
@@ -15,6 +18,8 @@ Usage:
    - Example:
         # Get all field metadata for the serializer
         fields_metadata = FieldMetaSerializer.get_serializer_fields_meta(YourModelSerializer)
+   - `field_meta_catalog.get(YourModelSerializer)` returns the same metadata
+     rendered to JSON once per serializer class, ready to be sent.
 
 2. ReadOnlyBaseSerializer:
    - Inherit from this class to create read-only serializers.
@@ -27,6 +32,9 @@ Usage:
    - The `to_representation` method is overridden to add field metadata to the serialized data.
    - The `add_field_meta` method is responsible for adding the field metadata to the serialized data.
    - The `get_field_info` method returns a dictionary containing field information for a given field.
+   - With `many=True` and `context={'columnar': True}`, lists are represented by
+     `ColumnarListSerializer`: the field schema once, then every instance as an array of
+     values in the order of the schema.
 
 Note: Both `ReadOnlyBaseSerializer` and `ReadOnlyWithMetadataSerializer` are abstract base classes
 and should be subclassed to create concrete serializer classes.
@@ -35,7 +43,14 @@ and should be subclassed to create concrete serializer classes.
 
 from typing import Any, Dict, List
 
+from django.db import models
 from rest_framework import serializers
+from rest_framework.fields import SkipField
+from rest_framework.relations import PKOnlyObject
+from rest_framework.serializers import LIST_SERIALIZER_KWARGS, LIST_SERIALIZER_KWARGS_REMOVE
+from rest_framework.utils.serializer_helpers import ReturnDict
+
+from utils.response_cache import PrecompiledResponse
 
 
 class ReadOnlyBaseSerializer(serializers.ModelSerializer):
@@ -92,11 +107,34 @@ class FieldMetaSerializer(ReadOnlyBaseSerializer):
         """
         Get field metadata for all fields in the given serializer class.
         """
-        fields_meta = []
-        for field_name, field in serializer_class().fields.items():
-            field_meta = FieldMetaSerializer(instance=field)
-            fields_meta.append(field_meta.data)
-        return fields_meta
+        return [cls.get_field_meta(field) for field in serializer_class().fields.values()]
+
+
+class FieldMetaCatalog:
+    """
+    Field metadata of serializers, rendered to JSON once per serializer class.
+
+    Entries are keyed by class, so a serializer registered again under the
+    same model name (see `RedisSerializerRegistry`) gets its own entry.
+    """
+
+    def __init__(self):
+        self._compiled = {}
+
+    def get(self, serializer_class: serializers.Serializer) -> PrecompiledResponse:
+        compiled = self._compiled.get(serializer_class)
+        if compiled is None:
+            compiled = PrecompiledResponse.json(
+                FieldMetaSerializer.get_serializer_fields_meta(serializer_class))
+            self._compiled[serializer_class] = compiled
+        return compiled
+
+    def warm(self, serializer_classes) -> None:
+        for serializer_class in serializer_classes:
+            self.get(serializer_class)
+
+
+field_meta_catalog = FieldMetaCatalog()
 
 
 class ReadOnlyWithMetadataSerializer(ReadOnlyBaseSerializer):
@@ -105,6 +143,24 @@ class ReadOnlyWithMetadataSerializer(ReadOnlyBaseSerializer):
     """
     is_read_only: serializers.SerializerMethodField = serializers.SerializerMethodField()
 
+    # Field schema of each serializer class, see `get_field_schema`
+    _field_schemas: Dict[type, List[Dict[str, Any]]] = {}
+
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        """
+        Use `ColumnarListSerializer` for lists serialized with the `columnar`
+        context flag.
+        """
+        if not (kwargs.get('context') or {}).get('columnar'):
+            return super().many_init(*args, **kwargs)
+        list_kwargs = {key: kwargs.pop(key) for key in LIST_SERIALIZER_KWARGS_REMOVE
+                       if key in kwargs}
+        list_kwargs['child'] = cls(*args, **kwargs)
+        list_kwargs.update({key: value for key, value in kwargs.items()
+                            if key in LIST_SERIALIZER_KWARGS})
+        return ColumnarListSerializer(*args, **list_kwargs)
+
     def to_representation(self, instance: Any) -> Dict[str, Any]:
         data = super().to_representation(instance)
         if not self.context.get('list_retrieval'):
@@ -132,16 +188,63 @@ class ReadOnlyWithMetadataSerializer(ReadOnlyBaseSerializer):
             'field_type': field.__class__.__name__,
         }
 
+    def get_field_schema(self) -> List[Dict[str, Any]]:
+        """
+        Field information of the readable fields, in order, computed once per
+        serializer class.
+        """
+        schema = self._field_schemas.get(type(self))
+        if schema is None:
+            schema = [self.get_field_info(field) for field in self._readable_fields]
+            self._field_schemas[type(self)] = schema
+        return schema
+
     def add_field_meta(self, instance: Any, data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Add field metadata to the serialized data.
         """
-        updated_data = {}
-        for field_name, field in self.fields.items():
-            value = field.get_attribute(instance)
-            field_info = self.get_field_info(field)
-            updated_data[field_name] = {
-                "value": value,
+        return {
+            field_info['name']: {
+                "value": data.get(field_info['name']),
                 **field_info,
             }
-        return updated_data
+            for field_info in self.get_field_schema()
+        }
+
+    def to_row(self, instance: Any) -> List[Any]:
+        """
+        The representation of `instance` as an array of values, in the order
+        of `get_field_schema` (`None` for skipped fields).
+        """
+        row = []
+        for field in self._readable_fields:
+            try:
+                attribute = field.get_attribute(instance)
+            except SkipField:
+                row.append(None)
+                continue
+            check_for_none = attribute.pk if isinstance(attribute, PKOnlyObject) else attribute
+            row.append(None if check_for_none is None else field.to_representation(attribute))
+        return row
+
+
+class ColumnarListSerializer(serializers.ListSerializer):
+    """
+    List representation sending the field schema once and each instance as
+    an array of values:
+
+        {"fields": [{"name": "id", "label": "ID", ...}, ...],
+         "rows": [[1, ...], [2, ...]]}
+    """
+
+    def to_representation(self, data: Any) -> Dict[str, Any]:
+        iterable = data.all() if isinstance(data, models.manager.BaseManager) else data
+        return {
+            'fields': self.child.get_field_schema(),
+            'rows': [self.child.to_row(item) for item in iterable],
+        }
+
+    @property
+    def data(self) -> ReturnDict:
+        ret = super(serializers.ListSerializer, self).data
+        return ReturnDict(ret, serializer=self)
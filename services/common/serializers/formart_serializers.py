@@ -1,12 +1,17 @@
 """
 Module providing custom serializers for formatting data fields.
 
+`FormattedField.format_many` formats a whole column at once (list endpoints,
+exports), formatting each distinct value a single time.
 """
 
 import datetime
 import decimal
 from rest_framework import serializers
 
+CENT = decimal.Decimal('.01')
+HUNDRED = decimal.Decimal(100)
+
 
 def format_currency(value):
     """
@@ -18,11 +23,9 @@ def format_currency(value):
     Returns:
         str: The formatted currency value.
     """
-    amount = decimal.Decimal(value)
-    amount = amount.quantize(decimal.Decimal(
-        '.01'), rounding=decimal.ROUND_HALF_UP)
-    amount_str = '{:,.2f}'.format(amount)
-    return '$' + amount_str
+    amount = value if isinstance(value, decimal.Decimal) else decimal.Decimal(value)
+    amount = amount.quantize(CENT, rounding=decimal.ROUND_HALF_UP)
+    return '$' + format(amount, ',.2f')
 
 
 def format_date(value):
@@ -63,8 +66,8 @@ def format_percentage(value):
     Returns:
         str: The formatted percentage value.
     """
-    percentage = decimal.Decimal(value) * 100
-    return '{:.2f}%'.format(percentage)
+    amount = value if isinstance(value, decimal.Decimal) else decimal.Decimal(value)
+    return format(amount * HUNDRED, '.2f') + '%'
 
 
 def format_boolean(value):
@@ -93,6 +96,54 @@ def format_duration(value):
     return str(value)
 
 
+FORMATTERS = {
+    'currency': format_currency,
+    'date': format_date,
+    'masked': format_masked,
+    'percentage': format_percentage,
+    'boolean': format_boolean,
+    'duration': format_duration,
+}
+
+
+# Values formatted before deciding whether distinct values are worth caching
+FORMAT_MANY_SAMPLE = 65536
+
+
+def format_many(formatter, values):
+    """
+    Format a column of values. Columns repeating values (prices, dates...)
+    call `formatter` once per distinct value; when the first values are
+    mostly distinct, the rest is formatted without the cache. `None` values
+    stay `None`.
+
+    Args:
+        formatter (callable): Formats a single value.
+        values (iterable): The values of the column.
+
+    Returns:
+        list: The formatted values, in order.
+    """
+    formatted = {None: None}
+    result = []
+    append = result.append
+    values = iter(values)
+    for index, value in enumerate(values, 1):
+        # Keyed by type too: 1, 1.0 and True are equal but formatted apart
+        key = value if value is None else (type(value), value)
+        try:
+            text = formatted[key]
+        except KeyError:
+            text = formatted[key] = formatter(value)
+        except TypeError:
+            # Unhashable value
+            text = formatter(value)
+        append(text)
+        if index == FORMAT_MANY_SAMPLE and len(formatted) * 2 > index:
+            result.extend([None if value is None else formatter(value) for value in values])
+    return result
+
+
 class FormattedField(serializers.Field):
     """
       Base class for formatting serializer fields.
@@ -109,8 +160,8 @@ class FormattedField(serializers.Field):
           from .models import Product
 
           class ProductSerializer(serializers.ModelSerializer):
-              price = FormattedField(format='currency')
-              created_at = FormattedField(format='date')
+              price = FormattedField(formt='currency')
+              created_at = FormattedField(formt='date')
 
               class Meta:
                   model = Product
@@ -123,10 +174,33 @@ class FormattedField(serializers.Field):
 
     def __init__(self, formt=None, **kwargs):
         self.formt = formt
+        self.formatter = None
         super().__init__(**kwargs)
 
+    def bind(self, field_name, parent):
+        super().bind(field_name, parent)
+        self.formatter = self.get_formatter()
+
+    def get_formatter(self):
+        """
+        The function formatting values: a `format_<formt>` method of the
+        field if any, else the formatter of `FORMATTERS`. `None` leaves
+        values unchanged.
+        """
+        if not self.formt:
+            return None
+        return getattr(self, 'format_' + self.formt, None) or FORMATTERS.get(self.formt)
+
     def to_representation(self, value):
-        format_function = getattr(self, 'format_' + self.formt, None)
-        if format_function:
-            return format_function(value)
+        formatter = self.formatter
+        if formatter is not None:
+            return formatter(value)
         return value
+
+    def format_many(self, values):
+        """
+        The representations of a column of values, `None` values included.
+        """
+        if self.formatter is None:
+            return list(values)
+        return format_many(self.formatter, values)
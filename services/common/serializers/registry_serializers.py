@@ -20,45 +20,138 @@ Example Usage:
     else:
         print("Error:", serialized_book.errors)
 """
+import logging
+import os
+import threading
+import time
 from typing import Type
-from functools import lru_cache
 from rest_framework import serializers
 from django.utils.module_loading import import_string
 from django.core.cache import cache
 
+logger = logging.getLogger(__name__)
+
+SERIALIZER_KEY = 'serializers:{}'
+SERIALIZER_KEYS_KEY = 'serializer_keys'
+# Bumped and published on REGISTRY_CHANNEL whenever a registration changes
+REGISTRY_VERSION_KEY = 'serializer_registry_version'
+REGISTRY_CHANNEL = 'serializer_registry'
+LISTENER_RETRY_DELAY = 5
+
+
+def get_registry_connection():
+    """
+    The Redis connection behind the cache, `None` if the cache is not Redis
+    (the registry is then local to the process).
+    """
+    try:
+        from django_redis import get_redis_connection
+        return get_redis_connection('default')
+    except (ImportError, NotImplementedError):
+        return None
+
 
 class RedisSerializerRegistry:
     """
     A registry for storing model-specific serializers using Redis.
+
+    Serializers are resolved from an in-process dictionary, loaded from Redis
+    once per process. Registrations are written to Redis, bump the registry
+    version and publish it; a listener thread in every server and worker
+    process (see `connect_registry_listener`) reloads the dictionary when it
+    receives a version other than its own, so resolving a serializer never
+    goes to Redis.
     """
 
     _instance = None
-    registry = {}
+    _lock = threading.Lock()
 
     def __new__(cls):
         if cls._instance is None:
-            cls._instance = super().__new__(cls)
-            cls._instance.load_serializers()
+            with cls._lock:
+                if cls._instance is None:
+                    instance = super().__new__(cls)
+                    instance.registry = {}
+                    instance.version = None
+                    instance._listener_pid = None
+                    instance.load_serializers()
+                    cls._instance = instance
         return cls._instance
 
     def load_serializers(self):
         """
-        Load serializers from Redis cache.
+        Load serializers from Redis cache. The registry is rebuilt, so names
+        unregistered by another process are dropped.
         """
-        registered_serializers = cache.get_many(
-            [f'serializers:{model_name}' for model_name in cache.get('serializer_keys', [])])
-        for model_name, serializer_path in registered_serializers.items():
+        version = cache.get(REGISTRY_VERSION_KEY)
+        registered_serializers = cache.get_many(cache.get(SERIALIZER_KEYS_KEY, []))
+        registry = {}
+        for serializer_key, serializer_path in registered_serializers.items():
+            model_name = serializer_key.split(':', 1)[1]
             try:
-                serializer_module, serializer_class_name = serializer_path.rsplit(
-                    '.', 1)
-                serializer_module = import_string(serializer_module)
-                serializer_class = getattr(
-                    serializer_module, serializer_class_name)
-                self.register_serializer(model_name.split(':')[
-                                         1], serializer_class)
-            except (ImportError, AttributeError) as e:
-                raise ValueError(
-                    f"Error loading serializer for model '{model_name.split(':')[1]}': {e}") from e
+                registry[model_name] = import_string(serializer_path)
+            except ImportError:
+                # e.g. registered by a newer release still rolling out
+                logger.exception("Skipping serializer '%s' of model '%s'",
+                                 serializer_path, model_name)
+        # Swapped in one assignment, lookups never see a partial registry
+        self.registry = registry
+        self.version = version
+
+    def start_listener(self):
+        """
+        Start the thread reloading the registry when another process changes
+        it, once per process (after a fork the thread of the parent is gone).
+        Does nothing if the cache is not Redis.
+        """
+        if self._listener_pid == os.getpid():
+            return
+        with self._lock:
+            if self._listener_pid == os.getpid():
+                return
+            self._listener_pid = os.getpid()
+            connection = get_registry_connection()
+            if connection is None:
+                return
+            thread = threading.Thread(
+                target=self.listen, args=(connection,), name='serializer-registry',
+                daemon=True)
+            thread.start()
+
+    def listen(self, connection):
+        """
+        Reload the registry on every published version other than the local
+        one. After (re)subscribing, the version is checked once in case
+        messages were missed.
+        """
+        while True:
+            pubsub = connection.pubsub(ignore_subscribe_messages=True)
+            try:
+                pubsub.subscribe(REGISTRY_CHANNEL)
+                self.reload_if_changed(cache.get(REGISTRY_VERSION_KEY))
+                for message in pubsub.listen():
+                    self.reload_if_changed(int(message['data']))
+            except Exception:
+                logger.exception('Serializer registry listener failed, reconnecting')
+                time.sleep(LISTENER_RETRY_DELAY)
+            finally:
+                pubsub.close()
+
+    def reload_if_changed(self, version):
+        if version is not None and version != self.version:
+            self.load_serializers()
+
+    def publish_version(self):
+        """
+        Bump the registry version and tell the other processes about it.
+        """
+        # Both atomic: concurrent registrations never publish the same version
+        cache.add(REGISTRY_VERSION_KEY, 0, timeout=None)
+        version = cache.incr(REGISTRY_VERSION_KEY)
+        self.version = version
+        connection = get_registry_connection()
+        if connection is not None:
+            connection.publish(REGISTRY_CHANNEL, version)
 
     def register_serializer(self, model_name: str, serializer_class: Type[serializers.ModelSerializer]):
         """
@@ -68,27 +161,26 @@ class RedisSerializerRegistry:
             model_name (str): The name of the model.
             serializer_class (Type[serializers.ModelSerializer]): The serializer class to register.
         """
-        self.registry[model_name] = serializer_class
+        self.registry = {**self.registry, model_name: serializer_class}
 
         serializer_path = f"{serializer_class.__module__}.{serializer_class.__name__}"
-        serializer_key = f'serializers:{model_name}'
+        serializer_key = SERIALIZER_KEY.format(model_name)
 
-        # Check if the serializer key already exists in the cache
-        if not cache.get(serializer_key):
-            # If not in cache add to cache
-            cache.set(serializer_key, serializer_path)
+        # Only changed registrations are written and published
+        if cache.get(serializer_key) != serializer_path:
+            cache.set(serializer_key, serializer_path, timeout=None)
             self.update_serializer_keys()
+            self.publish_version()
 
     def update_serializer_keys(self):
         """
         Update the list of serializer keys in the cache.
         """
-        serializer_keys = [
-            f'serializers:{model_name}' for model_name in self.registry.keys()]
-        cache.set('serializer_keys', serializer_keys)
+        serializer_keys = set(cache.get(SERIALIZER_KEYS_KEY, [])) | {
+            SERIALIZER_KEY.format(model_name) for model_name in self.registry}
+        cache.set(SERIALIZER_KEYS_KEY, sorted(serializer_keys), timeout=None)
 
     @classmethod
-    @lru_cache(maxsize=None)
     def get_serializer_class(cls, model_name: str) -> Type[serializers.ModelSerializer]:
         """
         Get the serializer class for a given model name.
@@ -103,7 +195,7 @@ class RedisSerializerRegistry:
             ValueError: If no serializer is registered for the provided model name.
         """
         try:
-            return cls._instance.registry[model_name]
+            return cls().registry[model_name]
         except KeyError as exc:
             raise ValueError(
                 f"No serializer registered for model '{model_name}'") from exc
@@ -173,3 +265,35 @@ class RedisSerializerRegistry:
             return serializer.instance
         else:
             raise ValueError(serializer.errors)
+
+
+_read_only = {}
+
+
+def is_read_only_serializer(serializer_class: Type[serializers.ModelSerializer]) -> bool:
+    """
+    Whether no field of `serializer_class` can be written, e.g. a serializer
+    registered for exports only. Checked once per class.
+    """
+    if serializer_class not in _read_only:
+        _read_only[serializer_class] = all(
+            field.read_only for field in serializer_class().fields.values())
+    return _read_only[serializer_class]
+
+
+def start_registry_listener(**kwargs):
+    RedisSerializerRegistry().start_listener()
+
+
+def connect_registry_listener():
+    """
+    Start the registry listener on the first request of a server process and
+    in Celery worker processes, not in management commands, which never see
+    a registration change.
+    """
+    from celery.signals import worker_init, worker_process_init
+    from django.core.signals import request_started
+    request_started.connect(start_registry_listener,
+                            dispatch_uid='serializer_registry_listener')
+    for signal in (worker_init, worker_process_init):
+        signal.connect(start_registry_listener, dispatch_uid='serializer_registry_listener')
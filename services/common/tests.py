@@ -1,3 +1,385 @@
-from django.test import TestCase
+import csv
+import decimal
+import gzip
+import io
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+import pyarrow as pa
+import pyarrow.parquet as pq
+from openpyxl import load_workbook
+from rest_framework import serializers
+
+from common.exporters.arrow_exporters import ArrowExporter, ParquetExporter
+from common.exporters.copy_exporters import PLAIN_FIELDS, CopyCSVExporter, RowCounter
+from common.exporters.csv_exporters import CSVExporter
+from common.exporters.sharded_exporters import (
+    SnapshotHolder, is_pk_ordered, key_ranges, supports_sharding, write_sharded)
+from common.exporters.xlsx_exporters import XLSXExporter
+from common.management.commands.benchmark_metadata_formats import metadata_serializer_class
+from common.serializers.formart_serializers import FormattedField
+from common.serializers.registry_serializers import (
+    REGISTRY_VERSION_KEY, SERIALIZER_KEY, SERIALIZER_KEYS_KEY, RedisSerializerRegistry)
+from pets.models import Category, Customer, Order, OrderLine, Product
+from pets.serializers.category_serializers import CategorySerializer
+from pets.serializers.product_serializers import ProductSerializer
+
+
+class MigrationTests(TestCase):
+
+    def test_models_match_the_migrations(self):
+        output = io.StringIO()
+        try:
+            call_command('makemigrations', check=True, dry_run=True, stdout=output)
+        except SystemExit:
+            self.fail(f'Missing migrations:\n{output.getvalue()}')
+
+
+class SerializerRegistryTests(SimpleTestCase):
+
+    def setUp(self):
+        self.registry = RedisSerializerRegistry()
+        registry, keys = dict(self.registry.registry), cache.get(SERIALIZER_KEYS_KEY)
+
+        def restore():
+            self.registry.registry = registry
+            cache.set(SERIALIZER_KEYS_KEY, keys, timeout=None)
+            cache.delete(SERIALIZER_KEY.format('test_category'))
+        self.addCleanup(restore)
+
+    def test_serializers_are_resolved_without_the_cache(self):
+        with mock.patch('common.serializers.registry_serializers.cache') as mocked_cache:
+            self.assertIs(RedisSerializerRegistry().get_serializer_class('category'),
+                          CategorySerializer)
+        self.assertEqual(mocked_cache.mock_calls, [])
+
+    def test_unchanged_registration_is_not_published(self):
+        version = cache.get(REGISTRY_VERSION_KEY)
+        self.registry.register_serializer('category', CategorySerializer)
+        self.assertEqual(cache.get(REGISTRY_VERSION_KEY), version)
+
+        self.registry.register_serializer('test_category', CategorySerializer)
+        self.assertEqual(cache.get(REGISTRY_VERSION_KEY), version + 1)
+        self.assertEqual(self.registry.version, version + 1)
+
+    def test_registry_reloads_on_a_new_version(self):
+        # Registration made by another process
+        cache.set(SERIALIZER_KEY.format('test_category'),
+                  'pets.serializers.product_serializers.ProductSerializer', timeout=None)
+        cache.set(SERIALIZER_KEYS_KEY, cache.get(SERIALIZER_KEYS_KEY, []) + [
+            SERIALIZER_KEY.format('test_category')], timeout=None)
+        with self.assertRaises(ValueError):
+            self.registry.get_serializer_class('test_category')
+
+        self.registry.reload_if_changed(self.registry.version)
+        self.assertNotIn('test_category', self.registry.registry)
+        self.registry.reload_if_changed(cache.incr(REGISTRY_VERSION_KEY))
+        self.assertIs(self.registry.get_serializer_class('test_category'), ProductSerializer)
+        self.assertIs(self.registry.get_serializer_class('category'), CategorySerializer)
+
+    def test_reload_drops_unregistered_names(self):
+        self.registry.register_serializer('test_category', CategorySerializer)
+        # Unregistered by another process
+        cache.delete(SERIALIZER_KEY.format('test_category'))
+        cache.set(SERIALIZER_KEYS_KEY, [key for key in cache.get(SERIALIZER_KEYS_KEY)
+                                        if key != SERIALIZER_KEY.format('test_category')],
+                  timeout=None)
+        self.registry.reload_if_changed(cache.incr(REGISTRY_VERSION_KEY))
+        self.assertNotIn('test_category', self.registry.registry)
+        self.assertIs(self.registry.get_serializer_class('category'), CategorySerializer)
+
+    def test_first_published_version_is_one(self):
+        version = cache.get(REGISTRY_VERSION_KEY)
+        cache.delete(REGISTRY_VERSION_KEY)
+        self.addCleanup(cache.set, REGISTRY_VERSION_KEY, version, timeout=None)
+        self.registry.publish_version()
+        self.registry.publish_version()
+        self.assertEqual((cache.get(REGISTRY_VERSION_KEY), self.registry.version), (2, 2))
+
+    def test_unimportable_serializers_are_skipped(self):
+        cache.set(SERIALIZER_KEY.format('test_category'),
+                  'pets.serializers.missing.MissingSerializer', timeout=None)
+        cache.set(SERIALIZER_KEYS_KEY, cache.get(SERIALIZER_KEYS_KEY, []) + [
+            SERIALIZER_KEY.format('test_category')], timeout=None)
+        with self.assertLogs('common.serializers.registry_serializers', 'ERROR'):
+            self.registry.load_serializers()
+        self.assertNotIn('test_category', self.registry.registry)
+        self.assertIs(self.registry.get_serializer_class('category'), CategorySerializer)
+
+    def test_listener_starts_with_the_first_request(self):
+        with mock.patch.object(RedisSerializerRegistry, 'start_listener') as start_listener:
+            RedisSerializerRegistry()
+            start_listener.assert_not_called()
+            self.client.get(reverse('models_list'))
+        start_listener.assert_called_once_with()
+
+
+class ColumnarMetadataTests(TestCase):
+
+    def test_rows_hold_the_values_of_the_per_value_format(self):
+        Category.objects.create(name='Toys', description='Balls')
+        Category.objects.create(name='Food', description='')
+        serializer_class = metadata_serializer_class(Category)
+        per_value = serializer_class(Category.objects.order_by('pk'), many=True).data
+        columnar = serializer_class(Category.objects.order_by('pk'), many=True,
+                                    context={'columnar': True}).data
+
+        names = [field['name'] for field in columnar['fields']]
+        self.assertEqual(columnar['fields'][names.index('name')],
+                         {key: value for key, value in per_value[0]['name'].items()
+                          if key != 'value'})
+        self.assertEqual([dict(zip(names, row)) for row in columnar['rows']],
+                         [{name: item[name]['value'] for name in item} for item in per_value])
+
+
+class FormattedFieldTests(SimpleTestCase):
+
+    def bound_field(self, formt):
+        field = FormattedField(formt=formt)
+        field.bind('value', serializers.Serializer())
+        return field
+
+    def test_formatter_is_resolved_when_bound(self):
+        field = self.bound_field('currency')
+        self.assertEqual(field.to_representation(decimal.Decimal('1234.565')), '$1,234.57')
+        self.assertEqual(self.bound_field('percentage').to_representation('0.125'), '12.50%')
+        self.assertEqual(self.bound_field(None).to_representation(3), 3)
+
+    def test_columns_are_formatted_like_single_values(self):
+        field = self.bound_field('currency')
+        values = [decimal.Decimal('2.5'), None, 1, decimal.Decimal('2.5'), 1.005, '3']
+        self.assertEqual(field.format_many(values),
+                         [None if value is None else field.to_representation(value)
+                          for value in values])
+
+
+class ExporterTestMixin:
+
+    def create_products(self, count):
+        category = Category.objects.create(name='Toys, "indoor"', description=None)
+        for index in range(count):
+            Product.objects.create(
+                name=f'Ball {index}', description='Round\nand bouncy',
+                price=decimal.Decimal('1234.5') + index, category=category,
+                image_url=f'https://example.com/{index}.png')
+
+    def serialized(self, model_name='product'):
+        serializer_class = RedisSerializerRegistry().get_serializer_class(model_name)
+        queryset = serializer_class.Meta.model.objects.order_by('pk')
+        return serializer_class(queryset, many=True).data
+
+
+class CSVExporterTests(ExporterTestMixin, TestCase):
+
+    def test_rows_round_trip(self):
+        self.create_products(3)
+        chunks = list(CSVExporter('product', chunk_size=2).stream())
+        # The header is sent before any row is read
+        self.assertEqual(chunks[0], ','.join(CSVExporter('product').get_headers()) + '\n')
+        self.assertEqual(len(chunks), 3)
+
+        rows = list(csv.DictReader(io.StringIO(''.join(chunks))))
+        self.assertEqual(rows, [{name: '' if value is None else str(value)
+                                 for name, value in item.items()}
+                                for item in self.serialized()])
+
+    def test_empty_values(self):
+        Category.objects.create(name='Toys', description=None)
+        rows = list(csv.reader(io.StringIO(''.join(CSVExporter('category').stream()))))
+        header, row = rows
+        self.assertEqual(row[header.index('description')], '')
+
+
+class XLSXExporterTests(ExporterTestMixin, TestCase):
+
+    def test_rows_roll_over_to_new_sheets(self):
+        self.create_products(5)
+        exporter = XLSXExporter('product')
+        exporter.max_sheet_rows = 3
+        workbook = load_workbook(io.BytesIO(b''.join(exporter.stream())), read_only=True)
+
+        self.assertEqual(workbook.sheetnames, ['product', 'product (2)', 'product (3)'])
+        header = exporter.get_headers()
+        rows = []
+        for sheet in workbook:
+            sheet_rows = [list(row) for row in sheet.iter_rows(values_only=True)]
+            self.assertEqual(sheet_rows[0], header)
+            self.assertLessEqual(len(sheet_rows), 3)
+            rows += sheet_rows[1:]
+        self.assertEqual(rows, [list(item.values()) for item in self.serialized()])
+
+
+class CopyCSVExporterTests(SimpleTestCase):
+
+    def setUp(self):
+        self.exporter = CopyCSVExporter('category')
+
+    def expression(self, field):
+        field.bind('value', serializers.Serializer())
+        return self.exporter.column_expression(field, 'value')
+
+    def test_plain_fields_are_rendered_by_the_database(self):
+        fields = [
+            serializers.IntegerField(), serializers.CharField(), serializers.EmailField(),
+            serializers.URLField(), serializers.SlugField(), serializers.UUIDField(),
+            serializers.ChoiceField(choices=['a']),
+            serializers.DecimalField(max_digits=8, decimal_places=2),
+            serializers.PrimaryKeyRelatedField(read_only=True),
+        ]
+        self.assertEqual({type(field) for field in fields}, set(PLAIN_FIELDS))
+        for field in fields:
+            with self.subTest(type(field).__name__):
+                self.assertEqual(self.expression(field), 'value')
+
+    def test_representations_the_database_cannot_match(self):
+        # Booleans are rendered as Python's `True`/`False`
+        self.assertIn("'True'", self.expression(serializers.BooleanField()))
+        self.assertIsNotNone(self.expression(serializers.DateField()))
+        self.assertIsNone(self.expression(serializers.DateField(format='%d/%m/%Y')))
+        self.assertIsNotNone(self.expression(serializers.DateTimeField()))
+        # Datetimes are only rendered by the database in UTC
+        with override_settings(TIME_ZONE='Europe/Paris'):
+            self.assertIsNone(self.expression(serializers.DateTimeField()))
+        self.assertIsNone(self.expression(serializers.FloatField()))
+
+    def test_rows_are_counted_while_copying(self):
+        output = io.BytesIO()
+        counter = RowCounter(output, self.exporter)
+        chunks = [b'id,name\n1,"Toys', b'\n""indoor"""\n2,Fo', b'od\n3,"a,b"\n']
+        counts = []
+        for chunk in chunks:
+            counter.write(chunk)
+            counts.append(self.exporter.exported)
+        self.assertEqual(counts, [0, 1, 3])
+        self.assertEqual(len(list(csv.reader(io.StringIO(output.getvalue().decode())))), 4)
+
+    def test_other_databases_use_the_serializer_path(self):
+        if connection.vendor != 'postgresql':
+            self.assertFalse(self.exporter.supports_copy())
+
+
+@skipUnless(connection.vendor == 'postgresql', 'COPY is only used on PostgreSQL')
+class CopyCSVOutputTests(ExporterTestMixin, TransactionTestCase):
+    """
+    COPY runs on its own connection, so the rows must be committed.
+    """
+
+    def test_output_matches_the_serializer_path(self):
+        self.create_products(3)
+        customer = Customer.objects.create(first_name='Ada', last_name='Lovelace',
+                                           email='ada@example.com')
+        order = Order.objects.create(customer=customer, order_status='placed',
+                                     total_price='5.00')
+        OrderLine.objects.create(order=order, product=Product.objects.first(), quantity=2)
+
+        for model_name in ('category', 'product', 'customer', 'orderline'):
+            with self.subTest(model_name):
+                exporter = CopyCSVExporter(model_name)
+                self.assertTrue(exporter.supports_copy())
+                copied = b''.join(exporter.stream()).decode('utf-8')
+                serialized = ''.join(CSVExporter(model_name).stream())
+                self.assertEqual(exporter.exported, exporter.model.objects.count())
+                # Same line terminator, values and quoting
+                self.assertEqual(copied, serialized)
+
+    def test_empty_strings_are_quoted(self):
+        Category.objects.create(name='Toys', description='')
+        copied = b''.join(CopyCSVExporter('category').stream()).decode('utf-8')
+        serialized = ''.join(CSVExporter('category').stream())
+        self.assertEqual(list(csv.reader(io.StringIO(copied))),
+                         list(csv.reader(io.StringIO(serialized))))
+        # COPY quotes empty strings to tell them from NULL
+        self.assertEqual(copied.splitlines()[1].split(',')[-1], '""')
+        self.assertEqual(serialized.splitlines()[1].split(',')[-1], '')
+
+
+class ArrowExporterTests(ExporterTestMixin, TestCase):
+
+    def assert_round_trip(self, table):
+        self.assertEqual(table.schema.field('price').type, pa.decimal128(8, 2))
+        self.assertEqual(table.schema.field('updated_at').type, pa.timestamp('us', tz='UTC'))
+        self.assertEqual(table.schema.field('category').type, pa.int64())
+        products = Product.objects.order_by('pk')
+        self.assertEqual(table.column('price').to_pylist(),
+                         [product.price for product in products])
+        self.assertEqual(table.column('updated_at').to_pylist(),
+                         [product.updated_at for product in products])
+        self.assertEqual(table.column('description').to_pylist(),
+                         [product.description for product in products])
+
+    def test_ipc_round_trip(self):
+        self.create_products(5)
+        content = b''.join(ArrowExporter('product', chunk_size=2).stream())
+        reader = pa.ipc.open_file(pa.BufferReader(content))
+        self.assertEqual(reader.num_record_batches, 3)
+        self.assert_round_trip(reader.read_all())
+
+    def test_parquet_round_trip(self):
+        self.create_products(5)
+        content = b''.join(ParquetExporter('product', chunk_size=2, row_group_size=4).stream())
+        parquet_file = pq.ParquetFile(io.BytesIO(content))
+        self.assertEqual([parquet_file.metadata.row_group(index).num_rows
+                          for index in range(parquet_file.num_row_groups)], [4, 1])
+        self.assert_round_trip(parquet_file.read())
+
+
+class ShardedExportTests(ExporterTestMixin, TransactionTestCase):
+    """
+    Shards run on their own connections, so the rows must be committed.
+    """
+
+    def write_sharded(self, exporter, shards):
+        output = io.BytesIO()
+        if connection.vendor == 'postgresql':
+            self.assertTrue(supports_sharding(exporter))
+            write_sharded(exporter, output, shards, interval=0)
+        else:
+            # Without exported snapshots, the shards read the committed rows
+            def hold(holder):
+                holder.ranges = key_ranges(holder.queryset, holder.shards)
+                holder.ready.set()
+                holder.release.wait()
+
+            def export_shard(exporter, using, snapshot_id, file_obj, cancelled):
+                with gzip.GzipFile(fileobj=file_obj, mode='wb') as gzip_file:
+                    exporter.write(gzip_file)
+
+            with mock.patch.object(SnapshotHolder, 'run', hold), \
+                    mock.patch('common.exporters.sharded_exporters.export_shard', export_shard):
+                write_sharded(exporter, output, shards, interval=0)
+        return gzip.decompress(output.getvalue()).decode('utf-8')
+
+    def test_key_ranges_cover_every_row(self):
+        self.create_products(10)
+        queryset = Product.objects.all()
+        ranges = key_ranges(queryset, 4)
+        self.assertEqual(len(ranges), 4)
+        self.assertEqual(sum(queryset.filter(pk__gte=start, pk__lt=stop).count()
+                             for start, stop in ranges), 10)
+        self.assertEqual(key_ranges(queryset.none(), 4), [])
+
+    def test_shards_decompress_to_the_unsharded_export(self):
+        self.create_products(23)
+        exporter = CSVExporter('product')
+        self.assertEqual(self.write_sharded(exporter, 4),
+                         ''.join(CSVExporter('product').stream()))
+        self.assertEqual(exporter.exported, 23)
+
+    def test_empty_export_keeps_its_header(self):
+        exporter = CSVExporter('product')
+        self.assertEqual(self.write_sharded(exporter, 4), exporter.header_line())
+        self.assertEqual(exporter.exported, 0)
+
+    def test_only_pk_ordered_exports_are_sharded(self):
+        self.assertTrue(is_pk_ordered(Product.objects.all()))
+        self.assertTrue(is_pk_ordered(Product.objects.order_by('pk')))
+        self.assertTrue(is_pk_ordered(Product.objects.order_by('id')))
+        self.assertFalse(is_pk_ordered(Product.objects.order_by('-pk')))
+        self.assertFalse(is_pk_ordered(Product.objects.order_by('name')))
+        with mock.patch.object(Product._meta, 'ordering', ['name']):
+            self.assertFalse(is_pk_ordered(Product.objects.all()))
+            self.assertTrue(is_pk_ordered(Product.objects.order_by('pk')))
@@ -6,6 +6,11 @@ class PetsConfig(AppConfig):
     name = 'pets'
 
     def ready(self) -> None:
+        from pets.metadata import compile_metadata
         from pets.serializers.serializer_registry import register_serializers
+        from pets.signals import connect_data_version_signals, connect_tombstone_signals
         register_serializers()
+        compile_metadata()
+        connect_data_version_signals()
+        connect_tombstone_signals()
         return super().ready()
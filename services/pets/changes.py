@@ -0,0 +1,65 @@
+"""
+Incremental (change data) exports of the pets models since a watermark.
+
+Every pets model has an indexed `updated_at`, set on `save` and
+`bulk_create` (imports), and deleted rows leave a `Tombstone`. A delta is
+the window `since < t <= until`: the rows updated and the keys deleted in
+it. `until` defaults to `CHANGES_WATERMARK_LAG` before now and is handed to
+the client as the watermark to pass as `since` next time.
+
+Example:
+    since, until = change_window(parse_watermark(client_watermark))
+    rows = changed_rows(Product.objects.all(), since, until)
+    deleted = deleted_keys(Product, since, until)
+"""
+
+import datetime
+
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from common.models import Tombstone
+from services.settings.export import CHANGES_WATERMARK_LAG
+
+
+def parse_watermark(value):
+    """
+    Parse an ISO 8601 watermark, naive values being taken as UTC.
+
+    Raises:
+        ValueError: If `value` is not a valid date and time.
+    """
+    watermark = parse_datetime(value or '')
+    if watermark is None:
+        raise ValueError(f"Invalid watermark '{value}'")
+    if timezone.is_naive(watermark):
+        watermark = timezone.make_aware(watermark, datetime.timezone.utc)
+    return watermark
+
+
+def format_watermark(watermark):
+    return watermark.astimezone(datetime.timezone.utc).isoformat()
+
+
+def change_window(since, until=None):
+    """
+    The `(since, until)` window of a delta. `until` never goes past
+    `CHANGES_WATERMARK_LAG` before now, nor before `since`.
+    """
+    latest = timezone.now() - CHANGES_WATERMARK_LAG
+    until = latest if until is None else min(until, latest)
+    return since, max(since, until)
+
+
+def changed_rows(queryset, since, until):
+    return queryset.filter(updated_at__gt=since, updated_at__lte=until)
+
+
+def deleted_keys(model, since, until):
+    """
+    Primary keys (as strings) of the rows of `model` deleted in the window.
+    """
+    return Tombstone.objects.filter(
+        model_label=model._meta.label_lower,
+        deleted_at__gt=since, deleted_at__lte=until,
+    ).order_by('deleted_at', 'pk').values_list('object_pk', flat=True)
@@ -0,0 +1,47 @@
+"""
+Metadata of the pets models served by the API, compiled once per process.
+
+Model ids are `uuid5`s of the model labels, so they are stable across
+requests, processes and deployments, and so are the responses and their
+ETags.
+
+Example:
+    model_names().respond(request)
+"""
+
+import uuid
+
+from django.apps import apps
+
+from common.serializers.field_meta_serializers import field_meta_catalog
+from common.serializers.registry_serializers import RedisSerializerRegistry
+from utils.response_cache import PrecompiledResponse
+
+MODEL_ID_NAMESPACE = uuid.uuid5(uuid.NAMESPACE_URL, 'services:models')
+
+_model_names = None
+
+
+def model_id(model):
+    return str(uuid.uuid5(MODEL_ID_NAMESPACE, model._meta.label))
+
+
+def model_names():
+    """
+    The ids and names of the models of the pets app, as a compiled response.
+    """
+    global _model_names
+    if _model_names is None:
+        _model_names = PrecompiledResponse.json([
+            {'id': model_id(model), 'name': model.__name__}
+            for model in apps.get_app_config('pets').get_models()])
+    return _model_names
+
+
+def compile_metadata():
+    """
+    Compile the model names and the field metadata of every registered
+    serializer, so that requests never build them.
+    """
+    model_names()
+    field_meta_catalog.warm(RedisSerializerRegistry().registry.values())
@@ -8,6 +8,9 @@ from users.models import CustomUser
 
 
 class BasePermissionModel(models.Model):
+    # Set on bulk_create as well; incremental exports select rows on it
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
     class Meta:
         abstract = True
 
@@ -1,3 +1,4 @@
+from django.db.models import DecimalField, ExpressionWrapper, F
 from rest_framework import serializers
 from pets.models import OrderLine
 
@@ -6,3 +7,43 @@ class OrderLineSerializer(serializers.ModelSerializer):
     class Meta:
         model = OrderLine
         fields = '__all__'
+
+
+class OrderLineExportSerializer(serializers.ModelSerializer):
+    """
+    One flattened row per order line with its order, customer, product and
+    category, for exports.
+
+    Every related value is read from objects loaded by `setup_eager_loading`
+    (or joined by the database), so exporting any number of lines takes a
+    constant number of queries.
+    """
+    order_date = serializers.DateTimeField(source='order.date_placed', read_only=True)
+    order_status = serializers.CharField(source='order.order_status', read_only=True)
+    customer = serializers.PrimaryKeyRelatedField(source='order.customer', read_only=True)
+    customer_first_name = serializers.CharField(
+        source='order.customer.first_name', read_only=True)
+    customer_last_name = serializers.CharField(
+        source='order.customer.last_name', read_only=True)
+    customer_email = serializers.EmailField(source='order.customer.email', read_only=True)
+    product_name = serializers.CharField(source='product.name', read_only=True)
+    category = serializers.PrimaryKeyRelatedField(source='product.category', read_only=True)
+    category_name = serializers.CharField(source='product.category.name', read_only=True)
+    unit_price = serializers.DecimalField(
+        source='product.price', max_digits=8, decimal_places=2, read_only=True)
+    line_total = serializers.DecimalField(max_digits=18, decimal_places=2, read_only=True)
+
+    class Meta:
+        model = OrderLine
+        fields = ('id', 'order', 'order_date', 'order_status', 'customer',
+                  'customer_first_name', 'customer_last_name', 'customer_email',
+                  'product', 'product_name', 'category', 'category_name',
+                  'unit_price', 'quantity', 'line_total')
+        read_only_fields = fields
+
+    @staticmethod
+    def setup_eager_loading(queryset):
+        return queryset.select_related('order__customer', 'product__category').annotate(
+            line_total=ExpressionWrapper(
+                F('quantity') * F('product__price'),
+                output_field=DecimalField(max_digits=18, decimal_places=2)))
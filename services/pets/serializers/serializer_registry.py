@@ -1,7 +1,7 @@
 from .customer_serializers import CustomerSerializer
 from .category_serializers import CategorySerializer
 from .order_serializers import OrderSerializer
-from .orderline_serializers import OrderLineSerializer
+from .orderline_serializers import OrderLineExportSerializer, OrderLineSerializer
 from .product_serializers import ProductSerializer
 from common.serializers.registry_serializers import RedisSerializerRegistry
 
@@ -18,6 +18,7 @@ def register_serializers():
     registry.register_serializer('product', ProductSerializer)
     registry.register_serializer('order', OrderSerializer)
     registry.register_serializer('orderline', OrderLineSerializer)
+    registry.register_serializer('orderline_export', OrderLineExportSerializer)
 
 
 # Entry point when the module is run as the main program
@@ -0,0 +1,35 @@
+from django.apps import apps
+from django.db.models.signals import post_delete, post_save
+
+from common.models import Tombstone
+from utils.data_versions import bump_data_version_on_commit
+
+
+def bump_model_data_version(sender, using=None, **kwargs):
+    bump_data_version_on_commit(sender, using=using)
+
+
+def record_tombstone(sender, instance, **kwargs):
+    Tombstone.objects.create(model_label=sender._meta.label_lower,
+                             object_pk=str(instance.pk))
+
+
+def connect_data_version_signals():
+    """
+    Bump the data version of a pets model whenever one of its rows is saved
+    or deleted.
+    """
+    for model in apps.get_app_config('pets').get_models():
+        for signal in (post_save, post_delete):
+            signal.connect(bump_model_data_version, sender=model,
+                           dispatch_uid=f'data_version_{model._meta.label_lower}')
+
+
+def connect_tombstone_signals():
+    """
+    Keep a tombstone of every deleted row of a pets model, for incremental
+    exports.
+    """
+    for model in apps.get_app_config('pets').get_models():
+        post_delete.connect(record_tombstone, sender=model,
+                            dispatch_uid=f'tombstone_{model._meta.label_lower}')
@@ -1,3 +1,267 @@
-from django.test import TestCase
+import csv
+import io
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from chunked_upload.importers.model_importers import ModelImporter
+from common.exporters.base_exporters import get_exporter_class
+from common.exporters.csv_exporters import CSVExporter
+from common.models import Tombstone
+from common.serializers.compiled_serializers import compile_read_serializer
+from common.serializers.field_meta_serializers import FieldMetaSerializer
+from common.serializers.registry_serializers import RedisSerializerRegistry
+from pets.changes import change_window, changed_rows, deleted_keys, format_watermark
+from pets.models import Category, Customer, Order, OrderLine, Product
+from pets.views import export_cache
+from utils.response_cache import CachedResponse, LRUResponseCache
+
+
+class OrderLineExportTests(TestCase):
+
+    def create_lines(self, count):
+        category = Category.objects.create(name='Toys')
+        customer = Customer.objects.create(
+            first_name='Ada', last_name='Lovelace', email='ada@example.com')
+        for index in range(count):
+            product = Product.objects.create(
+                name=f'Ball {index}', description='A ball', price='2.50',
+                category=category, image_url='https://example.com/ball.png')
+            order = Order.objects.create(
+                customer=customer, order_status='placed', total_price='5.00')
+            OrderLine.objects.create(order=order, product=product, quantity=2)
+
+    def export(self):
+        exporter = CSVExporter('orderline_export')
+        return list(csv.DictReader(io.StringIO(''.join(exporter.stream()))))
+
+    def test_rows_are_flattened(self):
+        self.create_lines(1)
+        row, = self.export()
+        self.assertEqual(row['customer_email'], 'ada@example.com')
+        self.assertEqual(row['category_name'], 'Toys')
+        self.assertEqual(row['unit_price'], '2.50')
+        self.assertEqual(row['line_total'], '5.00')
+
+    def test_default_csv_exporter(self):
+        self.create_lines(2)
+        exporter = get_exporter_class('csv')('orderline_export')
+        self.assertEqual(''.join(exporter.stream()),
+                         ''.join(CSVExporter('orderline_export').stream()))
+        self.assertEqual(exporter.exported, 2)
+
+    def test_export_serializer_is_not_importable(self):
+        with self.assertRaises(ValueError):
+            ModelImporter('orderline_export')
+        response = self.client.get(reverse('models_fields_list'), {'model': 'orderline_export'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_query_count_does_not_grow_with_rows(self):
+        self.create_lines(1)
+        with self.assertNumQueries(1):
+            self.assertEqual(len(self.export()), 1)
+        self.create_lines(50)
+        with self.assertNumQueries(1):
+            self.assertEqual(len(self.export()), 51)
+
+
+class CompiledReadSerializerTests(TestCase):
+
+    create_lines = OrderLineExportTests.create_lines
+
+    def test_output_is_identical_to_the_serializer(self):
+        self.create_lines(3)
+        Customer.objects.create(first_name='Bob', last_name='Null', email='b@example.com',
+                                phone_number=None)
+        Product.objects.filter(pk=Product.objects.first().pk).update(price='1234.5')
+        renderer = JSONRenderer()
+        registry = RedisSerializerRegistry()
+        for model_name in ('category', 'product', 'customer', 'orderline', 'orderline_export'):
+            with self.subTest(model_name):
+                serializer_class = registry.get_serializer_class(model_name)
+                compiled = compile_read_serializer(serializer_class)
+                self.assertIsNotNone(compiled)
+                queryset = compiled.prepare(serializer_class.Meta.model.objects.order_by('pk'))
+                self.assertEqual(
+                    renderer.render(compiled.serialize(queryset)),
+                    renderer.render(serializer_class(queryset, many=True).data))
+
+    def test_many_to_many_fields_are_not_compiled(self):
+        serializer_class = RedisSerializerRegistry().get_serializer_class('order')
+        self.assertIsNone(compile_read_serializer(serializer_class))
+
+    def test_custom_representations_are_not_compiled(self):
+        base = RedisSerializerRegistry().get_serializer_class('category')
+
+        class UpperCaseSerializer(base):
+            class Meta(base.Meta):
+                pass
+
+            def to_representation(self, instance):
+                data = super().to_representation(instance)
+                data['name'] = data['name'].upper()
+                return data
+
+        self.assertIsNotNone(compile_read_serializer(base))
+        self.assertIsNone(compile_read_serializer(UpperCaseSerializer))
+
+
+class ModelMetadataViewTests(SimpleTestCase):
+
+    def test_model_names_are_stable_and_conditional(self):
+        first = self.client.get(reverse('models_list'))
+        second = self.client.get(reverse('models_list'))
+        self.assertEqual(first.content, second.content)
+        names = {model['name'] for model in first.json()}
+        self.assertTrue({'Category', 'Product'} <= names)
+
+        not_modified = self.client.get(
+            reverse('models_list'), HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(not_modified.status_code, 304)
+
+    def test_fields_are_served_precompiled(self):
+        response = self.client.get(reverse('models_fields_list'), {'model': 'category'})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('name', [field['name'] for field in response.json()])
+        with mock.patch.object(FieldMetaSerializer, 'get_serializer_fields_meta') as compile_meta:
+            not_modified = self.client.get(reverse('models_fields_list'), {'model': 'category'},
+                                           HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(not_modified.status_code, 304)
+        compile_meta.assert_not_called()
+
+
+class LRUResponseCacheTests(SimpleTestCase):
+
+    def test_least_recently_used_entries_are_evicted_by_size(self):
+        response_cache = LRUResponseCache(max_size=10, max_entry_size=6)
+        response_cache.set('a', CachedResponse(b'aaaa', 'text/csv'))
+        response_cache.set('b', CachedResponse(b'bbbb', 'text/csv'))
+        self.assertIsNotNone(response_cache.get('a'))
+        response_cache.set('c', CachedResponse(b'cccc', 'text/csv'))
+
+        self.assertIsNone(response_cache.get('b'))
+        self.assertEqual([response_cache.get(key).content for key in 'ac'], [b'aaaa', b'cccc'])
+        self.assertEqual(response_cache.size, 8)
+
+        response_cache.set('d', CachedResponse(b'd' * 7, 'text/csv'))
+        self.assertIsNone(response_cache.get('d'))
+        self.assertEqual(len(response_cache), 2)
+
+    def test_capture_skips_bodies_past_the_entry_size(self):
+        response_cache = LRUResponseCache(max_size=10, max_entry_size=6)
+        self.assertEqual(list(response_cache.capture('a', ['abc', b'def'], 'text/csv')),
+                         [b'abc', b'def'])
+        self.assertEqual(response_cache.get('a').content, b'abcdef')
+        self.assertEqual(len(list(response_cache.capture('b', ['abcd', 'efg'], 'text/csv'))), 2)
+        self.assertIsNone(response_cache.get('b'))
+
+
+class ModelExportViewTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(get_user_model().objects.create_user(
+            email='ada@example.com', username='ada'))
+        export_cache.clear()
+        self.addCleanup(export_cache.clear)
+        with self.captureOnCommitCallbacks(execute=True):
+            Category.objects.create(name='Toys')
+
+    def export(self, **headers):
+        return self.client.get(reverse('models_export'),
+                               {'model': 'category', 'format': 'json'}, **headers)
+
+    def test_unchanged_exports_are_not_modified(self):
+        response = self.export()
+        self.assertEqual(response.status_code, 200)
+        content = b''.join(response.streaming_content)
+
+        with self.assertNumQueries(0):
+            not_modified = self.export(HTTP_IF_NONE_MATCH=response['ETag'])
+            cached = self.export()
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(cached.content, content)
+        self.assertEqual(cached['ETag'], response['ETag'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Category.objects.create(name='Food')
+        changed = self.export(HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed['ETag'], response['ETag'])
+
+    def test_anonymous_exports_are_refused(self):
+        response = APIClient().get(reverse('models_export'), {'model': 'category'})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+@mock.patch('pets.changes.CHANGES_WATERMARK_LAG', timedelta(seconds=60))
+class ChangeWindowTests(TestCase):
+    """
+    Rows written within `CHANGES_WATERMARK_LAG` of now belong to the next
+    window, so a commit landing late is never skipped.
+    """
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(get_user_model().objects.create_user(
+            email='ada@example.com', username='ada'))
+        self.now = timezone.now()
+        patcher = mock.patch('pets.changes.timezone.now', lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.since = self.now - timedelta(minutes=10)
+        self.old, self.recent = (Category.objects.create(name=name) for name in ('Old', 'Recent'))
+        self.set_time(Category.objects.filter(pk=self.old.pk), updated_at=timedelta(minutes=5))
+        self.set_time(Category.objects.filter(pk=self.recent.pk), updated_at=timedelta(seconds=30))
+        for category, age in ((self.old, timedelta(minutes=5)), (self.recent, timedelta(seconds=30))):
+            tombstone = Tombstone.objects.create(model_label='pets.category',
+                                                 object_pk=f'deleted-{category.pk}')
+            self.set_time(Tombstone.objects.filter(pk=tombstone.pk), deleted_at=age)
+
+    def set_time(self, queryset, **ages):
+        queryset.update(**{name: self.now - age for name, age in ages.items()})
+
+    def test_window_stops_at_the_lag(self):
+        since, until = change_window(self.since)
+        self.assertEqual(until, self.now - timedelta(seconds=60))
+        self.assertEqual(list(changed_rows(Category.objects.all(), since, until)), [self.old])
+        self.assertEqual(list(deleted_keys(Category, since, until)), [f'deleted-{self.old.pk}'])
+
+        # The next window, once the lag has passed, picks up the rest
+        self.now += timedelta(seconds=60)
+        since, until = change_window(until)
+        self.assertEqual(list(changed_rows(Category.objects.all(), since, until)), [self.recent])
+        self.assertEqual(list(deleted_keys(Category, since, until)),
+                         [f'deleted-{self.recent.pk}'])
+
+    def test_until_is_clamped(self):
+        self.assertEqual(change_window(self.since, self.now)[1], self.now - timedelta(seconds=60))
+        early = self.since + timedelta(minutes=1)
+        self.assertEqual(change_window(self.since, early), (self.since, early))
+        # A watermark past the lag gives an empty window rather than going back
+        since = self.now - timedelta(seconds=10)
+        self.assertEqual(change_window(since), (since, since))
+
+    def test_views_hand_out_the_lagged_watermark(self):
+        params = {'model': 'category', 'since': format_watermark(self.since)}
+        watermark = format_watermark(self.now - timedelta(seconds=60))
+        response = self.client.get(reverse('models_export'), params)
+        self.assertEqual(response['X-Watermark'], watermark)
+        rows = list(csv.DictReader(io.StringIO(b''.join(response.streaming_content).decode())))
+        self.assertEqual([row['name'] for row in rows], ['Old'])
+
+        response = self.client.get(reverse('models_deletions'), params)
+        self.assertEqual(response.json(), {'watermark': watermark,
+                                           'deleted': [f'deleted-{self.old.pk}']})
+
+    def test_anonymous_deletions_are_refused(self):
+        params = {'model': 'category', 'since': format_watermark(self.since)}
+        response = APIClient().get(reverse('models_deletions'), params)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
@@ -1,9 +1,12 @@
 from django.urls import path
-from .views import ModelFieldsView, PetsModelNamesView
+from .views import ModelDeletionsView, ModelExportView, ModelFieldsView, PetsModelNamesView
 
 
 urlpatterns = [
     path('modules/fields_list/', ModelFieldsView.as_view(),
          name='models_fields_list'),
-    path('modules/list/', PetsModelNamesView.as_view(), name='models_list')
+    path('modules/list/', PetsModelNamesView.as_view(), name='models_list'),
+    path('modules/export/', ModelExportView.as_view(), name='models_export'),
+    path('modules/deletions/', ModelDeletionsView.as_view(),
+         name='models_deletions'),
 ]
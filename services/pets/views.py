@@ -1,15 +1,42 @@
 """
     pets views
 """
-from uuid import uuid4
+from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from django.apps import apps
-from common.serializers.registry_serializers import RedisSerializerRegistry
-from common.serializers.field_meta_serializers import FieldMetaSerializer
+from django.core.exceptions import ValidationError
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import content_disposition_header
+from chunked_upload.exports import build_exporter, export_fingerprint
+from common.serializers.registry_serializers import RedisSerializerRegistry, is_read_only_serializer
+from common.serializers.field_meta_serializers import field_meta_catalog
+from services.settings.export import (
+    EXPORT_RESPONSE_CACHE_MAX_ENTRY, EXPORT_RESPONSE_CACHE_SIZE)
+from utils.response_cache import LRUResponseCache
+from .changes import (
+    change_window, changed_rows, deleted_keys, format_watermark, parse_watermark)
+from .metadata import model_names
 # Create your views here.
 
 registry = RedisSerializerRegistry()
+export_cache = LRUResponseCache(EXPORT_RESPONSE_CACHE_SIZE,
+                                EXPORT_RESPONSE_CACHE_MAX_ENTRY)
+
+
+def get_change_window(query_params):
+    """
+    The `(since, until)` window of an incremental export requested with
+    `since` (and optionally `until`), or `None` for a full export.
+
+    Raises:
+        ValueError: If a watermark is invalid.
+    """
+    if 'since' not in query_params:
+        return None
+    until = query_params.get('until')
+    return change_window(parse_watermark(query_params['since']),
+                         parse_watermark(until) if until else None)
 
 
 class PetsModelNamesView(APIView):
@@ -21,30 +48,16 @@ class PetsModelNamesView(APIView):
     def get(self, request):
         """
         Retrieves a list of all model names and returns it as a JSON response.
+        The list is compiled once, with stable ids and an `ETag`.
 
         Args:
             request: The HTTP request.
 
         Returns:
-            Response: JSON response containing the list of model names.
+            HttpResponse: JSON response containing the list of model names,
+            or a 304 if the client has it already.
         """
-        # Get the app config for the 'pets' app
-        pets_app_config = apps.get_app_config('pets')
-
-        # Get all installed models in the Django app
-        installed_models = pets_app_config.get_models()
-
-        # Extract the model names from the installed models
-        models = [
-            {
-                "id": str(uuid4()),
-                "name": model.__name__
-            }
-            for model in installed_models
-        ]
-
-        # Return the list of model names as a JSON response
-        return Response(models)
+        return model_names().respond(request)
 
 
 class ModelFieldsView(APIView):
@@ -61,7 +74,8 @@ class ModelFieldsView(APIView):
             request: The HTTP request.
 
         Returns:
-            Response: JSON response containing the field metadata.
+            HttpResponse: JSON response containing the field metadata, compiled
+            once per serializer, or a 304 if the client has it already.
         """
 
         model_name = request.query_params.get('model', None)
@@ -72,6 +86,117 @@ class ModelFieldsView(APIView):
                 model_name=model_name)
         except ValueError as e:
             return Response({'error': str(e)}, status=500)
-        serialized_data = FieldMetaSerializer().get_serializer_fields_meta(
-            serializer_class=serializer_class)
-        return Response(serialized_data, status=200)
+        # Field metadata drives import mappings, export-only serializers have none
+        if is_read_only_serializer(serializer_class):
+            return Response({'error': f"'{model_name}' is export-only"}, status=400)
+        return field_meta_catalog.get(serializer_class).respond(request)
+
+
+class ModelExportView(APIView):
+    """
+    A view streaming the rows of a specified model as a file.
+
+    Responses carry an `ETag` derived from the model, filters, format and
+    data versions of the exported models: a client sending it back in
+    `If-None-Match` gets a 304 without any query while the data is
+    unchanged. Exports of unchanged data are also served from memory.
+
+    With `since`, only the rows updated after that watermark are exported
+    and the watermark to pass next time is returned in `X-Watermark`;
+    deletions in the same window are listed by `ModelDeletionsView`.
+    """
+    permission_classes = [IsAuthenticated]
+
+    # `format` is DRF's renderer override, not a model field
+    reserved_params = ('model', 'file_format', 'format', 'since', 'until')
+
+    def get(self, request):
+        """
+        Streams the rows of a model in the requested format (CSV by default).
+        Other query parameters filter the rows on the model's own fields
+        (`?model=product&price__gte=10`).
+
+        Args:
+            request: The HTTP request.
+
+        Returns:
+            StreamingHttpResponse: The exported file, sent as it is written.
+        """
+        model_name = request.query_params.get('model', None)
+        if not model_name:
+            return Response({'error': 'Model name not provided'}, status=400)
+        export_format = request.query_params.get('file_format', 'csv')
+        filters = {key: value for key, value in request.query_params.items()
+                   if key not in self.reserved_params}
+        try:
+            exporter = build_exporter(model_name, export_format, filters)
+            window = get_change_window(request.query_params)
+        except (ValueError, ValidationError) as e:
+            return Response({'error': str(e)}, status=400)
+
+        if window is not None:
+            return self.get_changes(exporter, *window)
+
+        etag = '"{}"'.format(export_fingerprint(
+            exporter, model_name, export_format, filters))
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            return not_modified
+
+        cached = export_cache.get(etag)
+        if cached is not None:
+            response = HttpResponse(cached.content, content_type=cached.content_type)
+        else:
+            response = StreamingHttpResponse(
+                export_cache.capture(etag, exporter.stream(), exporter.content_type),
+                content_type=exporter.content_type)
+        response['Content-Disposition'] = content_disposition_header(
+            True, exporter.filename)
+        response['ETag'] = etag
+        return response
+
+    def get_changes(self, exporter, since, until):
+        queryset = exporter.queryset
+        if queryset is None:
+            queryset = exporter.model.objects.all()
+        exporter.queryset = changed_rows(queryset, since, until)
+        response = StreamingHttpResponse(
+            exporter.stream(), content_type=exporter.content_type)
+        response['Content-Disposition'] = content_disposition_header(
+            True, exporter.filename)
+        response['X-Watermark'] = format_watermark(until)
+        return response
+
+
+class ModelDeletionsView(APIView):
+    """
+    A view listing the rows of a specified model deleted since a watermark.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        """
+        Lists the primary keys of the rows deleted after `since`, up to
+        `until` if given (pass the `X-Watermark` of the matching incremental
+        export).
+
+        Args:
+            request: The HTTP request.
+
+        Returns:
+            Response: JSON response with the deleted keys and the watermark.
+        """
+        model_name = request.query_params.get('model', None)
+        if not model_name:
+            return Response({'error': 'Model name not provided'}, status=400)
+        if 'since' not in request.query_params:
+            return Response({'error': 'Watermark not provided'}, status=400)
+        try:
+            model = registry.get_serializer_class(model_name=model_name).Meta.model
+            since, until = get_change_window(request.query_params)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=400)
+        return Response({
+            'watermark': format_watermark(until),
+            'deleted': list(deleted_keys(model, since, until)),
+        }, status=200)
@@ -1,72 +1,330 @@
+import contextlib
+import hashlib
 import pickle
 import os
+import json
+import queue
+import random
+import socket
+import threading
+import time
+import httplib2
+from django.core.cache import cache
+from google_auth_httplib2 import AuthorizedHttp
 from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
+from googleapiclient.discovery import build_from_document
+from googleapiclient.discovery_cache import get_static_doc
+from googleapiclient.errors import HttpError
 from google.auth.transport.requests import Request
+from google.oauth2.credentials import Credentials
 import datetime
 
-
-class GoogleSheetsClient:
-    instance = None  # Use a single underscore
-
-    def __init__(self, user_email) -> None:
-        if GoogleSheetsClient.instance is not None:
-            raise Exception('This class is a singleton')
-
-        GoogleSheetsClient.user_email = user_email
-
-    @classmethod
-    def get_instance(cls):
-        if cls.instance is None:
-            cls.instance = cls._create_service()
-        return cls.instance
-
-    @classmethod
-    def release_instance(cls):
-        cls.instance = None
-
-    @classmethod
-    def _create_service(cls):
-        scopes = ['https://www.googleapis.com/auth/spreadsheets']
-        GOOGLE_API_SERVICE_NAME = 'sheets'
-        GOOGLE_API_VERSION = 'v4'
-        SCOPES = scopes
-
-        cred = None
-
-        # Specify the directory path where you want to store the pickle file
-        pickle_dir = os.path.join('app', 'gsheets_pickle')
-
-        # Create the directory if it doesn't exist
-        os.makedirs(pickle_dir, exist_ok=True)
-
+from services.settings.sheets import (
+    SHEETS_BACKOFF_BASE, SHEETS_BACKOFF_MAX, SHEETS_CLIENT_SECRET_FILE,
+    SHEETS_CREDENTIALS_KEY, SHEETS_MAX_RETRIES, SHEETS_POOL_MAX_IDLE,
+    SHEETS_READ_CACHE_MAX_CELLS, SHEETS_READ_CACHE_TIMEOUT, SHEETS_READ_KEY,
+    SHEETS_READ_WINDOW_ROWS, SHEETS_SYNC_KEY, SHEETS_WRITE_BLOCK_BYTES,
+    SHEETS_WRITE_BLOCK_ROWS)
+
+# The Drive metadata scope gives access to the version of spreadsheets,
+# which keys the read cache
+SCOPES = ['https://www.googleapis.com/auth/spreadsheets',
+          'https://www.googleapis.com/auth/drive.metadata.readonly']
+GOOGLE_API_SERVICE_NAME = 'sheets'
+GOOGLE_API_VERSION = 'v4'
+DRIVE_API_SERVICE_NAME = 'drive'
+DRIVE_API_VERSION = 'v3'
+
+# Statuses worth retrying: quota exceeded and transient server errors
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+def execute_with_retry(request, retries=SHEETS_MAX_RETRIES, backoff=SHEETS_BACKOFF_BASE,
+                       max_backoff=SHEETS_BACKOFF_MAX, sleep=time.sleep):
+    """
+    Execute a Google API request, retrying 429/5xx responses and network
+    errors with exponential backoff and full jitter.
+    """
+    attempt = 0
+    while True:
+        try:
+            return request.execute()
+        except HttpError as e:
+            if e.resp.status not in RETRY_STATUSES or attempt >= retries:
+                raise
+        except (socket.timeout, ConnectionError):
+            if attempt >= retries:
+                raise
+        sleep(random.uniform(0, min(max_backoff, backoff * 2 ** attempt)))
+        attempt += 1
+
+
+def iter_ahead(iterable, depth=1):
+    """
+    Iterate over `iterable` in a background thread, producing up to `depth`
+    items ahead of the consumer.
+
+    When the consumer stops, the thread is joined before returning: an item
+    being produced (e.g. a request on a client that must not be shared
+    between threads) is finished first.
+    """
+    items = queue.Queue(maxsize=depth)
+    done = object()
+    stop = threading.Event()
+
+    def put(entry):
+        while not stop.is_set():
+            try:
+                items.put(entry, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for item in iterable:
+                if not put((item, None)):
+                    return
+            put((done, None))
+        except BaseException as exc:
+            put((done, exc))
+
+    thread = threading.Thread(target=produce, daemon=True)
+    thread.start()
+    try:
+        while True:
+            item, error = items.get()
+            if item is done:
+                if error is not None:
+                    raise error
+                return
+            yield item
+    finally:
+        stop.set()
+        thread.join()
+
+
+def column_letter(index):
+    """
+    The A1 notation letters of the 1-based column `index` (1 -> A, 27 -> AA).
+    """
+    letters = ''
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(ord('A') + remainder) + letters
+    return letters
+
+
+def quote_sheet_name(worksheet_name):
+    return "'{}'".format(worksheet_name.replace("'", "''"))
+
+
+def row_hash(values):
+    data = json.dumps(values, default=str, separators=(',', ':'))
+    return hashlib.blake2b(data.encode('utf-8'), digest_size=8).hexdigest()
+
+
+def contiguous_runs(positions):
+    """
+    Group sorted positions into `(start, end)` runs, `end` excluded.
+    """
+    start = end = None
+    for position in positions:
+        if start is not None and position == end:
+            end += 1
+            continue
+        if start is not None:
+            yield start, end
+        start, end = position, position + 1
+    if start is not None:
+        yield start, end
+
+
+def delete_rows_request(sheet_id, start, end):
+    return {'deleteDimension': {'range': {
+        'sheetId': sheet_id, 'dimension': 'ROWS', 'startIndex': start, 'endIndex': end}}}
+
+
+def append_rows_request(sheet_id, length):
+    return {'appendDimension': {'sheetId': sheet_id, 'dimension': 'ROWS', 'length': length}}
+
+
+def get_discovery_document(service_name=GOOGLE_API_SERVICE_NAME, version=GOOGLE_API_VERSION):
+    """
+    A discovery document bundled with the API client (Sheets by default),
+    parsed once per process.
+    """
+    key = (service_name, version)
+    if key not in _discovery_documents:
+        _discovery_documents[key] = json.loads(get_static_doc(service_name, version))
+    return _discovery_documents[key]
+
+
+_discovery_documents = {}
+
+
+def credentials_cache_key(user_email):
+    return SHEETS_CREDENTIALS_KEY.format(user_email)
+
+
+def store_credentials(user_email, credentials):
+    cache.set(credentials_cache_key(user_email), credentials.to_json(), timeout=None)
+
+
+def load_credentials(user_email):
+    """
+    Valid credentials of a user, from the shared cache.
+
+    Expired credentials are refreshed and stored back so other workers reuse
+    them. Users without cached credentials go through the pickle file of
+    older versions, if any, or the OAuth consent flow.
+    """
+    info = cache.get(credentials_cache_key(user_email))
+    credentials = None
+    if info is not None:
+        info = json.loads(info)
+        # Refresh with the scopes granted, users who consented before a scope
+        # was added keep working without it
+        credentials = Credentials.from_authorized_user_info(info, info.get('scopes') or SCOPES)
+    else:
         pickle_file = os.path.join(
-            pickle_dir, f'{cls.user_email}_token_{GOOGLE_API_SERVICE_NAME}_{GOOGLE_API_VERSION}.pickle')
-
+            'app', 'gsheets_pickle',
+            f'{user_email}_token_{GOOGLE_API_SERVICE_NAME}_{GOOGLE_API_VERSION}.pickle')
         if os.path.exists(pickle_file):
             with open(pickle_file, 'rb') as token:
-                cred = pickle.load(token)
-
-        if not cred or not cred.valid:
-            if cred and cred.expired and cred.refresh_token:
-                cred.refresh(Request())
+                credentials = pickle.load(token)
+
+    if credentials is not None and credentials.valid:
+        if info is None:
+            store_credentials(user_email, credentials)
+        return credentials
+    if credentials is not None and credentials.expired and credentials.refresh_token:
+        credentials.refresh(Request())
+    else:
+        flow = InstalledAppFlow.from_client_secrets_file(SHEETS_CLIENT_SECRET_FILE, SCOPES)
+        credentials = flow.run_local_server()
+    store_credentials(user_email, credentials)
+    return credentials
+
+
+def build_service(credentials, api_endpoint=None):
+    """
+    A Sheets service from the cached discovery document, with its own HTTP
+    connection (services must not be shared between threads).
+    """
+    client_options = {'api_endpoint': api_endpoint} if api_endpoint else None
+    return build_from_document(
+        get_discovery_document(),
+        http=AuthorizedHttp(credentials, http=httplib2.Http()),
+        client_options=client_options)
+
+
+class SheetsServicePool:
+    """
+    Per user pool of Sheets services, safe to use from several threads.
+
+    `acquire` hands out a service no other thread is using, built the first
+    time only. A pooled service whose credentials are still valid is handed
+    out without any I/O; otherwise fresh credentials are taken from the
+    shared cache (another worker may have refreshed them) or refreshed.
+
+    Example:
+        with service_pool.service(user_email) as service:
+            service.spreadsheets().get(spreadsheetId=gsheet_id).execute()
+    """
+
+    def __init__(self, max_idle=SHEETS_POOL_MAX_IDLE, api_endpoint=None):
+        self.max_idle = max_idle
+        self.api_endpoint = api_endpoint
+        self._idle = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, user_email):
+        with self._lock:
+            idle = self._idle.get(user_email)
+            service = idle.pop() if idle else None
+        if service is None:
+            return build_service(load_credentials(user_email), self.api_endpoint)
+        http = service._http
+        if not http.credentials.valid:
+            http.credentials = load_credentials(user_email)
+        return service
+
+    def release(self, user_email, service):
+        with self._lock:
+            idle = self._idle.setdefault(user_email, [])
+            if len(idle) < self.max_idle:
+                idle.append(service)
+
+    def clear(self, user_email=None):
+        with self._lock:
+            if user_email is None:
+                self._idle.clear()
             else:
-                CLIENT_SECRET_FILE = 'client_secret_file.json'
-                flow = InstalledAppFlow.from_client_secrets_file(
-                    CLIENT_SECRET_FILE, SCOPES)
-                cred = flow.run_local_server()
-
-            with open(pickle_file, 'wb') as token:
-                pickle.dump(cred, token)
+                self._idle.pop(user_email, None)
 
+    @contextlib.contextmanager
+    def service(self, user_email):
+        service = self.acquire(user_email)
         try:
-            service = build(GOOGLE_API_SERVICE_NAME,
-                            GOOGLE_API_VERSION, credentials=cred)
-            return service
-        except Exception as e:
-            print('Unable to connect.')
-            print(e)
-            return None
+            yield service
+        finally:
+            self.release(user_email, service)
+
+
+service_pool = SheetsServicePool()
+
+
+class GoogleSheetsClient:
+    """
+    Base class of the Sheets clients of a user.
+
+    The client takes a service from `service_pool` when first needed and
+    gives it back on `release_instance` (or when used as a context manager),
+    so a client must not be shared between threads. An explicit `service` is
+    used as is and never pooled.
+    """
+
+    pool = service_pool
+    drive_endpoint = None
+
+    def __init__(self, user_email, service=None) -> None:
+        self.user_email = user_email
+        self.service = service
+        self._pooled = False
+        self._drive = None
+
+    def get_instance(self):
+        if self.service is None:
+            self.service = self.pool.acquire(self.user_email)
+            self._pooled = True
+        return self.service
+
+    def release_instance(self):
+        if self._pooled:
+            self.pool.release(self.user_email, self.service)
+            self.service = None
+            self._pooled = False
+            self._drive = None
+
+    def get_drive(self):
+        """
+        A Drive service sharing the HTTP connection of the Sheets service.
+        """
+        if self._drive is None:
+            client_options = ({'api_endpoint': self.drive_endpoint}
+                              if self.drive_endpoint else None)
+            self._drive = build_from_document(
+                get_discovery_document(DRIVE_API_SERVICE_NAME, DRIVE_API_VERSION),
+                http=self.get_instance()._http, client_options=client_options)
+        return self._drive
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release_instance()
 
     @staticmethod
     def convert_to_RFC_datetime(year=1900, month=1, day=1, hour=0, minute=0):
@@ -76,15 +334,76 @@ class GoogleSheetsClient:
 
 
 class ReadSheets(GoogleSheetsClient):
-    def __init__(self, user_email):
-        super().__init__(user_email=user_email)
+    """
+    Reads spreadsheets, reusing cached results while a file is unchanged.
+
+    Results are cached under the spreadsheet id, the request and the Drive
+    `version` of the file, which Google bumps on every edit. A read first
+    fetches that version with a small Drive request, outside of the Sheets
+    quota (`iter_windows` fetches it once for all of its windows, and checks
+    it again after them if any was fetched from the API). When it cannot be
+    fetched, e.g. for credentials granted before the Drive scope was added,
+    reads go to the API uncached.
+    """
+
+    cache_reads = True
+
+    def __init__(self, user_email, service=None, cache_reads=None):
+        super().__init__(user_email=user_email, service=service)
+        if cache_reads is not None:
+            self.cache_reads = cache_reads
+
+    def revision(self, spreadsheet_id):
+        """
+        The Drive version of the spreadsheet, `None` if unknown.
+        """
+        if not self.cache_reads:
+            return None
+        try:
+            file = execute_with_retry(self.get_drive().files().get(
+                fileId=spreadsheet_id, fields='version', supportsAllDrives=True))
+        except HttpError as e:
+            if e.resp.status in (401, 403, 404):
+                return None
+            raise
+        return file.get('version')
+
+    def cached_read(self, spreadsheet_id, request, params, revision=None, stored=None):
+        """
+        Execute a read `request` of the spreadsheet, or return its cached
+        result if the spreadsheet was not modified since.
+
+        Args:
+            spreadsheet_id (str): Id of the spreadsheet read.
+            request: The API request, executed on a cache miss.
+            params (dict): What identifies the result besides the spreadsheet
+                (method, range, render options...).
+            revision (str, optional): The spreadsheet's version, fetched when
+                not given.
+            stored (list, optional): Collects the cache keys of the results
+                fetched from the API and cached by this call.
+        """
+        if revision is None:
+            revision = self.revision(spreadsheet_id)
+        if revision is None:
+            return execute_with_retry(request)
+        key = SHEETS_READ_KEY.format(spreadsheet_id, revision, row_hash(params))
+        result = cache.get(key)
+        if result is None:
+            result = execute_with_retry(request)
+            cells = sum(len(row) for row in result.get('values', ()))
+            if cells <= SHEETS_READ_CACHE_MAX_CELLS:
+                cache.set(key, result, timeout=SHEETS_READ_CACHE_TIMEOUT)
+                if stored is not None:
+                    stored.append(key)
+        return result
 
     def retrieve_metadata(self, spreadsheet_id):
         service = self.get_instance()
         if service:
-            spreadsheet = service.spreadsheets().get(
-                spreadsheetId=spreadsheet_id).execute()
-            return spreadsheet
+            return self.cached_read(
+                spreadsheet_id, service.spreadsheets().get(spreadsheetId=spreadsheet_id),
+                {'method': 'get'})
         raise Exception('service creation failed')
 
     def read_data(self, spreadsheet_id, range_name):
@@ -92,12 +411,80 @@ class ReadSheets(GoogleSheetsClient):
 
         service = self.get_instance()
         if service:
-            result = service.spreadsheets().values().get(
-                spreadsheetId=spreadsheet_id, range=range_name).execute()
+            result = self.cached_read(
+                spreadsheet_id,
+                service.spreadsheets().values().get(
+                    spreadsheetId=spreadsheet_id, range=range_name),
+                {'method': 'values', 'range': range_name})
             values = result.get('values', [])
             return values
         return None
 
+    def grid_size(self, spreadsheet_id, worksheet_name, revision=None, stored=None):
+        """
+        `(row_count, column_count)` of the worksheet's grid, empty rows and
+        columns included.
+        """
+        fields = 'sheets(properties(title,gridProperties(rowCount,columnCount)))'
+        spreadsheet = self.cached_read(
+            spreadsheet_id,
+            self.get_instance().spreadsheets().get(spreadsheetId=spreadsheet_id, fields=fields),
+            {'method': 'get', 'fields': fields}, revision=revision, stored=stored)
+        for sheet in spreadsheet.get('sheets', []):
+            if sheet['properties']['title'] == worksheet_name:
+                grid = sheet['properties']['gridProperties']
+                return grid['rowCount'], grid['columnCount']
+        raise ValueError(f"Worksheet '{worksheet_name}' not found")
+
+    def iter_windows(self, spreadsheet_id, worksheet_name, window_rows=SHEETS_READ_WINDOW_ROWS):
+        """
+        Read a worksheet in windows of `window_rows` rows spanning all of its
+        columns (A1:Z5000, A5001:Z10000... for a 26 columns grid), yielding
+        `(first_row, values)` per window.
+
+        Values are unformatted (numbers and booleans keep their type), dates
+        are formatted strings.
+
+        All windows are cached under the version fetched before the first
+        one. If the spreadsheet was edited by the time the last one is read,
+        the windows fetched meanwhile may hold the edit and are dropped from
+        the cache.
+        """
+        sheet = quote_sheet_name(worksheet_name)
+        revision = self.revision(spreadsheet_id)
+        stored = []
+        row_count, column_count = self.grid_size(
+            spreadsheet_id, worksheet_name, revision=revision, stored=stored)
+        last_column = column_letter(column_count)
+        for first in range(1, row_count + 1, window_rows):
+            last = min(first + window_rows - 1, row_count)
+            a1_range = f'{sheet}!A{first}:{last_column}{last}'
+            result = self.cached_read(
+                spreadsheet_id,
+                self.get_instance().spreadsheets().values().get(
+                    spreadsheetId=spreadsheet_id,
+                    range=a1_range,
+                    majorDimension='ROWS',
+                    valueRenderOption='UNFORMATTED_VALUE',
+                    dateTimeRenderOption='FORMATTED_STRING',
+                    fields='values'),
+                {'method': 'values', 'range': a1_range, 'render': 'UNFORMATTED_VALUE'},
+                revision=revision, stored=stored)
+            yield first, result.get('values', [])
+        if stored and self.revision(spreadsheet_id) != revision:
+            cache.delete_many(stored)
+
+    def iter_rows(self, spreadsheet_id, worksheet_name, window_rows=SHEETS_READ_WINDOW_ROWS):
+        """
+        Stream the rows of a worksheet as `(row_number, values)`, fetching
+        the next window on a background thread while the current one is
+        consumed. At most two windows are held in memory.
+        """
+        windows = self.iter_windows(spreadsheet_id, worksheet_name, window_rows=window_rows)
+        for first, values in iter_ahead(windows):
+            for offset, row in enumerate(values):
+                yield first + offset, row
+
     def validate_range(self, spreadsheet_id, range_name):
         # format for range_name:  SAMPLE_RANGE_NAME="'Orders With Mismatch Total'!A:D"
 
@@ -110,12 +497,12 @@ class ReadSheets(GoogleSheetsClient):
 
 
 class WriteToGoogleSheet(GoogleSheetsClient):
-    def __init__(self, user_email) -> None:
-        super().__init__(user_email=user_email)
-        self.service = self.get_instance()
-
-    def write_data_to_sheet_df(self, worksheet_name, gsheet_id, df):
+    def __init__(self, user_email, service=None) -> None:
+        super().__init__(user_email=user_email, service=service)
+        self.get_instance()
 
+    @staticmethod
+    def prepare_frame(df):
         # Replace NaN values with empty strings
         df = df.fillna('')
 
@@ -123,6 +510,11 @@ class WriteToGoogleSheet(GoogleSheetsClient):
         date_columns = df.select_dtypes(
             include=['datetime64']).columns.tolist()
         df[date_columns] = df[date_columns].astype(str)
+        return df
+
+    def write_data_to_sheet_df(self, worksheet_name, gsheet_id, df):
+
+        df = self.prepare_frame(df)
 
         # Prepare the data for insertion
         values_to_insert = df.values.tolist()
@@ -143,6 +535,275 @@ class WriteToGoogleSheet(GoogleSheetsClient):
 
         return response
 
+    @staticmethod
+    def split_block(start, values, max_bytes):
+        """
+        Split a block of rows in halves until each part's JSON payload fits
+        in `max_bytes`, yielding `(start, values)` pairs.
+        """
+        if len(values) > 1 and len(json.dumps(values, default=str)) > max_bytes:
+            half = len(values) // 2
+            yield from WriteToGoogleSheet.split_block(start, values[:half], max_bytes)
+            yield from WriteToGoogleSheet.split_block(
+                start + half, values[half:], max_bytes)
+        else:
+            yield start, values
+
+    def iter_blocks(self, df, block_rows, max_bytes):
+        for start in range(0, len(df), block_rows):
+            values = df.iloc[start:start + block_rows].values.tolist()
+            yield from self.split_block(start, values, max_bytes)
+
+    def iter_row_blocks(self, rows, block_rows, max_bytes):
+        for start in range(0, len(rows), block_rows):
+            yield from self.split_block(start, rows[start:start + block_rows], max_bytes)
+
+    def next_empty_row(self, worksheet_name, gsheet_id):
+        """
+        The 1-based index of the row following the last row holding data in
+        the first column of the worksheet. Only that column is downloaded.
+        """
+        sheet_range = '{}!A:A'.format(quote_sheet_name(worksheet_name))
+        result = execute_with_retry(self.service.spreadsheets().values().get(
+            spreadsheetId=gsheet_id, range=sheet_range, fields='values'))
+        return len(result.get('values', [])) + 1
+
+    def write_data_to_sheet_batched(self, worksheet_name, gsheet_id, df, start_row=None,
+                                    block_rows=SHEETS_WRITE_BLOCK_ROWS,
+                                    max_bytes=SHEETS_WRITE_BLOCK_BYTES):
+        """
+        Write a DataFrame of any size below the data of a worksheet.
+
+        The frame is sent in blocks of at most `block_rows` rows and
+        `max_bytes` of JSON, each written with `values.batchUpdate` at a fixed
+        range computed upfront: retrying a block after a 429/5xx overwrites
+        the same cells instead of appending it twice. The next block is
+        converted in a background thread while a request is in flight.
+
+        Args:
+            worksheet_name (str): Title of the worksheet.
+            gsheet_id (str): Id of the spreadsheet.
+            df (DataFrame): The rows to write, without header.
+            start_row (int, optional): 1-based row of the first written row,
+                by default the row after the last value of the first column.
+
+        Returns:
+            dict: `updatedRows` and `updatedCells` over all blocks.
+        """
+        df = self.prepare_frame(df)
+        if start_row is None:
+            start_row = self.next_empty_row(worksheet_name, gsheet_id)
+        properties = self.sheet_properties(gsheet_id, worksheet_name)
+        self.ensure_rows(gsheet_id, properties, start_row + len(df) - 1)
+        return self.write_blocks(worksheet_name, gsheet_id, start_row, len(df.columns),
+                                 self.iter_blocks(df, block_rows, max_bytes))
+
+    def write_blocks(self, worksheet_name, gsheet_id, start_row, column_count, blocks):
+        """
+        Write `(offset, values)` blocks at `start_row + offset`, one
+        `values.batchUpdate` per block, converting the next block while a
+        request is in flight.
+        """
+        sheet = quote_sheet_name(worksheet_name)
+        last_column = column_letter(max(column_count, 1))
+
+        updated = {'updatedRows': 0, 'updatedCells': 0}
+        for offset, values in iter_ahead(blocks):
+            first = start_row + offset
+            body = {
+                'valueInputOption': 'RAW',
+                'data': [{
+                    'range': f'{sheet}!A{first}:{last_column}{first + len(values) - 1}',
+                    'majorDimension': 'ROWS',
+                    'values': values,
+                }],
+            }
+            response = execute_with_retry(self.service.spreadsheets().values().batchUpdate(
+                spreadsheetId=gsheet_id, body=body))
+            updated['updatedRows'] += response.get('totalUpdatedRows', 0)
+            updated['updatedCells'] += response.get('totalUpdatedCells', 0)
+        return updated
+
+    def sheet_properties(self, gsheet_id, worksheet_name):
+        """
+        The `sheetId`, `title` and `gridProperties.rowCount` of a worksheet.
+        """
+        spreadsheet = execute_with_retry(self.service.spreadsheets().get(
+            spreadsheetId=gsheet_id,
+            fields='sheets(properties(sheetId,title,gridProperties(rowCount)))'))
+        for sheet in spreadsheet.get('sheets', []):
+            if sheet['properties']['title'] == worksheet_name:
+                return sheet['properties']
+        raise ValueError(f"Worksheet '{worksheet_name}' not found")
+
+    def ensure_rows(self, gsheet_id, properties, row_count):
+        """
+        Grow the grid of a worksheet to at least `row_count` rows; values
+        cannot be written past the grid.
+        """
+        missing = row_count - properties['gridProperties']['rowCount']
+        if missing > 0:
+            execute_with_retry(self.service.spreadsheets().batchUpdate(
+                spreadsheetId=gsheet_id,
+                body={'requests': [append_rows_request(properties['sheetId'], missing)]}))
+            properties['gridProperties']['rowCount'] = row_count
+
+    def sync_data_to_sheet_df(self, worksheet_name, gsheet_id, df, key_column, full=False,
+                              max_bytes=SHEETS_WRITE_BLOCK_BYTES):
+        """
+        Publish a DataFrame to a worksheet, sending only what changed since
+        the last sync.
+
+        The worksheet holds a header row and one row per key of
+        `key_column`. A hash of every published row is kept in the cache
+        with the row order; the new frame is diffed against it and only
+        changed rows, appended rows and deletions are sent: deletions (and
+        grid growth) in one `spreadsheets.batchUpdate`, updated and appended
+        rows as ranges packed in as few `values.batchUpdate` requests as
+        `max_bytes` allows. An unchanged frame returns without any request.
+
+        The worksheet is rewritten when nothing was synced yet, the columns
+        changed, the previous sync failed or `full` is set, e.g. after manual
+        edits of the sheet.
+
+        Args:
+            worksheet_name (str): Title of the worksheet.
+            gsheet_id (str): Id of the spreadsheet.
+            df (DataFrame): The rows to publish.
+            key_column (str): Column identifying a row, unique in `df`.
+
+        Returns:
+            dict: Numbers of `updated`, `appended` and `deleted` rows.
+
+        Raises:
+            ValueError: If `key_column` is missing or has duplicates.
+        """
+        df = self.prepare_frame(df)
+        columns = [str(column) for column in df.columns]
+        key_index = columns.index(str(key_column))
+        rows = df.values.tolist()
+        keys = [str(row[key_index]) for row in rows]
+        if len(set(keys)) != len(keys):
+            raise ValueError(f"Duplicate values in key column '{key_column}'")
+        hashes = [row_hash(row) for row in rows]
+        frame_hash = row_hash([columns, keys, hashes])
+
+        snapshot_key = SHEETS_SYNC_KEY.format(gsheet_id, worksheet_name)
+        snapshot = None if full else cache.get(snapshot_key)
+        if snapshot is not None and snapshot['frame'] == frame_hash:
+            return {'updated': 0, 'appended': 0, 'deleted': 0}
+        # Until the new snapshot is stored the sheet may be half written, so a
+        # failed sync must not leave the old one to diff against
+        cache.delete(snapshot_key)
+        if snapshot is None or snapshot['columns'] != columns:
+            result, snapshot = self.rewrite_sheet(worksheet_name, gsheet_id, columns, rows,
+                                                  keys, hashes, max_bytes)
+        else:
+            result, snapshot = self.apply_diff(worksheet_name, gsheet_id, snapshot, rows,
+                                               keys, hashes, max_bytes)
+        snapshot['frame'] = frame_hash
+        cache.set(snapshot_key, snapshot, timeout=None)
+        return result
+
+    def rewrite_sheet(self, worksheet_name, gsheet_id, columns, rows, keys, hashes,
+                      max_bytes):
+        properties = self.sheet_properties(gsheet_id, worksheet_name)
+        execute_with_retry(self.service.spreadsheets().values().clear(
+            spreadsheetId=gsheet_id, range=quote_sheet_name(worksheet_name), body={}))
+        self.ensure_rows(gsheet_id, properties, len(rows) + 1)
+        blocks = self.iter_row_blocks([columns] + rows, SHEETS_WRITE_BLOCK_ROWS, max_bytes)
+        self.write_blocks(worksheet_name, gsheet_id, 1, len(columns), blocks)
+        snapshot = {
+            'columns': columns,
+            'keys': keys,
+            'hashes': hashes,
+            'sheet_id': properties['sheetId'],
+            'row_count': properties['gridProperties']['rowCount'],
+        }
+        return {'updated': 0, 'appended': len(rows), 'deleted': 0}, snapshot
+
+    def apply_diff(self, worksheet_name, gsheet_id, snapshot, rows, keys, hashes, max_bytes):
+        positions = {key: index for index, key in enumerate(keys)}
+        surviving, deleted = [], []
+        for position, (key, old_hash) in enumerate(zip(snapshot['keys'], snapshot['hashes'])):
+            if key in positions:
+                surviving.append((key, old_hash))
+            else:
+                deleted.append(position)
+
+        # Sheet rows are 1-based and follow the header
+        changes = []
+        for position, (key, old_hash) in enumerate(surviving):
+            index = positions[key]
+            if hashes[index] != old_hash:
+                changes.append((position + 2, rows[index]))
+        updated = len(changes)
+        published = set(snapshot['keys'])
+        appended = [index for index, key in enumerate(keys) if key not in published]
+        for offset, index in enumerate(appended):
+            changes.append((len(surviving) + offset + 2, rows[index]))
+
+        structure = [delete_rows_request(snapshot['sheet_id'], start + 1, end + 1)
+                     for start, end in reversed(list(contiguous_runs(deleted)))]
+        row_count = snapshot['row_count'] - len(deleted)
+        needed = len(surviving) + len(appended) + 1
+        if needed > row_count:
+            structure.append(append_rows_request(snapshot['sheet_id'], needed - row_count))
+            row_count = needed
+        if structure:
+            execute_with_retry(self.service.spreadsheets().batchUpdate(
+                spreadsheetId=gsheet_id, body={'requests': structure}))
+
+        sheet = quote_sheet_name(worksheet_name)
+        last_column = column_letter(max(len(snapshot['columns']), 1))
+        for data in self.pack_ranges(sheet, last_column, changes, max_bytes):
+            execute_with_retry(self.service.spreadsheets().values().batchUpdate(
+                spreadsheetId=gsheet_id, body={'valueInputOption': 'RAW', 'data': data}))
+
+        final_keys = [key for key, _ in surviving] + [keys[index] for index in appended]
+        snapshot = {
+            **snapshot,
+            'keys': final_keys,
+            'hashes': [hashes[positions[key]] for key in final_keys],
+            'row_count': row_count,
+        }
+        return {'updated': updated, 'appended': len(appended),
+                'deleted': len(deleted)}, snapshot
+
+    @staticmethod
+    def pack_ranges(sheet, last_column, changes, max_bytes):
+        """
+        Group `(sheet_row, values)` changes into ranges of consecutive rows,
+        and the ranges into lists whose JSON payload stays under `max_bytes`.
+        """
+        changes = sorted(changes, key=lambda change: change[0])
+        ranges, first, values = [], None, []
+        for row, row_values in changes:
+            if values and row != first + len(values):
+                ranges.append((first, values))
+                values = []
+            if not values:
+                first = row
+            values.append(row_values)
+        if values:
+            ranges.append((first, values))
+
+        data, size = [], 0
+        for first, values in ranges:
+            value_range = {
+                'range': f'{sheet}!A{first}:{last_column}{first + len(values) - 1}',
+                'majorDimension': 'ROWS',
+                'values': values,
+            }
+            range_size = len(json.dumps(value_range, default=str))
+            if data and size + range_size > max_bytes:
+                yield data
+                data, size = [], 0
+            data.append(value_range)
+            size += range_size
+        if data:
+            yield data
+
     def create_new_spreadsheet(self, sheet_name='default'):
         sheet_body = {
             'properties': {
@@ -0,0 +1,553 @@
+import datetime
+import json
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+from urllib.parse import parse_qs, unquote, urlparse
+
+import httplib2
+import pandas as pd
+from django.test import SimpleTestCase, TestCase
+from google.oauth2.credentials import Credentials
+from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
+
+from chunked_upload.importers.model_importers import import_sheet
+from chunked_upload.importers.readers import iter_sheet_records
+from pets.models import Category
+from sdk_clients import google
+from sdk_clients.google import (
+    ReadSheets, SheetsServicePool, WriteToGoogleSheet, column_letter, store_credentials)
+
+A1_PATTERN = re.compile(
+    r"^(?:'(?P<quoted>(?:[^']|'')+)'|(?P<plain>[^!]+))"
+    r"(?:!(?P<c1>[A-Z]*)(?P<r1>\d*)(?::(?P<c2>[A-Z]*)(?P<r2>\d*))?)?$")
+
+
+def column_index(letters):
+    index = 0
+    for letter in letters:
+        index = index * 26 + ord(letter) - ord('A') + 1
+    return index
+
+
+def parse_a1(a1_range):
+    """
+    `(sheet, first_row, first_column, last_row, last_column)` of a range,
+    0-based, with `None` for open ends.
+    """
+    match = A1_PATTERN.match(a1_range)
+    sheet = (match.group('quoted') or '').replace("''", "'") or match.group('plain')
+    c1, r1, c2, r2 = (match.group(name) for name in ('c1', 'r1', 'c2', 'r2'))
+    first_row = int(r1) - 1 if r1 else 0
+    first_column = column_index(c1) - 1 if c1 else 0
+    if c2 is None and r2 is None:
+        last_row, last_column = (first_row if r1 else None), (first_column if c1 else None)
+    else:
+        last_row = int(r2) - 1 if r2 else None
+        last_column = column_index(c2) - 1 if c2 else None
+    return sheet, first_row, first_column, last_row, last_column
+
+
+class FakeSheets:
+    """
+    In-memory spreadsheets served over HTTP with the routes of the Sheets
+    API used by the clients, and the Drive version of the file. `failures`
+    holds statuses returned, in order, instead of handling the next value
+    writes; `drive_status`, if set, is returned for Drive requests.
+    """
+
+    def __init__(self):
+        self.sheets = {}
+        # Versions are unique across servers so cached reads never collide
+        self.version = uuid.uuid4().int % 10 ** 12
+        self.drive_status = None
+        # Empty rows at the bottom of each grid, unless its size is set
+        self.spare_rows = 3
+        self.row_counts = {}
+        self.failures = []
+        self.requests = []
+        self.lock = threading.Lock()
+
+    def grid(self, sheet):
+        return self.sheets.setdefault(sheet, {})
+
+    def values(self, sheet):
+        grid = self.grid(sheet)
+        if not grid:
+            return []
+        rows = max(row for row, _ in grid) + 1
+        columns = max(column for _, column in grid) + 1
+        return [[grid.get((row, column), '') for column in range(columns)]
+                for row in range(rows)]
+
+    def read(self, a1_range):
+        sheet, first_row, first_column, last_row, last_column = parse_a1(a1_range)
+        rows = []
+        for row in self.values(sheet)[first_row:None if last_row is None else last_row + 1]:
+            row = row[first_column:None if last_column is None else last_column + 1]
+            while row and row[-1] == '':
+                row.pop()
+            rows.append(row)
+        while rows and not rows[-1]:
+            rows.pop()
+        return rows
+
+    def row_count(self, sheet):
+        return self.row_counts.get(sheet, len(self.values(sheet)) + self.spare_rows)
+
+    def column_count(self, sheet):
+        # New grids have 26 columns and grow with the values written
+        return max([26] + [len(row) for row in self.values(sheet)])
+
+    def sheet_id(self, sheet):
+        self.grid(sheet)
+        return list(self.sheets).index(sheet)
+
+    def clear(self, a1_range):
+        sheet = parse_a1(a1_range)[0]
+        row_count = self.row_count(sheet)
+        self.grid(sheet).clear()
+        self.version += 1
+        if sheet not in self.row_counts:
+            self.row_counts[sheet] = row_count
+
+    def update_structure(self, request):
+        self.version += 1
+        title = {self.sheet_id(sheet): sheet for sheet in self.sheets}
+        if 'appendDimension' in request:
+            sheet = title[request['appendDimension']['sheetId']]
+            self.row_counts[sheet] = self.row_count(sheet) + request['appendDimension']['length']
+        if 'deleteDimension' in request:
+            dimension = request['deleteDimension']['range']
+            sheet = title[dimension['sheetId']]
+            start, end = dimension['startIndex'], dimension['endIndex']
+            row_count = self.row_count(sheet)
+            grid = self.grid(sheet)
+            shifted = {}
+            for (row, column), value in grid.items():
+                if row < start:
+                    shifted[(row, column)] = value
+                elif row >= end:
+                    shifted[(row - (end - start), column)] = value
+            grid.clear()
+            grid.update(shifted)
+            self.row_counts[sheet] = row_count - (end - start)
+
+    def write(self, a1_range, values):
+        sheet, first_row, first_column, _, _ = parse_a1(a1_range)
+        if sheet in self.row_counts and first_row + len(values) > self.row_counts[sheet]:
+            raise ValueError(f'Range ({a1_range}) exceeds grid limits')
+        grid = self.grid(sheet)
+        self.version += 1
+        for row_offset, row in enumerate(values):
+            for column_offset, value in enumerate(row):
+                grid[(first_row + row_offset, first_column + column_offset)] = value
+        return len(values), sum(len(row) for row in values)
+
+
+class FakeSheetsHandler(BaseHTTPRequestHandler):
+
+    def log_message(self, *args):
+        pass
+
+    def reply(self, status, body):
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def handle_request(self, method):
+        fake = self.server.fake
+        url = urlparse(self.path)
+        length = int(self.headers.get('Content-Length') or 0)
+        body = json.loads(self.rfile.read(length) or b'{}') if length else {}
+        with fake.lock:
+            fake.requests.append((method, unquote(url.path), parse_qs(url.query), body))
+            if fake.failures and url.path.endswith('/values:batchUpdate'):
+                status = fake.failures.pop(0)
+                return self.reply(status, {'error': {'code': status, 'message': 'fake'}})
+            match = re.match(r'^/v4/spreadsheets/(?P<id>[^/]+)/values(?P<rest>.*)$',
+                             unquote(url.path))
+            spreadsheet = re.match(r'^/v4/spreadsheets/(?P<id>[^/:]+)(?P<rest>.*)$',
+                                   unquote(url.path))
+            if method == 'GET' and url.path.startswith('/drive/v3/files/'):
+                if fake.drive_status:
+                    return self.reply(fake.drive_status, {'error': {
+                        'code': fake.drive_status, 'message': 'fake'}})
+                return self.reply(200, {'version': str(fake.version)})
+            if method == 'GET' and spreadsheet and not spreadsheet.group('rest'):
+                return self.reply(200, {'spreadsheetId': spreadsheet.group('id'), 'sheets': [
+                    {'properties': {'sheetId': fake.sheet_id(title), 'title': title,
+                                    'gridProperties': {
+                                        'rowCount': fake.row_count(title),
+                                        'columnCount': fake.column_count(title)}}}
+                    for title in fake.sheets]})
+            if method == 'POST' and spreadsheet and spreadsheet.group('rest') == ':batchUpdate':
+                for request in body['requests']:
+                    fake.update_structure(request)
+                return self.reply(200, {'spreadsheetId': spreadsheet.group('id')})
+            if method == 'POST' and match and match.group('rest').endswith(':clear'):
+                fake.clear(match.group('rest')[1:-len(':clear')])
+                return self.reply(200, {})
+            if method == 'GET' and match and match.group('rest').startswith('/'):
+                a1_range = match.group('rest')[1:]
+                return self.reply(200, {'range': a1_range, 'majorDimension': 'ROWS',
+                                        'values': fake.read(a1_range)})
+            if method == 'POST' and match and match.group('rest') == ':batchUpdate':
+                rows = cells = 0
+                try:
+                    for value_range in body['data']:
+                        updated_rows, updated_cells = fake.write(
+                            value_range['range'], value_range['values'])
+                        rows += updated_rows
+                        cells += updated_cells
+                except ValueError as e:
+                    return self.reply(400, {'error': {'code': 400, 'message': str(e)}})
+                return self.reply(200, {'totalUpdatedRows': rows,
+                                        'totalUpdatedCells': cells})
+        return self.reply(404, {'error': {'code': 404, 'message': self.path}})
+
+    def do_GET(self):
+        self.handle_request('GET')
+
+    def do_POST(self):
+        self.handle_request('POST')
+
+
+class FakeSheetsMixin:
+    """
+    Runs a `FakeSheets` server and builds a Sheets service pointing at it;
+    the Drive requests of the clients go to the same server.
+    """
+
+    def setUp(self):
+        self.fake = FakeSheets()
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), FakeSheetsHandler)
+        self.server.fake = self.fake
+        thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        endpoint = 'http://127.0.0.1:{}/'.format(self.server.server_address[1])
+        self.service = build(
+            'sheets', 'v4', http=httplib2.Http(), static_discovery=True,
+            client_options={'api_endpoint': endpoint})
+        drive_endpoint = mock.patch.object(
+            google.GoogleSheetsClient, 'drive_endpoint', endpoint + 'drive/v3/')
+        drive_endpoint.start()
+        self.addCleanup(drive_endpoint.stop)
+
+
+class FakeSheetsTestCase(FakeSheetsMixin, SimpleTestCase):
+
+    def value_writes(self):
+        return [body for method, path, _, body in self.fake.requests
+                if method == 'POST' and path.endswith('/values:batchUpdate')]
+
+
+class BatchedSheetWriterTests(FakeSheetsTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.writer = WriteToGoogleSheet('test@example.com', service=self.service)
+        self.fake.grid('Prices')
+
+    def frame(self, rows):
+        return pd.DataFrame({'sku': [f'SKU-{index}' for index in range(rows)],
+                             'price': [index * 1.5 for index in range(rows)],
+                             'note': [None if index % 2 else 'x' for index in range(rows)]})
+
+    def test_column_letter(self):
+        self.assertEqual([column_letter(index) for index in (1, 26, 27, 52, 703)],
+                         ['A', 'Z', 'AA', 'AZ', 'AAA'])
+
+    def test_blocks_are_written_below_existing_rows(self):
+        self.fake.write("'Prices'!A1", [['sku', 'price', 'note']])
+        result = self.writer.write_data_to_sheet_batched(
+            'Prices', 'sheet-id', self.frame(25), block_rows=10)
+        self.assertEqual(result['updatedRows'], 25)
+        values = self.fake.values('Prices')
+        self.assertEqual(len(values), 26)
+        self.assertEqual(values[1], ['SKU-0', 0.0, 'x'])
+        self.assertEqual(values[24], ['SKU-23', 34.5, ''])
+        writes = self.value_writes()
+        self.assertEqual([len(body['data'][0]['values']) for body in writes], [10, 10, 5])
+        self.assertEqual(writes[1]['data'][0]['range'], "'Prices'!A12:C21")
+        # Only the first column is read to find the existing rows
+        reads = [path for method, path, _, _ in self.fake.requests
+                 if method == 'GET' and '/values/' in path]
+        self.assertEqual([path.rsplit('/', 1)[1] for path in reads], ["'Prices'!A:A"])
+
+    def test_grid_grows_to_fit_the_rows(self):
+        self.fake.row_counts['Prices'] = 10
+        self.writer.write_data_to_sheet_batched('Prices', 'sheet-id', self.frame(25))
+        self.assertEqual(self.fake.row_count('Prices'), 25)
+        self.assertEqual(len(self.fake.values('Prices')), 25)
+
+    def test_blocks_are_split_to_fit_max_bytes(self):
+        self.writer.write_data_to_sheet_batched(
+            'Prices', 'sheet-id', self.frame(8), start_row=1, block_rows=8, max_bytes=100)
+        writes = self.value_writes()
+        self.assertGreater(len(writes), 1)
+        self.assertEqual(len(self.fake.values('Prices')), 8)
+
+    def test_throttled_blocks_are_retried_at_the_same_range(self):
+        self.fake.failures = [429, 503]
+        with mock.patch('sdk_clients.google.random.uniform', return_value=0):
+            result = self.writer.write_data_to_sheet_batched(
+                'Prices', 'sheet-id', self.frame(5), start_row=1)
+        self.assertEqual(result['updatedRows'], 5)
+        ranges = [body['data'][0]['range'] for body in self.value_writes()]
+        self.assertEqual(ranges, ["'Prices'!A1:C5"] * 3)
+        self.assertEqual(len(self.fake.values('Prices')), 5)
+
+
+class IterAheadTests(SimpleTestCase):
+
+    def test_stopped_consumer_waits_for_the_item_in_flight(self):
+        produced = []
+
+        def items():
+            for index in range(3):
+                time.sleep(0.05 * index)
+                produced.append(index)
+                yield index
+
+        iterator = google.iter_ahead(items())
+        self.assertEqual(next(iterator), 0)
+        iterator.close()
+        # The producer is not left fetching behind the consumer's back
+        finished = list(produced)
+        time.sleep(0.2)
+        self.assertEqual(produced, finished)
+
+
+class PagedSheetReaderTests(FakeSheetsTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.reader = ReadSheets('test@example.com', service=self.service)
+        self.fake.write("'Categories'!A1", [['Name', 'Description', 'Rank']] + [
+            [f'Category {index}', f'Number {index}', index] for index in range(11)])
+
+    def test_rows_are_read_in_windows(self):
+        rows = list(self.reader.iter_rows('sheet-id', 'Categories', window_rows=5))
+        self.assertEqual([number for number, _ in rows], list(range(1, 13)))
+        reads = [path for method, path, _, _ in self.fake.requests
+                 if method == 'GET' and '/values/' in path]
+        self.assertEqual([path.rsplit('!', 1)[1] for path in reads],
+                         ['A1:Z5', 'A6:Z10', 'A11:Z15'])
+
+    def test_windows_span_every_column_of_the_grid(self):
+        self.fake.write("'Categories'!AD2", [['Wide']])
+        rows = dict(self.reader.iter_rows('sheet-id', 'Categories', window_rows=5))
+        self.assertEqual(rows[2][29], 'Wide')
+        reads = [path for method, path, _, _ in self.fake.requests
+                 if method == 'GET' and '/values/' in path]
+        self.assertEqual(reads[0].rsplit('!', 1)[1], 'A1:AD5')
+
+    def test_records_are_typed_like_csv_rows(self):
+        self.fake.write("'Categories'!A13", [[2.0, True]])
+        records = list(iter_sheet_records(
+            self.reader.iter_rows('sheet-id', 'Categories', window_rows=5)))
+        self.assertEqual(records[0], (2, {'Name': 'Category 0', 'Description': 'Number 0',
+                                          'Rank': '0'}))
+        self.assertEqual(records[-1], (13, {'Name': '2', 'Description': 'true', 'Rank': ''}))
+
+
+class CachedSheetReadTests(FakeSheetsTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.reader = ReadSheets('test@example.com', service=self.service)
+        self.fake.write("'Categories'!A1", [['Name'], ['Cats'], ['Dogs']])
+
+    def sheet_requests(self):
+        return [path for _, path, _, _ in self.fake.requests if path.startswith('/v4/')]
+
+    def test_unchanged_sheet_is_read_from_the_cache(self):
+        self.assertEqual(self.reader.read_data('sheet-id', 'Categories!A:A'),
+                         [['Name'], ['Cats'], ['Dogs']])
+        self.reader.retrieve_metadata('sheet-id')
+        self.assertEqual(len(self.sheet_requests()), 2)
+        self.fake.requests.clear()
+
+        self.assertEqual(self.reader.read_data('sheet-id', 'Categories!A:A'),
+                         [['Name'], ['Cats'], ['Dogs']])
+        self.reader.retrieve_metadata('sheet-id')
+        self.assertEqual(self.sheet_requests(), [])
+
+    def test_edited_sheet_is_read_again(self):
+        self.reader.read_data('sheet-id', 'Categories!A:A')
+        self.fake.write("'Categories'!A4", [['Fish']])
+        self.assertEqual(self.reader.read_data('sheet-id', 'Categories!A:A'),
+                         [['Name'], ['Cats'], ['Dogs'], ['Fish']])
+
+    def test_windows_share_a_single_version_check(self):
+        list(self.reader.iter_rows('sheet-id', 'Categories', window_rows=2))
+        self.fake.requests.clear()
+        rows = list(self.reader.iter_rows('sheet-id', 'Categories', window_rows=2))
+        self.assertEqual(len(rows), 3)
+        self.assertEqual([path for _, path, _, _ in self.fake.requests],
+                         ['/drive/v3/files/sheet-id'])
+
+    def test_windows_read_during_an_edit_are_not_cached(self):
+        version = str(self.fake.version)
+        windows = self.reader.iter_windows('sheet-id', 'Categories', window_rows=2)
+        next(windows)
+        self.fake.write("'Categories'!A4", [['Fish']])
+        self.assertEqual(next(windows), (3, [['Dogs'], ['Fish']]))
+        list(windows)
+
+        # A reader still seeing the version of the first window reads again
+        self.fake.requests.clear()
+        with mock.patch.object(ReadSheets, 'revision', return_value=version):
+            rows = list(self.reader.iter_rows('sheet-id', 'Categories', window_rows=2))
+        self.assertEqual([values for _, values in rows], [['Name'], ['Cats'], ['Dogs'], ['Fish']])
+        # The grid size and the windows of its 7 rows
+        self.assertEqual(len(self.sheet_requests()), 5)
+
+    def test_reads_are_not_cached_without_drive_access(self):
+        self.fake.drive_status = 403
+        self.reader.read_data('sheet-id', 'Categories!A:A')
+        self.reader.read_data('sheet-id', 'Categories!A:A')
+        self.assertEqual(len(self.sheet_requests()), 2)
+
+
+class SheetImportTests(FakeSheetsMixin, TestCase):
+
+    def test_sheet_rows_are_imported(self):
+        self.fake.write("'Categories'!A1", [['Name', 'Description']] + [
+            [f'Category {index}', 'Imported'] for index in range(7)])
+        reader = ReadSheets('test@example.com', service=self.service)
+        summary = import_sheet(reader, 'sheet-id', 'Categories', 'category', batch_size=3)
+        self.assertEqual(summary['imported'], 7)
+        self.assertEqual(Category.objects.filter(description='Imported').count(), 7)
+        # The layout sample comes from the same pass as the import: one
+        # version check before the windows and one after them
+        drive_reads = [path for _, path, _, _ in self.fake.requests if path.startswith('/drive/')]
+        self.assertEqual(len(drive_reads), 2)
+
+
+class SheetsServicePoolTests(FakeSheetsTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.pool = SheetsServicePool(api_endpoint='http://127.0.0.1:{}/'.format(
+            self.server.server_address[1]))
+        store_credentials('ada@example.com', self.credentials(minutes=30))
+        self.addCleanup(google.cache.delete, 'sheets_credentials:ada@example.com')
+
+    def credentials(self, minutes, token='token'):
+        return Credentials(
+            token=token, refresh_token='refresh', client_id='client', client_secret='secret',
+            token_uri='https://oauth2.googleapis.com/token', scopes=google.SCOPES,
+            expiry=datetime.datetime.utcnow() + datetime.timedelta(minutes=minutes))
+
+    def test_warm_acquire_skips_auth_and_discovery(self):
+        service = self.pool.acquire('ada@example.com')
+        self.pool.release('ada@example.com', service)
+        with mock.patch.object(google, 'build_from_document') as build_service, \
+                mock.patch.object(google.cache, 'get') as cache_get:
+            self.assertIs(self.pool.acquire('ada@example.com'), service)
+        build_service.assert_not_called()
+        cache_get.assert_not_called()
+
+    def test_services_are_not_shared_between_threads(self):
+        services = []
+        barrier = threading.Barrier(2)
+
+        def use():
+            with self.pool.service('ada@example.com') as service:
+                barrier.wait()
+                services.append(service)
+                service.spreadsheets().get(spreadsheetId='sheet-id').execute()
+
+        threads = [threading.Thread(target=use) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertIsNot(services[0], services[1])
+
+    def test_expired_credentials_are_reloaded_from_the_shared_cache(self):
+        service = self.pool.acquire('ada@example.com')
+        service._http.credentials = self.credentials(minutes=-5, token='expired')
+        self.pool.release('ada@example.com', service)
+        with mock.patch.object(Credentials, 'refresh') as refresh:
+            service = self.pool.acquire('ada@example.com')
+        refresh.assert_not_called()
+        self.assertEqual(service._http.credentials.token, 'token')
+
+    def test_clients_return_their_service_to_the_pool(self):
+        with mock.patch.object(google.GoogleSheetsClient, 'pool', self.pool):
+            with ReadSheets('ada@example.com') as reader:
+                service = reader.get_instance()
+            self.assertIs(self.pool.acquire('ada@example.com'), service)
+
+
+class SheetSyncTests(FakeSheetsTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.writer = WriteToGoogleSheet('test@example.com', service=self.service)
+        self.fake.grid('Report')
+        self.addCleanup(google.cache.delete, 'sheets_sync:sheet-id:Report')
+
+    def sync(self, prices):
+        frame = pd.DataFrame({'sku': list(prices), 'price': list(prices.values())})
+        self.fake.requests.clear()
+        return self.writer.sync_data_to_sheet_df('Report', 'sheet-id', frame, 'sku')
+
+    def test_first_sync_writes_the_whole_frame(self):
+        self.fake.write("'Report'!A1", [['stale']] * 30)
+        self.assertEqual(self.sync({'a': 1, 'b': 2})['appended'], 2)
+        self.assertEqual(self.fake.values('Report'), [['sku', 'price'], ['a', 1], ['b', 2]])
+
+    def test_unchanged_frame_sends_nothing(self):
+        self.sync({'a': 1, 'b': 2})
+        self.assertEqual(self.sync({'a': 1, 'b': 2}),
+                         {'updated': 0, 'appended': 0, 'deleted': 0})
+        self.assertEqual(self.fake.requests, [])
+
+    def test_only_changes_are_sent(self):
+        prices = {f'sku-{index}': index for index in range(10)}
+        self.sync(prices)
+        prices.update({'sku-1': 100, 'sku-2': 200, 'sku-8': 800, 'new': 5})
+        for key in ('sku-4', 'sku-5', 'sku-9'):
+            del prices[key]
+        result = self.sync(prices)
+        self.assertEqual(result, {'updated': 3, 'appended': 1, 'deleted': 3})
+        # One structural request for the deletions, one for the values
+        self.assertEqual(len(self.fake.requests), 2)
+        ranges = [value_range['range'] for value_range in self.value_writes()[0]['data']]
+        self.assertEqual(ranges, ["'Report'!A3:B4", "'Report'!A8:B9"])
+        published = {row[0]: row[1] for row in self.fake.values('Report')[1:]}
+        self.assertEqual(published, prices)
+
+    def test_failed_sync_is_followed_by_a_rewrite(self):
+        prices = {f'sku-{index}': index for index in range(6)}
+        self.sync(prices)
+        del prices['sku-1']
+        prices['sku-4'] = 400
+        # The deletion is applied, the values write fails
+        self.fake.failures = [400]
+        with self.assertRaises(HttpError):
+            self.sync(prices)
+        self.assertNotEqual(self.fake.values('Report')[1:],
+                            [[key, value] for key, value in prices.items()])
+
+        self.assertEqual(self.sync(prices)['appended'], len(prices))
+        self.assertEqual(self.fake.values('Report')[1:],
+                         [[key, value] for key, value in prices.items()])
+
+    def test_duplicate_keys_are_rejected(self):
+        frame = pd.DataFrame({'sku': ['a', 'a'], 'price': [1, 2]})
+        with self.assertRaises(ValueError):
+            self.writer.sync_data_to_sheet_df('Report', 'sheet-id', frame, 'sku')
@@ -1,7 +1,7 @@
 from django.urls import re_path
+from chunked_upload.consumers import ExportProgressConsumer
 
 
 websocket_urlpatterns = [
-    
-
+    re_path(r'^ws/export_jobs/$', ExportProgressConsumer.as_asgi()),
 ]
@@ -3,6 +3,8 @@ from .base import *
 from .database import *
 from .auth import *
 from .upload import *
+from .export import *
+from .sheets import *
 from .caching import *
 from .cors import *
 from .celery import *
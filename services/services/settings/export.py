@@ -0,0 +1,66 @@
+from datetime import timedelta
+from django.conf import settings
+
+# Rows fetched per round trip from the server-side cursor of an export, and
+# rows buffered before a chunk of the file is sent
+DEFAULT_EXPORT_CHUNK_SIZE = 2000
+EXPORT_CHUNK_SIZE = getattr(
+    settings, 'EXPORT_CHUNK_SIZE', DEFAULT_EXPORT_CHUNK_SIZE)
+
+# Exporter class handling each export format
+DEFAULT_EXPORTER_CLASSES = {
+    'csv': 'common.exporters.copy_exporters.CopyCSVExporter',
+    'xlsx': 'common.exporters.xlsx_exporters.XLSXExporter',
+    'parquet': 'common.exporters.arrow_exporters.ParquetExporter',
+    'arrow': 'common.exporters.arrow_exporters.ArrowExporter',
+}
+EXPORTER_CLASSES = getattr(
+    settings, 'EXPORTER_CLASSES', DEFAULT_EXPORTER_CLASSES)
+
+# Rows per Parquet row group. Readers scan row groups in parallel
+DEFAULT_PARQUET_ROW_GROUP_SIZE = 128 * 1024
+PARQUET_ROW_GROUP_SIZE = getattr(
+    settings, 'EXPORT_PARQUET_ROW_GROUP_SIZE', DEFAULT_PARQUET_ROW_GROUP_SIZE)
+
+# Compression codec of Parquet and Arrow IPC exports
+ARROW_COMPRESSION = getattr(settings, 'EXPORT_ARROW_COMPRESSION', 'zstd')
+
+# Seconds between two progress reports of a background export job
+DEFAULT_EXPORT_PROGRESS_INTERVAL = 1
+EXPORT_PROGRESS_INTERVAL = getattr(
+    settings, 'EXPORT_PROGRESS_INTERVAL', DEFAULT_EXPORT_PROGRESS_INTERVAL)
+
+# Gzip level of the files of export jobs in uncompressed formats (CSV)
+EXPORT_COMPRESSLEVEL = getattr(settings, 'EXPORT_COMPRESSLEVEL', 6)
+
+# Large CSV export jobs are split into this many primary key ranges exported
+# concurrently, each on its own database connection (PostgreSQL only)
+DEFAULT_EXPORT_SHARDS = 4
+EXPORT_SHARDS = getattr(settings, 'EXPORT_SHARDS', DEFAULT_EXPORT_SHARDS)
+
+# Rows from which an export job is sharded
+DEFAULT_EXPORT_SHARD_MIN_ROWS = 1_000_000
+EXPORT_SHARD_MIN_ROWS = getattr(
+    settings, 'EXPORT_SHARD_MIN_ROWS', DEFAULT_EXPORT_SHARD_MIN_ROWS)
+
+# Bytes of export responses each web worker keeps in memory, least recently
+# used first out, and size of the largest response cached
+DEFAULT_EXPORT_RESPONSE_CACHE_SIZE = 64 * 1024 * 1024
+EXPORT_RESPONSE_CACHE_SIZE = getattr(
+    settings, 'EXPORT_RESPONSE_CACHE_SIZE', DEFAULT_EXPORT_RESPONSE_CACHE_SIZE)
+DEFAULT_EXPORT_RESPONSE_CACHE_MAX_ENTRY = 8 * 1024 * 1024
+EXPORT_RESPONSE_CACHE_MAX_ENTRY = getattr(
+    settings, 'EXPORT_RESPONSE_CACHE_MAX_ENTRY', DEFAULT_EXPORT_RESPONSE_CACHE_MAX_ENTRY)
+
+# Incremental exports only return changes older than this lag, so rows
+# written by transactions still running when the watermark is taken are
+# picked up by the next delta instead of being skipped
+DEFAULT_CHANGES_WATERMARK_LAG = timedelta(seconds=60)
+CHANGES_WATERMARK_LAG = getattr(
+    settings, 'CHANGES_WATERMARK_LAG', DEFAULT_CHANGES_WATERMARK_LAG)
+
+# How long deletions are kept for incremental exports. Consumers syncing less
+# often than this must start over with a full export
+DEFAULT_TOMBSTONE_RETENTION = timedelta(days=30)
+TOMBSTONE_RETENTION = getattr(
+    settings, 'TOMBSTONE_RETENTION', DEFAULT_TOMBSTONE_RETENTION)
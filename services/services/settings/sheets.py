@@ -0,0 +1,43 @@
+from django.conf import settings
+
+# Rows per block written to Google Sheets, and the largest JSON payload of a
+# block; blocks over it are split in halves (the API rejects large requests)
+DEFAULT_SHEETS_WRITE_BLOCK_ROWS = 5000
+SHEETS_WRITE_BLOCK_ROWS = getattr(
+    settings, 'SHEETS_WRITE_BLOCK_ROWS', DEFAULT_SHEETS_WRITE_BLOCK_ROWS)
+DEFAULT_SHEETS_WRITE_BLOCK_BYTES = 2 * 1024 * 1024
+SHEETS_WRITE_BLOCK_BYTES = getattr(
+    settings, 'SHEETS_WRITE_BLOCK_BYTES', DEFAULT_SHEETS_WRITE_BLOCK_BYTES)
+
+# Retries of Sheets requests failing with 429 or 5xx, waiting a random time
+# up to SHEETS_BACKOFF_BASE * 2 ** attempt seconds (capped) in between
+SHEETS_MAX_RETRIES = getattr(settings, 'SHEETS_MAX_RETRIES', 6)
+SHEETS_BACKOFF_BASE = getattr(settings, 'SHEETS_BACKOFF_BASE', 1)
+SHEETS_BACKOFF_MAX = getattr(settings, 'SHEETS_BACKOFF_MAX', 64)
+
+# Rows per request when streaming a worksheet
+DEFAULT_SHEETS_READ_WINDOW_ROWS = 5000
+SHEETS_READ_WINDOW_ROWS = getattr(
+    settings, 'SHEETS_READ_WINDOW_ROWS', DEFAULT_SHEETS_READ_WINDOW_ROWS)
+
+# OAuth client of the app, used when a user has no stored credentials yet
+SHEETS_CLIENT_SECRET_FILE = getattr(
+    settings, 'SHEETS_CLIENT_SECRET_FILE', 'client_secret_file.json')
+
+# Cache key of the (refreshed) credentials of a user, shared by all workers
+SHEETS_CREDENTIALS_KEY = 'sheets_credentials:{}'
+
+# Idle Sheets services kept per user by each process
+SHEETS_POOL_MAX_IDLE = getattr(settings, 'SHEETS_POOL_MAX_IDLE', 4)
+
+# Cache key of the row hashes last published to a worksheet by a sync
+SHEETS_SYNC_KEY = 'sheets_sync:{}:{}'
+
+# Cache key of a read, by spreadsheet id, Drive version of the file and hash
+# of the request; reads of over SHEETS_READ_CACHE_MAX_CELLS cells (e.g. whole
+# worksheets through `read_data`) are not cached
+SHEETS_READ_KEY = 'sheets_read:{}:{}:{}'
+DEFAULT_SHEETS_READ_CACHE_TIMEOUT = 24 * 60 * 60
+SHEETS_READ_CACHE_TIMEOUT = getattr(
+    settings, 'SHEETS_READ_CACHE_TIMEOUT', DEFAULT_SHEETS_READ_CACHE_TIMEOUT)
+SHEETS_READ_CACHE_MAX_CELLS = getattr(settings, 'SHEETS_READ_CACHE_MAX_CELLS', 200_000)
@@ -27,3 +27,43 @@ STORAGE = getattr(settings, 'DRF_CHUNKED_UPLOAD_STORAGE_CLASS', lambda: None)()
 DEFAULT_MAX_BYTES = None
 MAX_BYTES = getattr(
     settings, 'DRF_CHUNKED_UPLOAD_MAX_BYTES', DEFAULT_MAX_BYTES)
+
+# Number of rows validated and written per batch when importing an upload
+DEFAULT_IMPORT_BATCH_SIZE = 1000
+IMPORT_BATCH_SIZE = getattr(
+    settings, 'DRF_CHUNKED_UPLOAD_IMPORT_BATCH_SIZE', DEFAULT_IMPORT_BATCH_SIZE)
+
+# File extension for the compressed report of rows rejected during an import
+REJECTS_EXT = getattr(
+    settings, 'DRF_CHUNKED_UPLOAD_REJECTS_EXT', '.rejects.csv.gz')
+
+# Memory (in bytes) the duplicate key detector of an import may use, for its
+# exact key maps or for Bloom filters and the statistics of duplicated keys
+DEFAULT_DUPLICATE_MEMORY_BUDGET = 64 * 1024 * 1024
+DUPLICATE_MEMORY_BUDGET = getattr(
+    settings, 'DRF_CHUNKED_UPLOAD_DUPLICATE_MEMORY_BUDGET',
+    DEFAULT_DUPLICATE_MEMORY_BUDGET)
+
+# Seconds a pipelined import waits before checking an upload for new chunks
+DEFAULT_PIPELINE_POLL_INTERVAL = 1
+PIPELINE_POLL_INTERVAL = getattr(
+    settings, 'DRF_CHUNKED_UPLOAD_PIPELINE_POLL_INTERVAL',
+    DEFAULT_PIPELINE_POLL_INTERVAL)
+
+# Importers used instead of the default ModelImporter for some model names
+DEFAULT_IMPORTER_CLASSES = {
+    'user': 'chunked_upload.importers.user_importers.UserImporter',
+}
+IMPORTER_CLASSES = getattr(
+    settings, 'DRF_CHUNKED_UPLOAD_IMPORTER_CLASSES', DEFAULT_IMPORTER_CLASSES)
+
+# Processes hashing passwords during a user import. `None` uses every core
+USER_IMPORT_WORKERS = getattr(
+    settings, 'DRF_CHUNKED_UPLOAD_USER_IMPORT_WORKERS', None)
+
+# Rows whose value shapes are part of an import layout fingerprint, and the
+# hard cap on rows read to infer the plan of a layout seen for the first time
+LAYOUT_SIGNATURE_ROWS = getattr(
+    settings, 'DRF_CHUNKED_UPLOAD_LAYOUT_SIGNATURE_ROWS', 20)
+LAYOUT_INFERENCE_MAX_ROWS = getattr(
+    settings, 'DRF_CHUNKED_UPLOAD_LAYOUT_INFERENCE_MAX_ROWS', 1000)
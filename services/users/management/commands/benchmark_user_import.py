@@ -0,0 +1,45 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.core.management.base import BaseCommand
+from chunked_upload.importers.user_importers import hash_passwords
+
+
+class Command(BaseCommand):
+
+    help = ('Measures how password hashing for bulk user imports scales '
+            'with the number of worker processes.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=2000,
+                            help='Number of passwords hashed per run.')
+        parser.add_argument('--max-workers', type=int, default=os.cpu_count(),
+                            help='Largest number of worker processes to try.')
+
+    def worker_counts(self, max_workers):
+        workers = 1
+        while workers < max_workers:
+            yield workers
+            workers *= 2
+        yield max_workers
+
+    def handle(self, *args, **options):
+        passwords = [f'import-password-{index}' for index in range(options['rows'])]
+        baseline = None
+
+        self.stdout.write(f"{'workers':>8} {'seconds':>10} {'rows/sec':>10} {'speedup':>8}")
+        for workers in self.worker_counts(options['max_workers']):
+            with ProcessPoolExecutor(max_workers=workers,
+                                     initializer=django.setup) as executor:
+                # Warm the pool up so process start-up is not measured
+                hash_passwords(passwords[:workers], executor, workers)
+                start = time.perf_counter()
+                hash_passwords(passwords, executor, workers)
+                elapsed = time.perf_counter() - start
+
+            rate = len(passwords) / elapsed
+            baseline = baseline or rate
+            self.stdout.write(
+                f'{workers:>8} {elapsed:>10.2f} {rate:>10.0f} {rate / baseline:>7.2f}x')
@@ -0,0 +1,36 @@
+from django.contrib.auth.hashers import identify_hasher
+from rest_framework import serializers
+from .models import CustomUser
+
+
+class UserImportSerializer(serializers.ModelSerializer):
+    """
+    Validates the rows of a bulk user import.
+
+    A row carries either a plain `password`, hashed by the importer, or a
+    `password_hash` already in Django's `<algorithm>$<params>` format.
+    Uniqueness of `email` and `username` is checked in bulk by the importer
+    instead of with one query per row, so the unique validators are dropped.
+    """
+    password = serializers.CharField(write_only=True, required=False,
+                                     allow_blank=True, trim_whitespace=False)
+    password_hash = serializers.CharField(write_only=True, required=False,
+                                          allow_blank=True)
+
+    class Meta:
+        model = CustomUser
+        fields = ['email', 'username', 'first_name', 'last_name',
+                  'phonenumber', 'password', 'password_hash']
+        extra_kwargs = {
+            'email': {'validators': []},
+            'username': {'validators': []},
+        }
+
+    def validate_password_hash(self, value):
+        if value:
+            try:
+                identify_hasher(value)
+            except ValueError as exc:
+                raise serializers.ValidationError(
+                    'Unknown password hash format.', code='invalid') from exc
+        return value
@@ -151,12 +151,11 @@ class ChannelManager:
 
         extracted_messages = []
         for config in self.channel_configs:
+            # Each message is meant for the configs of its type only
+            if item_data.get('type') != config['call_type']:
+                continue
             try:
-                if item_data['type'] == config['call_type']:
-                    data = item_data[config['event']]
-                else:
-                    raise RedisPubSubError(
-                        "Failed to find type for channel layer")
+                data = item_data[config['event']]
                 msg = {"type": config['call_type'], "data": data}
                 extracted_messages.append((config['group_name'], msg))
             except Exception as e:
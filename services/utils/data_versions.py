@@ -0,0 +1,66 @@
+"""
+Data versions of models, used to tell whether cached exports or responses
+built from their rows are still current.
+
+Every model has a version stored in the cache. It is bumped whenever rows of
+the model are written: by `post_save`/`post_delete` signals and explicitly
+by bulk writes, which bypass signals. Writers bump it once their transaction
+commits: bumped earlier, a concurrent reader could cache an export of the
+old rows under the new version. A version missing from the cache (e.g.
+evicted) restarts from the current time in nanoseconds, so it can never come
+back to a value an older export was built with.
+
+Example:
+    version = get_data_version(Product)
+    bump_data_version(Product)
+    assert get_data_version(Product) != version
+"""
+
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+DATA_VERSION_KEY = 'data_version:{}'
+
+
+def _key(model):
+    return DATA_VERSION_KEY.format(model._meta.label_lower)
+
+
+def get_data_version(model):
+    """
+    The current data version of `model`.
+    """
+    key = _key(model)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def get_data_versions(models):
+    """
+    The data versions of `models`, keyed by model label.
+    """
+    return {model._meta.label_lower: get_data_version(model) for model in models}
+
+
+def bump_data_version(model):
+    """
+    Mark the rows of `model` as changed.
+    """
+    key = _key(model)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), timeout=None)
+
+
+def bump_data_version_on_commit(model, using=None):
+    """
+    Mark the rows of `model` as changed once the current transaction of
+    `using` commits, right away outside of a transaction.
+    """
+    transaction.on_commit(lambda: bump_data_version(model), using=using)
@@ -0,0 +1,166 @@
+"""
+Keyset (cursor) pagination for list endpoints on large tables.
+
+Page number pagination runs an `OFFSET` scan and a `COUNT(*)` for every page,
+so deep pages of large tables get slower and slower. `KeysetPagination`
+keeps page numbers by default, and switches to keyset pagination when the
+request carries a `cursor` parameter (empty for the first page):
+
+    GET /uploads/?cursor=            first page
+    GET /uploads/?cursor=<opaque>    page given by the `next`/`previous` links
+
+Rows are ordered on a stable, unique ordering ending with the primary key,
+`('-created_on', '-pk')` by default or the view's `keyset_ordering`, and a
+page is fetched with the rows following the last seen values,
+`WHERE created_on <= x AND (created_on < x OR (created_on = x AND pk < y))`.
+The bound on the leading column lets a composite index on the ordering be
+range scanned, so page N costs the same as page 1. Add
+`count=approximate` to get the planner's row estimate instead of an exact
+count (PostgreSQL only, `null` elsewhere).
+"""
+
+import base64
+import binascii
+import json
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db import connections
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+def approximate_count(queryset):
+    """
+    The planner's estimate of the number of rows of `queryset`, without
+    running it. `None` on databases other than PostgreSQL.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+    sql, params = queryset.order_by().query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+class KeysetPagination(PageNumberPagination):
+    """
+    Page number pagination, or keyset pagination with opaque cursors when the
+    `cursor` query parameter is given.
+    """
+
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'
+    ordering = ('-created_on', '-pk')
+    invalid_cursor_message = 'Invalid cursor'
+
+    keyset = False
+
+    def get_ordering(self, view):
+        ordering = getattr(view, 'keyset_ordering', None) or self.ordering
+        return [(name.lstrip('-'), name.startswith('-')) for name in ordering]
+
+    def encode_cursor(self, instance, reverse):
+        position = []
+        for name, _ in self.fields:
+            value = getattr(instance, name)
+            position.append(value if isinstance(value, int) else
+                            value.isoformat() if hasattr(value, 'isoformat') else str(value))
+        data = json.dumps({'p': position, 'r': int(reverse)}, separators=(',', ':'))
+        cursor = base64.urlsafe_b64encode(data.encode('utf-8')).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, cursor)
+
+    def decode_cursor(self, request, model):
+        """
+        Returns:
+            tuple: `(position, reverse)`, or `None` for the first page.
+        """
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            data = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')))
+            position = [
+                (model._meta.pk if name == 'pk' else model._meta.get_field(name)).to_python(value)
+                for (name, _), value in zip(self.fields, data['p'], strict=True)]
+            return position, bool(data['r'])
+        except (ValueError, TypeError, KeyError, binascii.Error,
+                FieldDoesNotExist, ValidationError) as exc:
+            raise NotFound(self.invalid_cursor_message) from exc
+
+    def after(self, position, reverse):
+        """
+        Condition selecting the rows following `position` in the ordering,
+        or preceding it when `reverse`.
+
+        The rows are bounded on the leading column as well, for the database
+        to range scan the index instead of filtering on the `OR`.
+        """
+        condition = Q()
+        for index, (name, descending) in enumerate(self.fields):
+            lookup = 'lt' if descending != reverse else 'gt'
+            equal = {field: value for (field, _), value in
+                     zip(self.fields[:index], position[:index])}
+            condition |= Q(**equal, **{f'{name}__{lookup}': position[index]})
+        leading, descending = self.fields[0]
+        bound = 'lte' if descending != reverse else 'gte'
+        return Q(**{f'{leading}__{bound}': position[0]}) & condition
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = self.cursor_query_param in request.query_params
+        if not self.keyset:
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.fields = self.get_ordering(view)
+        page_size = self.get_page_size(request)
+        cursor = self.decode_cursor(request, queryset.model)
+        reverse = cursor is not None and cursor[1]
+
+        self.count = (approximate_count(queryset)
+                      if request.query_params.get(self.count_query_param) == 'approximate'
+                      else False)
+        queryset = queryset.order_by(*[
+            ('-' if descending != reverse else '') + name
+            for name, descending in self.fields])
+        if cursor is not None:
+            queryset = queryset.filter(self.after(cursor[0], reverse))
+
+        results = list(queryset[:page_size + 1])
+        has_more = len(results) > page_size
+        results = results[:page_size]
+        if reverse:
+            results.reverse()
+        has_next = cursor is not None if reverse else has_more
+        has_previous = has_more if reverse else cursor is not None
+        self.next_link = (self.encode_cursor(results[-1], False)
+                          if results and has_next else None)
+        self.previous_link = (self.encode_cursor(results[0], True)
+                              if results and has_previous else None)
+        return results
+
+    def get_paginated_response(self, data):
+        if not self.keyset:
+            return super().get_paginated_response(data)
+        response = {'next': self.next_link, 'previous': self.previous_link}
+        if self.count is not False:
+            response['count'] = self.count
+        response['results'] = data
+        return Response(response)
+
+    def get_next_link(self):
+        if self.keyset:
+            return self.next_link
+        return super().get_next_link()
+
+    def get_previous_link(self):
+        if self.keyset:
+            return self.previous_link
+        return super().get_previous_link()
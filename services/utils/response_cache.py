@@ -0,0 +1,127 @@
+"""
+An in-process cache of generated responses, bounded in bytes.
+
+Responses are cached under keys embedding the data versions of the models
+they were built from (see `utils.data_versions`), so writes never have to
+invalidate entries: a new version gives a new key and entries of older
+versions are evicted, least recently used first, once `max_size` bytes are
+used. Each worker process has its own cache; nothing but the data versions
+is read from Redis.
+
+Example:
+    cached = response_cache.get(key)
+    if cached is None:
+        chunks = response_cache.capture(key, chunks, content_type)
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from rest_framework.renderers import JSONRenderer
+
+
+class CachedResponse:
+    """
+    The body of a cached response and its content type.
+    """
+
+    def __init__(self, content, content_type):
+        self.content = content
+        self.content_type = content_type
+
+    @property
+    def size(self):
+        return len(self.content)
+
+
+class PrecompiledResponse(CachedResponse):
+    """
+    A response body built once and served as is, with a strong ETag of its
+    content.
+    """
+
+    def __init__(self, content, content_type):
+        super().__init__(content, content_type)
+        self.etag = '"{}"'.format(hashlib.sha256(content).hexdigest()[:32])
+
+    @classmethod
+    def json(cls, data):
+        """
+        `data` rendered by the API's JSON renderer.
+        """
+        return cls(JSONRenderer().render(data), 'application/json')
+
+    def respond(self, request):
+        """
+        The response to `request`, a 304 if the client has this body already.
+        """
+        response = get_conditional_response(request, etag=self.etag)
+        if response is None:
+            response = HttpResponse(self.content, content_type=self.content_type)
+        response['ETag'] = self.etag
+        return response
+
+
+class LRUResponseCache:
+    """
+    Least recently used cache of `CachedResponse`s, holding at most
+    `max_size` bytes. Responses larger than `max_entry_size` bytes are never
+    cached.
+    """
+
+    def __init__(self, max_size, max_entry_size):
+        self.max_size = max_size
+        self.max_entry_size = min(max_entry_size, max_size)
+        self.size = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None:
+                self._entries.move_to_end(key)
+            return cached
+
+    def set(self, key, cached):
+        if cached.size > self.max_entry_size:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.size -= previous.size
+            self._entries[key] = cached
+            self.size += cached.size
+            while self.size > self.max_size:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= evicted.size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def capture(self, key, chunks, content_type):
+        """
+        Yield `chunks` as bytes and cache the whole body under `key` once they
+        are exhausted, unless it grew past `max_entry_size`.
+        """
+        body, size = [], 0
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode('utf-8')
+            if body is not None:
+                size += len(chunk)
+                if size > self.max_entry_size:
+                    body = None
+                else:
+                    body.append(chunk)
+            yield chunk
+        if body is not None:
+            self.set(key, CachedResponse(b''.join(body), content_type))
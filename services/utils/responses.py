@@ -0,0 +1,124 @@
+"""
+Response helpers shared across apps.
+
+`ranged_file_response` serves a file from disk and honours single `Range`
+headers (RFC 9110), so clients can resume interrupted downloads of large
+generated files such as import reports and export results. Responses carry
+an `ETag` and `Last-Modified` of the file; a resumed download sending them
+back in `If-Range` gets the whole file if it was regenerated since.
+"""
+
+import os
+import re
+
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.http import content_disposition_header, http_date
+
+RANGE_PATTERN = re.compile(r'^bytes=(?P<start>\d*)-(?P<end>\d*)$')
+
+# Size of the blocks read from disk while streaming a partial response
+RANGE_BLOCK_SIZE = 64 * 1024
+
+
+def parse_range_header(header, size):
+    """
+    Parse a single-range `Range` header against a file of `size` bytes.
+
+    Returns:
+        tuple: `(start, end)` inclusive byte offsets, `None` if the header is
+        absent or not a single byte range (serve the whole file), or `False`
+        if the range cannot be satisfied.
+    """
+    match = RANGE_PATTERN.match(header.strip()) if header else None
+    if not match:
+        return None
+
+    start, end = match.group('start'), match.group('end')
+    if not start and not end:
+        return None
+    if not start:
+        # Suffix range: the last `end` bytes of the file
+        length = int(end)
+        if length == 0:
+            return False
+        return max(size - length, 0), size - 1
+
+    start = int(start)
+    end = int(end) if end else size - 1
+    if start >= size or end < start:
+        return False
+    return start, min(end, size - 1)
+
+
+def file_validators(path):
+    """
+    `(etag, last_modified)` of the file at `path`, from its size and
+    modification time.
+    """
+    stat = os.stat(path)
+    return f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"', http_date(stat.st_mtime)
+
+
+def _read_range(file_obj, start, length):
+    try:
+        file_obj.seek(start)
+        while length > 0:
+            block = file_obj.read(min(RANGE_BLOCK_SIZE, length))
+            if not block:
+                break
+            length -= len(block)
+            yield block
+    finally:
+        file_obj.close()
+
+
+def ranged_file_response(request, path, filename, content_type='application/octet-stream'):
+    """
+    Serve the file at `path` as an attachment, answering `Range` requests
+    with `206 Partial Content`.
+
+    Args:
+        request: The incoming request.
+        path (str): Absolute path of the file to serve.
+        filename (str): Name offered to the client in `Content-Disposition`.
+        content_type (str): Content type of the file.
+
+    Returns:
+        HttpResponse: A 200, 206 or 416 response. The whole file is served
+        when `If-Range` does not match the current file.
+    """
+    size = os.path.getsize(path)
+    etag, last_modified = file_validators(path)
+    byte_range = parse_range_header(request.META.get('HTTP_RANGE'), size)
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if byte_range is not None and if_range and if_range.strip() not in (etag, last_modified):
+        byte_range = None
+
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        response['Accept-Ranges'] = 'bytes'
+        return response
+
+    if byte_range is None:
+        response = FileResponse(open(path, 'rb'), as_attachment=True,
+                                filename=filename, content_type=content_type)
+        response['Accept-Ranges'] = 'bytes'
+        response['ETag'] = etag
+        response['Last-Modified'] = last_modified
+        return response
+
+    start, end = byte_range
+    length = end - start + 1
+    response = StreamingHttpResponse(
+        _read_range(open(path, 'rb'), start, length),
+        status=206,
+        content_type=content_type,
+    )
+    response['Content-Length'] = str(length)
+    response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    response['Accept-Ranges'] = 'bytes'
+    response['Content-Disposition'] = content_disposition_header(True, filename)
+    response['ETag'] = etag
+    response['Last-Modified'] = last_modified
+    return response